@@ -21,9 +21,10 @@ means so that one can guarantee consistency in the case of a failure.
 
 import uuid as _uuid
 import time
-import pickle as pickle
+import cPickle as pickle
 import sys
 import logging
+import zlib
 
 import mysql.fabric.persistence as _persistence
 import mysql.fabric.errors as _errors
@@ -93,6 +94,26 @@ class Checkpoint(_persistence.Persistable):
         "VALUES (%s, %s, %s, %s, %s, %s, %s)"
         )
 
+    #SQL statement for inserting new checkpoints into the table. It is
+    #completed with one values' list per row.
+    INSERT_CHECKPOINTS = (
+        "INSERT INTO checkpoints(proc_uuid, lockable_objects, job_uuid, "
+        "sequence, action_fqn, param_args, param_kwargs) VALUES %s"
+        )
+    INSERT_CHECKPOINTS_VALUES = "(%s, %s, %s, %s, %s, %s, %s)"
+
+    #Maximum number of rows in a single INSERT_CHECKPOINTS statement.
+    INSERT_CHECKPOINTS_ROWS = 500
+
+    #Versions of the encoding of serialized parameters which are stored
+    #as a prefix. Rows written before the encoding was versioned are
+    #ASCII pickles and never start with one of these bytes.
+    ENCODING_PICKLE = "\x01"
+    ENCODING_PICKLE_ZLIB = "\x02"
+
+    #Serialized parameters larger than this number of bytes are compressed.
+    COMPRESSION_THRESHOLD = 1024
+
     #SQL statement for updating the started time.
     UPDATE_START_CHECKPOINT = ("UPDATE checkpoints set started = %s WHERE "
         "proc_uuid = %s and job_uuid = %s"
@@ -137,6 +158,38 @@ class Checkpoint(_persistence.Persistable):
         "is NULL ORDER BY proc_uuid, sequence"
         )
 
+    #SQL statement for retrieving a batch of the occurrences used for
+    #recovery which belong to procedures whose uuids follow a given one.
+    QUERY_UNFINISHED_CHECKPOINTS_BATCH = (
+        "SELECT chk_info.proc_uuid, chk_info.lockable_objects, "
+        "chk_info.job_uuid, chk_info.sequence, chk_info.action_fqn, "
+        "chk_info.param_args, chk_info.param_kwargs, "
+        "chk_info.started, chk_info.finished FROM "
+        "(SELECT proc_uuid, max(sequence) as sequence FROM checkpoints "
+        "WHERE started is NOT NULL AND finished is NULL AND proc_uuid > %s "
+        "GROUP BY proc_uuid ORDER BY proc_uuid LIMIT %s) "
+        "AS chk_core INNER JOIN checkpoints AS chk_info ON "
+        "chk_info.proc_uuid = chk_core.proc_uuid and "
+        "chk_info.sequence = chk_core.sequence ORDER BY chk_info.proc_uuid"
+        )
+
+    #SQL statement for retrieving a batch of the registered checkpoints
+    #which follow a given procedure's uuid and sequence.
+    QUERY_REGISTERED_CHECKPOINTS_BATCH = (
+        "SELECT proc_uuid, lockable_objects, job_uuid, sequence, "
+        "action_fqn, param_args, param_kwargs, started, finished "
+        "FROM checkpoints WHERE finished is NULL AND "
+        "(proc_uuid > %s OR (proc_uuid = %s AND sequence > %s)) "
+        "ORDER BY proc_uuid, sequence LIMIT %s"
+        )
+
+    #SQL statement for counting the checkpoints that need to be recovered.
+    QUERY_COUNT_RECOVERY_CHECKPOINTS = (
+        "SELECT COUNT(DISTINCT CASE WHEN started is NOT NULL "
+        "THEN proc_uuid END), COUNT(DISTINCT proc_uuid) "
+        "FROM checkpoints WHERE finished is NULL"
+        )
+
     QUERY_FINISHED_CHECKPOINTS = (
         "SELECT DISTINCT proc_uuid FROM checkpoints WHERE proc_uuid IN "
         "(SELECT DISTINCT chk_info.proc_uuid FROM checkpoints as chk_info "
@@ -240,11 +293,63 @@ class Checkpoint(_persistence.Persistable):
             param_args, param_kwargs)}
             )
 
+    @staticmethod
+    def register_many(checkpoints, finished=None, persister=None):
+        """Register a set of checkpoints with a single multi-row INSERT
+        statement per :attr:`INSERT_CHECKPOINTS_ROWS` checkpoints.
+
+        If a checkpoint that has already been registered is provided
+        through the finished parameter, it is also registered that it has
+        finished. This replaces calling :meth:`finish` and must happen
+        within the transaction of the job that owns it.
+
+        The statements are deferred until the transaction commits if group
+        commit is enabled. See
+        :meth:`~mysql.fabric.persistence.MySQLPersister.defer_stmt`.
+
+        :param checkpoints: List of checkpoints to be registered.
+        :param finished: Registered checkpoint that has finished or None.
+        :param persister: The DB server that can be used to access the
+                          state store.
+        """
+        rows = []
+        for checkpoint in checkpoints:
+            param_args, param_kwargs, lockable_objects = \
+                Checkpoint.serialize(checkpoint.param_args,
+                                     checkpoint.param_kwargs,
+                                     checkpoint.lockable_objects)
+            rows.append((
+                str(checkpoint.proc_uuid), lockable_objects,
+                str(checkpoint.job_uuid), checkpoint.sequence,
+                checkpoint.__action_fqn, param_args, param_kwargs
+            ))
+
+        for start in range(0, len(rows), Checkpoint.INSERT_CHECKPOINTS_ROWS):
+            chunk = rows[start:start + Checkpoint.INSERT_CHECKPOINTS_ROWS]
+            persister.defer_stmt(
+                Checkpoint.INSERT_CHECKPOINTS % (", ".join(
+                    [Checkpoint.INSERT_CHECKPOINTS_VALUES] * len(chunk)
+                ), ),
+                {"params" : tuple(value for row in chunk for value in row)}
+            )
+
+        if finished is not None:
+            finished_time = time.time()
+            persister.defer_stmt(Checkpoint.UPDATE_FINISH_CHECKPOINT,
+                {"params":(finished_time, str(finished.proc_uuid),
+                str(finished.job_uuid))}
+                )
+            finished.__finished = finished_time
+
     def begin(self, persister=None):
         """Register that an action is about to start.
+
+        The statement is deferred until the job's transaction begins if
+        group commit is enabled. See
+        :meth:`~mysql.fabric.persistence.MySQLPersister.defer_stmt`.
         """
         started = time.time()
-        persister.exec_stmt(Checkpoint.UPDATE_START_CHECKPOINT,
+        persister.defer_stmt(Checkpoint.UPDATE_START_CHECKPOINT,
             {"params":(started, str(self.__proc_uuid),
             str(self.__job_uuid))}
             )
@@ -313,6 +418,71 @@ class Checkpoint(_persistence.Persistable):
             checkpoints.add(Checkpoint._create_object_from_row(row))
         return checkpoints
 
+    @staticmethod
+    def unfinished_batches(batch_size, persister=None):
+        """Return unfinished procedures in batches ordered by procedure.
+
+        Each batch is read with its own statement that resumes after the
+        last procedure of the previous one, so neither the client nor the
+        server keep all the checkpoints at once.
+
+        :param batch_size: Maximum number of checkpoints in a batch.
+        :param persister: The DB server that can be used to access the
+                          state store.
+        :return: Iterator over lists of Checkpoint objects.
+        """
+        last_proc_uuid = ""
+        while True:
+            rows = persister.exec_stmt(
+                Checkpoint.QUERY_UNFINISHED_CHECKPOINTS_BATCH,
+                {"params" : (last_proc_uuid, batch_size)}
+            )
+            if not rows:
+                return
+            yield [Checkpoint._create_object_from_row(row) for row in rows]
+            if len(rows) < batch_size:
+                return
+            last_proc_uuid = rows[-1][0]
+
+    @staticmethod
+    def registered_batches(batch_size, persister=None):
+        """Return registered procedures in batches ordered by procedure
+        and sequence.
+
+        See :meth:`unfinished_batches`.
+
+        :param batch_size: Maximum number of checkpoints in a batch.
+        :param persister: The DB server that can be used to access the
+                          state store.
+        :return: Iterator over lists of Checkpoint objects.
+        """
+        last_proc_uuid, last_sequence = "", -1
+        while True:
+            rows = persister.exec_stmt(
+                Checkpoint.QUERY_REGISTERED_CHECKPOINTS_BATCH,
+                {"params" : (last_proc_uuid, last_proc_uuid, last_sequence,
+                 batch_size)}
+            )
+            if not rows:
+                return
+            yield [Checkpoint._create_object_from_row(row) for row in rows]
+            if len(rows) < batch_size:
+                return
+            last_proc_uuid, last_sequence = rows[-1][0], rows[-1][3]
+
+    @staticmethod
+    def count_recovery(persister=None):
+        """Return how many procedures need to be recovered.
+
+        :param persister: The DB server that can be used to access the
+                          state store.
+        :return: Tuple with the number of procedures that have a job which
+                 started but did not finish and the number of procedures
+                 that have jobs which did not finish.
+        """
+        rows = persister.exec_stmt(Checkpoint.QUERY_COUNT_RECOVERY_CHECKPOINTS)
+        return int(rows[0][0]), int(rows[0][1])
+
     @staticmethod
     def fetch(proc_uuid, persister=None):
         """Return the object corresponding to the proc_uuid.
@@ -409,6 +579,10 @@ class Checkpoint(_persistence.Persistable):
         It is worth noticing that it does not check the type of the objects
         that are being serialize and it is up to the user to do so.
 
+        Objects are pickled with the highest protocol and prefixed with the
+        encoding's version. Those larger than :attr:`COMPRESSION_THRESHOLD`
+        bytes are also compressed if this makes them smaller.
+
         :param param_args: List with non-keyworded arguments to the
                            function(s).
         :param param_kwargs: Dictionary with neyworded arguments to the
@@ -419,14 +593,16 @@ class Checkpoint(_persistence.Persistable):
         :rtype: (serialized_args, serialized_kwargs,
                 serialized_lockable_objects).
         """
-        s_param_args = pickle.dumps(param_args)
-        s_param_kwargs = pickle.dumps(param_kwargs)
-        s_lockable_objects = pickle.dumps(lockable_objects)
+        s_param_args = Checkpoint._encode(param_args)
+        s_param_kwargs = Checkpoint._encode(param_kwargs)
+        s_lockable_objects = Checkpoint._encode(lockable_objects)
         return s_param_args, s_param_kwargs, s_lockable_objects
 
     @staticmethod
     def deserialize(param_args, param_kwargs, lockable_objects):
         """Deserialize the non-keyworded and keyworded parameters using Pickle.
+        Parameters serialized before the encoding was versioned are also
+        accepted.
 
         :param param_args: Serialized list with non-keyworded arguments to the
                            function(s).
@@ -437,11 +613,34 @@ class Checkpoint(_persistence.Persistable):
         :return: Return a tuple with the parameters deserialized.
         :rtype: (args, kwargs, lockable_objects).
         """
-        ds_param_args = pickle.loads(param_args)
-        ds_param_kwargs = pickle.loads(param_kwargs)
-        ds_lockable_objects = pickle.loads(lockable_objects)
+        ds_param_args = Checkpoint._decode(param_args)
+        ds_param_kwargs = Checkpoint._decode(param_kwargs)
+        ds_lockable_objects = Checkpoint._decode(lockable_objects)
         return ds_param_args, ds_param_kwargs, ds_lockable_objects
 
+    @staticmethod
+    def _encode(obj):
+        """Serialize an object. See :meth:`serialize`.
+        """
+        data = pickle.dumps(obj, pickle.HIGHEST_PROTOCOL)
+        if len(data) > Checkpoint.COMPRESSION_THRESHOLD:
+            compressed = zlib.compress(data, 1)
+            if len(compressed) < len(data):
+                return Checkpoint.ENCODING_PICKLE_ZLIB + compressed
+        return Checkpoint.ENCODING_PICKLE + data
+
+    @staticmethod
+    def _decode(data):
+        """Deserialize an object. See :meth:`deserialize`.
+        """
+        data = str(data)
+        encoding = data[:1]
+        if encoding == Checkpoint.ENCODING_PICKLE:
+            return pickle.loads(data[1:])
+        elif encoding == Checkpoint.ENCODING_PICKLE_ZLIB:
+            return pickle.loads(zlib.decompress(data[1:]))
+        return pickle.loads(data)
+
     @staticmethod
     def is_recoverable(action):
         """Check if an action is recoverable or not. This means that it is
@@ -471,22 +670,30 @@ class Checkpoint(_persistence.Persistable):
 
 _LOGGER = logging.getLogger(__name__)
 
-def register(jobs, transaction):
+def register(jobs, transaction, finished=None):
     """Atomically register jobs.
 
+    The checkpoints of all recoverable jobs are written by a single
+    statement. See :meth:`Checkpoint.register_many`.
+
     :param jobs: List of jobs to be registered.
     :param transaction: Whether there is transaction context or not.
+    :param finished: Checkpoint of the job that has created the jobs and
+                     has finished or None.
     """
     assert(isinstance(jobs, list))
+    assert(finished is None or transaction)
+
+    checkpoints = [job.checkpoint for job in jobs if job.is_recoverable]
+    if not checkpoints and finished is None:
+        return
 
     persister = _persistence.current_persister()
     if not transaction:
         persister.begin()
 
     try:
-        for job in jobs:
-            if job.is_recoverable:
-                job.checkpoint.register()
+        Checkpoint.register_many(checkpoints, finished)
 
     except _errors.DatabaseError:
         try:
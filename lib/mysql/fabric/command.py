@@ -44,6 +44,7 @@ import collections
 
 import mysql.fabric.errors as _errors
 import mysql.fabric.executor as _executor
+import mysql.fabric.persistence as _persistence
 import mysql.fabric.utils as _utils
 
 from cStringIO import StringIO
@@ -146,6 +147,10 @@ class CommandMeta(type):
     def _wrapfunc(mcs, func, cname):
         """Wrap the a function in order to log when it started and
         finished its execution.
+
+        Commands that are not procedures read from the state store's
+        replicas if there are any. See
+        :class:`~mysql.fabric.persistence.ReplicaReads`.
         """
         original = func
         @functools.wraps(func)
@@ -155,6 +160,14 @@ class CommandMeta(type):
             group = obj.group_name
             command = obj.command_name
             subject = ".".join([group, command])
+            persister = None
+            if not isinstance(obj, ProcedureCommand):
+                try:
+                    persister = _persistence.current_persister()
+                except AttributeError:
+                    pass
+            read_from_replicas = getattr(persister, "read_from_replicas", None)
+            replica_reads = None
             try:
                 _LOGGER.debug(
                     "Started command (%s, %s).", group, command,
@@ -164,7 +177,13 @@ class CommandMeta(type):
                         "type" : MySQLHandler.START
                     }
                 )
-                ret = original(obj, *args, **kwrds)
+                if read_from_replicas is not None:
+                    replica_reads = read_from_replicas(True)
+                try:
+                    ret = original(obj, *args, **kwrds)
+                finally:
+                    if replica_reads is not None:
+                        read_from_replicas(replica_reads)
 
                 # Check that we really got a result set back. If not,
                 # something is amiss.
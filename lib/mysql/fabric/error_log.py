@@ -27,6 +27,10 @@ from mysql.fabric.utils import (
    get_time,
 )
 
+from mysql.fabric.log_partitions import (
+    LogPartitions,
+)
+
 _LOGGER = logging.getLogger(__name__)
 
 class ErrorLog(_persistence.Persistable):
@@ -92,9 +96,20 @@ class ErrorLog(_persistence.Persistable):
     def create(persister=None):
         """Create the objects(tables) that will store server's errors.
 
+        If the log tables are partitioned, old errors are removed by
+        dropping partitions instead of by an event. See
+        :class:`~mysql.fabric.log_partitions.LogPartitions`.
+
         :param persister: Persister to persist the object to.
         :raises: DatabaseError If the table already exists.
         """
+        if LogPartitions.ENABLED:
+            persister.exec_stmt(LogPartitions.partitioned_table(
+                ErrorLog.CREATE_SERVER_ERROR_LOG,
+                LogPartitions.retention(ErrorLog._PRUNE_TIME)
+            ))
+            return
+
         persister.exec_stmt(ErrorLog.CREATE_SERVER_ERROR_LOG)
         persister.exec_stmt(
             ErrorLog.CREATE_EVENT_ERROR_LOG % (ErrorLog._PRUNE_TIME,
@@ -105,9 +120,16 @@ class ErrorLog(_persistence.Persistable):
     def add_constraints(persister=None):
         """Add the constraints to the error_log table.
 
+        Partitioned tables do not support foreign keys, so there is none
+        if the log tables are partitioned. Errors are removed along with
+        their server anyway. See :meth:`remove`.
+
         :param persister: The DB server that can be used to access the
                           state store.
         """
+        if LogPartitions.ENABLED:
+            return
+
         persister.exec_stmt(
                 ErrorLog.ADD_FOREIGN_KEY_CONSTRAINT_SERVER_UUID)
 
@@ -112,13 +112,24 @@ class Event(object):
     internally.
 
     :param string name: The name of the event instance.
+    :param priority_class: Priority class of the procedures created when
+                           the event is triggered. See
+                           :mod:`~mysql.fabric.scheduler`.
+    :param coalesce: Whether triggering the event with the same arguments
+                     as a procedure that has not started yet should return
+                     that procedure instead of creating a new one. It may
+                     also be a function that maps the event's arguments to
+                     the key that identifies it. See
+                     :meth:`~mysql.fabric.executor.Executor.enqueue_procedures`.
 
     For an example on how to trigger an event internally, see
     :meth:`Handler.trigger`.
 
     """
-    def __init__(self, name=None):
+    def __init__(self, name=None, priority_class=None, coalesce=False):
         self.__name = name
+        self.__priority_class = priority_class
+        self.__coalesce = coalesce
 
     @property
     def name(self):
@@ -129,6 +140,21 @@ class Event(object):
         """
         return self.__name
 
+    @property
+    def priority_class(self):
+        """The priority class of the procedures created by the event.
+
+        :returns: The priority class, or None if procedures are
+                  administrative.
+        """
+        return self.__priority_class
+
+    @property
+    def coalesce(self):
+        """Whether identical pending procedures are coalesced.
+        """
+        return self.__coalesce
+
 
 class Handler(Singleton):
     """An event handler to manage and trigger events in the system.
@@ -328,7 +354,9 @@ class Handler(Singleton):
             for block in self.__blocks_for.get(event, [])
         ]
         return self.__executor.enqueue_procedures(
-            within_procedure, actions, lockable_objects
+            within_procedure, actions, lockable_objects,
+            getattr(event, "priority_class", None),
+            getattr(event, "coalesce", False)
         )
 
 def trigger(event, lockable_objects=None, *args, **kwargs):
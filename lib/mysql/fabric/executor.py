@@ -16,6 +16,7 @@
 #
 
 import Queue
+import collections
 import threading
 import logging
 import uuid as _uuid
@@ -28,11 +29,38 @@ import mysql.fabric.persistence as _persistence
 import mysql.fabric.errors as _errors
 import mysql.fabric.scheduler as _scheduler
 import mysql.fabric.checkpoint as _checkpoint
+import mysql.fabric.config as _config
 
 from mysql.fabric.utils import Singleton
 
 _LOGGER = logging.getLogger(__name__)
 
+# Time in seconds an idle executor thread waits for a procedure before
+# retiring if there are more threads than the minimum.
+DEFAULT_IDLE_TIMEOUT = 30.0
+
+MIN_IDLE_TIMEOUT = 0.1
+
+# Phases of a job's execution whose latency is measured: time waiting in
+# the executor's queue, executing the action, writing checkpoints, which
+# includes beginning the job's transaction as it may carry them, and
+# committing the job's transaction.
+METRICS_PHASES = ("queue", "execution", "checkpoint", "commit")
+QUEUE_PHASE, EXECUTION_PHASE, CHECKPOINT_PHASE, COMMIT_PHASE = \
+    range(0, len(METRICS_PHASES))
+
+# Upper bounds in seconds of the latency histograms' buckets. There is an
+# additional bucket for anything above the last bound.
+METRICS_BUCKETS = (0.001, 0.01, 0.1, 1.0, 10.0)
+
+# Layout of a job's slot in the metrics' buffer: the action's name,
+# whether it succeeded and when it reached the boundaries between phases
+# or None if it did not: queued, started, began the transaction, executed
+# the action, registered the checkpoint and committed the transaction.
+_QUEUED, _STARTED, _BEGUN, _EXECUTED, _REGISTERED, _COMMITTED = range(2, 8)
+_METRICS_SLOT = 8
+_NO_BOUNDARIES = (None, ) * (_METRICS_SLOT - _QUEUED)
+
 class Procedure(object):
     """Defines the context within which an operation is executed. Explicitly,
     an operation is a code block to be executed and is named a job.
@@ -55,11 +83,16 @@ class Procedure(object):
                  will be generated.
     :param lockable_objects: Set of objects to be locked by the concurrency
                              control mechanism.
+    :param priority_class: Priority class used by the scheduler. See
+                           :mod:`~mysql.fabric.scheduler`.
     """
-    def __init__(self, uuid=None, lockable_objects=None):
+    def __init__(self, uuid=None, lockable_objects=None,
+                 priority_class=_scheduler.PRIORITY_ADMIN):
         """Create a Procedure object.
         """
         assert(uuid is None or isinstance(uuid, _uuid.UUID))
+        assert(priority_class in range(0, len(_scheduler.PRIORITY_CLASSES)))
+        self.__priority_class = priority_class
         self.__uuid = uuid or _uuid.uuid4()
         self.__lock = threading.Condition()
         self.__complete = False
@@ -83,6 +116,12 @@ class Procedure(object):
             return set(["lock"])
         return self.__lockable_objects
 
+    @property
+    def priority_class(self):
+        """Return the procedure's priority class.
+        """
+        return self.__priority_class
+
     def get_priority(self):
         """Return whether this procedure should have higher priority over
         other procedures that require access to a common subset of objects.
@@ -217,6 +256,315 @@ class Procedure(object):
             return ret
 
 
+class ProcedureRecord(object):
+    """Compact record of a finished procedure kept in the procedure's
+    history. It provides the same interface as a finished
+    :class:`Procedure` so that its outcome may be retrieved after the
+    procedure itself is gone.
+
+    :param procedure: Finished procedure.
+    """
+    __slots__ = ("uuid", "result", "used", "_status")
+
+    def __init__(self, procedure):
+        """Constructor for ProcedureRecord.
+        """
+        self.uuid = procedure.uuid
+        self.result = procedure.result
+        self.used = time.time()
+        self._status = tuple(
+            (item["when"], item["state"], item["success"],
+             item["description"], item["diagnosis"])
+            for item in procedure.status
+        )
+
+    @property
+    def status(self):
+        """Return the procedure's status. See :attr:`Procedure.status`.
+        """
+        return [
+            {"when" : when, "state" : state, "success" : success,
+             "description" : description, "diagnosis" : diagnosis}
+            for when, state, success, description, diagnosis in self._status
+        ]
+
+    def has_traceback(self):
+        """Return whether the record holds a full traceback.
+        """
+        return any(
+            diagnosis.count("\n") > 1 for _, _, _, _, diagnosis in self._status
+        )
+
+    def strip_traceback(self):
+        """Replace full tracebacks with the error message which is their
+        last line.
+        """
+        self._status = tuple(
+            (when, state, success, description,
+             diagnosis.split("\n")[-2] + "\n"
+             if diagnosis.count("\n") > 1 else diagnosis)
+            for when, state, success, description, diagnosis in self._status
+        )
+
+    def is_complete(self):
+        """A record always refers to a finished procedure.
+        """
+        return True
+
+    def wait(self):
+        """There is nothing to wait for.
+        """
+        pass
+
+class ProcedureHistory(object):
+    """Keep compact records of finished procedures so that their outcome
+    can be retrieved by uuid after all references to them are dropped.
+
+    The history is bounded: records that have not been used for
+    :attr:`MAX_AGE` seconds expire and the least recently used ones are
+    evicted when there are more than :attr:`MAX_SIZE`. Only the latest
+    :attr:`MAX_TRACEBACKS` records keep full tracebacks, older ones keep
+    only the error message.
+    """
+    MIN_SIZE = 0
+    MAX_SIZE = DEFAULT_MAX_SIZE = 10000
+    MIN_AGE = 1.0
+    MAX_AGE = DEFAULT_MAX_AGE = 3600.0
+    MIN_TRACEBACKS = 0
+    MAX_TRACEBACKS = DEFAULT_MAX_TRACEBACKS = 100
+
+    def __init__(self):
+        """Constructor for ProcedureHistory.
+        """
+        self.__lock = threading.Lock()
+        self.__records = collections.OrderedDict()
+        self.__tracebacks = collections.OrderedDict()
+        self.__evicted = 0
+
+    def add(self, procedure):
+        """Record a finished procedure.
+        """
+        record = ProcedureRecord(procedure)
+        with self.__lock:
+            self.__records.pop(record.uuid, None)
+            self.__records[record.uuid] = record
+            self.__tracebacks.pop(record.uuid, None)
+            if record.has_traceback():
+                self.__tracebacks[record.uuid] = record
+            self._evict(record.used)
+
+    def get(self, proc_uuid):
+        """Return the record of a procedure or None if there is none.
+        """
+        now = time.time()
+        with self.__lock:
+            self._evict(now)
+            record = self.__records.pop(proc_uuid, None)
+            if record is not None:
+                record.used = now
+                self.__records[proc_uuid] = record
+            return record
+
+    def remove(self, proc_uuid):
+        """Remove the record of a procedure.
+        """
+        with self.__lock:
+            self.__records.pop(proc_uuid, None)
+            self.__tracebacks.pop(proc_uuid, None)
+
+    def get_statistics(self):
+        """Return the number of records kept, how many of them have full
+        tracebacks and how many were evicted or expired.
+        """
+        with self.__lock:
+            return {
+                "records" : len(self.__records),
+                "tracebacks" : len(self.__tracebacks),
+                "evicted" : self.__evicted,
+            }
+
+    def _evict(self, now):
+        """Remove expired and exceeding records and strip tracebacks. This
+        must be called with the lock held.
+        """
+        while self.__records:
+            proc_uuid, record = next(self.__records.iteritems())
+            if len(self.__records) <= ProcedureHistory.MAX_SIZE and \
+                now - record.used <= ProcedureHistory.MAX_AGE:
+                break
+            del self.__records[proc_uuid]
+            self.__tracebacks.pop(proc_uuid, None)
+            self.__evicted += 1
+        while len(self.__tracebacks) > ProcedureHistory.MAX_TRACEBACKS:
+            self.__tracebacks.popitem(last=False)[1].strip_traceback()
+
+class JobMetrics(object):
+    """Accumulate per action counters and latency histograms of the jobs
+    executed by a thread.
+
+    Each thread records the jobs that it executes into its own buffer, so
+    that no list is allocated and no lock is acquired per job, and folds
+    the buffer into its counters while holding the lock once it has
+    :attr:`BATCH` jobs. Readers hold the lock and fold the buffers without
+    changing them.
+    """
+    ENABLED = True
+    BATCH = 64
+    LOCK = threading.Lock()
+    ACCUMULATORS = []
+    LOCAL = threading.local()
+    RETIRED = None
+
+    def __init__(self):
+        """Constructor for JobMetrics.
+        """
+        # Dictionary that maps an action's name to a list with the number
+        # of calls, the number of errors and one list per phase with the
+        # number of samples, total and maximum time and the histogram.
+        self.actions = {}
+        # Jobs that are not folded into the counters yet. Each one takes
+        # a slot with the layout described by _METRICS_SLOT.
+        self.pending = [None] * (JobMetrics.BATCH * _METRICS_SLOT)
+        self.size = 0
+
+    @staticmethod
+    def get():
+        """Return the current thread's accumulator.
+        """
+        try:
+            return JobMetrics.LOCAL.metrics
+        except AttributeError:
+            metrics = JobMetrics.LOCAL.metrics = JobMetrics()
+            with JobMetrics.LOCK:
+                JobMetrics.ACCUMULATORS.append(metrics)
+            return metrics
+
+    @staticmethod
+    def retire():
+        """Fold the current thread's accumulator into the accumulator of
+        threads that have stopped.
+        """
+        metrics = getattr(JobMetrics.LOCAL, "metrics", None)
+        if metrics is None:
+            return
+        del JobMetrics.LOCAL.metrics
+        with JobMetrics.LOCK:
+            JobMetrics.ACCUMULATORS.remove(metrics)
+            if JobMetrics.RETIRED is None:
+                JobMetrics.RETIRED = JobMetrics()
+            JobMetrics.RETIRED._merge(metrics.actions.items())
+            JobMetrics.RETIRED._fold(metrics.pending, metrics.size)
+
+    @staticmethod
+    def statistics():
+        """Return the merged counters and histograms::
+
+            {action_fqn : [calls, errors,
+                           [[count, total, max, bucket_0, ...], ...]]}
+
+        There is one list per phase in :data:`METRICS_PHASES` and one
+        bucket per bound in :data:`METRICS_BUCKETS` plus one.
+        """
+        merged = JobMetrics()
+        with JobMetrics.LOCK:
+            accumulators = list(JobMetrics.ACCUMULATORS)
+            if JobMetrics.RETIRED is not None:
+                accumulators.append(JobMetrics.RETIRED)
+            for metrics in accumulators:
+                merged._merge(metrics.actions.items())
+                merged._fold(metrics.pending, metrics.size)
+        return merged.actions
+
+    def start(self, queued):
+        """Clear the next slot, register when the job was queued and
+        started and return the slot's offset.
+        """
+        offset = self.size * _METRICS_SLOT
+        self.pending[offset + _QUEUED:offset + _METRICS_SLOT] = \
+            _NO_BOUNDARIES
+        self.pending[offset + _QUEUED] = queued
+        self.pending[offset + _STARTED] = time.time()
+        return offset
+
+    def record(self, action_fqn, success):
+        """Record the execution of the job whose boundaries are in the
+        next slot.
+
+        :param action_fqn: Action's fully qualified name.
+        :param success: Whether the job succeeded or not.
+        """
+        offset = self.size * _METRICS_SLOT
+        self.pending[offset] = action_fqn
+        self.pending[offset + 1] = success
+        self.size += 1
+        if self.size == JobMetrics.BATCH:
+            with JobMetrics.LOCK:
+                self._fold(self.pending, self.size)
+                self.size = 0
+
+    def _fold(self, pending, size):
+        """Add the jobs in a buffer to this accumulator's entries.
+        """
+        for offset in xrange(0, size * _METRICS_SLOT, _METRICS_SLOT):
+            entry = self.actions.get(pending[offset])
+            if entry is None:
+                entry = self.actions[pending[offset]] = \
+                    JobMetrics._new_entry()
+            entry[0] += 1
+            if not pending[offset + 1]:
+                entry[1] += 1
+            queued, started, begun, executed, registered, committed = \
+                pending[offset + _QUEUED:offset + _METRICS_SLOT]
+            timings = [None] * len(METRICS_PHASES)
+            if queued is not None:
+                timings[QUEUE_PHASE] = started - queued
+            if begun is not None:
+                timings[CHECKPOINT_PHASE] = begun - started
+            if executed is not None:
+                timings[EXECUTION_PHASE] = executed - begun
+            if registered is not None:
+                timings[CHECKPOINT_PHASE] += registered - executed
+            if committed is not None:
+                timings[COMMIT_PHASE] = committed - registered
+            for phase, elapsed in zip(entry[2], timings):
+                if elapsed is None:
+                    continue
+                phase[0] += 1
+                phase[1] += elapsed
+                if elapsed > phase[2]:
+                    phase[2] = elapsed
+                bucket = 3
+                for bound in METRICS_BUCKETS:
+                    if elapsed <= bound:
+                        break
+                    bucket += 1
+                phase[bucket] += 1
+
+    def _merge(self, actions):
+        """Add other accumulator's entries to this one.
+        """
+        for action_fqn, other in actions:
+            entry = self.actions.get(action_fqn)
+            if entry is None:
+                entry = self.actions[action_fqn] = JobMetrics._new_entry()
+            entry[0] += other[0]
+            entry[1] += other[1]
+            for phase, other_phase in zip(entry[2], other[2]):
+                phase[0] += other_phase[0]
+                phase[1] += other_phase[1]
+                phase[2] = max(phase[2], other_phase[2])
+                for bucket in range(3, len(phase)):
+                    phase[bucket] += other_phase[bucket]
+
+    @staticmethod
+    def _new_entry():
+        """Return an entry without any sample.
+        """
+        return [0, 0, [
+            [0, 0.0, 0.0] + [0] * (len(METRICS_BUCKETS) + 1)
+            for _ in METRICS_PHASES
+        ]]
+
 class Job(object):
     """Encapsulate a code block and is scheduled through the
     executor within the context of a procedure.
@@ -266,6 +614,10 @@ class Job(object):
         self.__jobs = []
         self.__procedures = []
         self.__action_fqn = action.__module__ + "." + action.__name__
+        self.__queued = None
+        self.__metrics = None
+        self.__pending = None
+        self.__offset = None
 
         self.__checkpoint = _checkpoint.Checkpoint(
             self.__procedure.uuid, self.__procedure.get_lockable_objects(),
@@ -345,6 +697,11 @@ class Job(object):
         assert(isinstance(procedures, list))
         self.__procedures.extend(procedures)
 
+    def mark_queued(self, when):
+        """Register when the job was put in the executor's queue.
+        """
+        self.__queued = when
+
     def _add_status(self, success, state, description, diagnosis=False):
         """Add a new status to this job.
         """
@@ -372,10 +729,16 @@ class Job(object):
         :param executor_queue: Reference to the executor's queue.
         :param scheduler_queue: Reference to the scheduler's queue.
         """
+        if JobMetrics.ENABLED:
+            self.__metrics = JobMetrics.get()
+            self.__pending = self.__metrics.pending
+            self.__offset = self.__metrics.start(self.__queued)
+
         try:
             # Execute the job.
             self._start_context(persister)
             self.__result = self.__action(*self.__args, **self.__kwargs)
+            self._add_timing(_EXECUTED)
 
         except (_errors.ServiceError, _errors.LockManagerError) as error:
             # Report that something did not go as expected but this is
@@ -403,6 +766,20 @@ class Job(object):
             # Everything went well so far.
             self._commit_context(persister, scheduler, queue)
 
+        if self.__metrics is not None:
+            self.__metrics.record(
+                self.__action_fqn, self.__status[-1]["success"] == Job.SUCCESS
+            )
+            self.__metrics = self.__pending = None
+
+    def _add_timing(self, boundary):
+        """Register when the job reached a boundary between phases if
+        metrics are being recorded. The time spent in each phase is only
+        computed when the metrics are folded.
+        """
+        if self.__pending is not None:
+            self.__pending[self.__offset + boundary] = time.time()
+
     def _start_context(self, persister):
         """Start transactional context.
         """
@@ -416,6 +793,7 @@ class Job(object):
 
         # Start the job transactional context.
         persister.begin()
+        self._add_timing(_BEGUN)
 
     def _rollback_context(self, persister):
         """Roll back transactional context.
@@ -445,19 +823,16 @@ class Job(object):
         """
         registered_jobs = False
         try:
-            # Register information on jobs created within the context of the
-            # current job.
-            _checkpoint.register(self.__jobs, True)
-
-            # Register information on procedures created within the context
-            # of the current job.
+            # Register information on jobs and procedures created within
+            # the context of the current job and that the job has finished
+            # the execution.
+            jobs = list(self.__jobs)
             for procedure in self.__procedures:
                 assert(len(procedure.get_executed_jobs()) == 0)
-                _checkpoint.register(procedure.get_registered_jobs(), True)
-
-            # Register that the job has finished the execution.
-            if self.__is_recoverable:
-                self.__checkpoint.finish()
+                jobs.extend(procedure.get_registered_jobs())
+            _checkpoint.register(
+                jobs, True, self.__checkpoint if self.__is_recoverable else None
+            )
 
             registered_jobs = True
 
@@ -466,6 +841,7 @@ class Job(object):
                 "Error in %s registering new jobs/procedures.",
                 self.__action.__name__, exc_info=error
             )
+        self._add_timing(_REGISTERED)
 
         if registered_jobs:
             committed = False
@@ -476,6 +852,7 @@ class Job(object):
                 # changes have succeeded or not. This is something that needs
                 # to be improved in the near future.
                 persister.commit()
+                self._add_timing(_COMMITTED)
 
                 # Schedule jobs and procedures created within the context
                 # of the current job.
@@ -549,14 +926,22 @@ class ExecutorThread(threading.Thread):
     """
     local_thread = threading.local()
 
-    def __init__(self, scheduler, name):
+    def __init__(self, scheduler, name, executor=None):
         """Constructor for ExecutorThread.
+
+        :param scheduler: Scheduler from which procedures are read.
+        :param name: Thread's name.
+        :param executor: Executor that owns the thread and decides when
+                         it must retire or None if the thread only stops
+                         when the Executor is shut down.
         """
         super(ExecutorThread, self).__init__(name=name)
         self.__scheduler = scheduler
+        self.__executor = executor
         self.__queue = ExecutorQueue()
         self.__persister = None
         self.__job = None
+        self.__retired = False
         self.daemon = True
 
     @staticmethod
@@ -578,6 +963,12 @@ class ExecutorThread(threading.Thread):
         assert(ExecutorThread.executor_object is not None)
         return self.__job
 
+    def retire(self):
+        """Mark the thread as retired so that it gives its persister back
+        to the pool of idle persisters when it stops.
+        """
+        self.__retired = True
+
     def run(self):
         """Run the executor thread.
 
@@ -587,7 +978,7 @@ class ExecutorThread(threading.Thread):
         _LOGGER.info("Started.")
 
         ExecutorThread.local_thread.executor_object = self
-        self.__persister = _persistence.MySQLPersister()
+        self.__persister = _persistence.get_persister()
         _persistence.PersistentMeta.init_thread(self.__persister)
 
         procedure = None
@@ -605,6 +996,11 @@ class ExecutorThread(threading.Thread):
             self.__queue.done()
 
         _persistence.PersistentMeta.deinit_thread()
+        JobMetrics.retire()
+        if self.__retired:
+            _persistence.release_persister(self.__persister)
+        self.__persister = None
+        _LOGGER.info("Stopped.")
 
     def _next_procedure(self, prv_procedure):
         """Remove the current procedure from the scheduler and get
@@ -612,7 +1008,12 @@ class ExecutorThread(threading.Thread):
         """
         assert(prv_procedure is None or prv_procedure.is_complete())
         self.__scheduler.done(prv_procedure)
-        procedure = self.__scheduler.next_procedure()
+        if prv_procedure is not None and self.__executor is not None:
+            self.__executor.record_procedure(prv_procedure)
+        if self.__executor is not None:
+            procedure = self.__executor.next_procedure(self)
+        else:
+            procedure = self.__scheduler.next_procedure()
         if procedure is not None:
             assert(not procedure.is_complete())
             assert(len(procedure.get_executed_jobs()) == 0)
@@ -650,7 +1051,9 @@ class ExecutorQueue(object):
         """
         assert(isinstance(jobs, list) or jobs is None)
         with self.__lock:
+            now = time.time()
             for job in jobs:
+                job.mark_queued(now)
                 while True:
                     try:
                         self.__queue.put(job, False)
@@ -678,8 +1081,12 @@ class Executor(Singleton):
     if they access a common lockable object which can be arbitrarily defined.
     See also the :class:`~mysql.fabric.scheduler.Scheduler`.
 
-    The number of Executor's threads cannot be dynamically changed so that it
-    cannot adapt to changes in the load.
+    The number of Executor's threads adapts to the load. When procedures
+    are waiting in the scheduler and there is no idle thread to pick them
+    up, new threads are created up to the maximum number of executors.
+    Threads that stay idle for more than the idle timeout retire until
+    only the minimum number of executors is left. The bounds can be
+    changed while the Executor is running. See :meth:`set_executor_bounds`.
 
     :raises: :class:`~mysql.fabric.errors.ExecutorError` if one tries to
              schedule a procedure when the Executor is stopped.
@@ -691,16 +1098,28 @@ class Executor(Singleton):
         self.__scheduler = _scheduler.Scheduler()
         self.__procedures_lock = threading.RLock()
         self.__procedures = WeakValueDictionary()
+        self.__history = ProcedureHistory()
         self.__threads_lock = threading.RLock()
         self.__executors = []
         self.__number_executors = 1
+        self.__max_executors = 1
+        self.__idle_executors = 0
+        self.__idle_timeout = DEFAULT_IDLE_TIMEOUT
+        self.__thread_number = 0
+        self.__coalescing = {}
+        self.__coalescing_keys = {}
+        self.__coalesced = [0] * len(_scheduler.PRIORITY_CLASSES)
 
     def set_number_executors(self, number_executors):
         """Set number of concurrent executors.
+
+        This is the minimum number of executors. The maximum number is
+        raised if it is lower.
         """
         with self.__threads_lock:
             self._assert_not_running()
             self.__number_executors = number_executors
+            self.__max_executors = max(self.__max_executors, number_executors)
 
     def get_number_executors(self):
         """Get number of concurrent executors.
@@ -708,6 +1127,75 @@ class Executor(Singleton):
         with self.__threads_lock:
             return self.__number_executors
 
+    def get_max_executors(self):
+        """Get maximum number of concurrent executors.
+        """
+        with self.__threads_lock:
+            return self.__max_executors
+
+    def set_executor_bounds(self, min_executors, max_executors,
+                            idle_timeout=None):
+        """Set the minimum and maximum number of concurrent executors.
+
+        This may be called while the Executor is running. If the minimum
+        is raised, threads are immediately created. If the maximum is
+        lowered, threads in excess retire when they become idle.
+
+        :param min_executors: Minimum number of executors.
+        :param max_executors: Maximum number of executors.
+        :param idle_timeout: Time in seconds an idle thread waits for a
+                             procedure before retiring or None to keep
+                             the current value.
+        """
+        min_executors = int(min_executors)
+        max_executors = int(max_executors)
+        if min_executors < 1 or max_executors < min_executors:
+            raise _errors.ExecutorError(
+                "Invalid number of executors: minimum (%s) and maximum (%s)."
+                % (min_executors, max_executors)
+            )
+        with self.__threads_lock:
+            self.__number_executors = min_executors
+            self.__max_executors = max_executors
+            if idle_timeout is not None:
+                self.__idle_timeout = max(float(idle_timeout), MIN_IDLE_TIMEOUT)
+            if self.__executors:
+                _LOGGER.info(
+                    "Setting between %s and %s executor(s).",
+                    min_executors, max_executors
+                )
+                self._adjust_executors()
+
+    def get_executor_statistics(self):
+        """Return information on the executor threads.
+
+        :return: Dictionary with the minimum and maximum number of
+                 executors, the number of running and idle threads
+                 and the number of procedures waiting for a thread.
+        """
+        with self.__threads_lock:
+            return {
+                "min_executors" : self.__number_executors,
+                "max_executors" : self.__max_executors,
+                "running" : len(self.__executors),
+                "idle" : self.__idle_executors,
+                "pending" : self.__scheduler.get_number_pending(),
+            }
+
+    def get_scheduler_statistics(self):
+        """Return how long procedures waited for an executor thread per
+        priority class.
+
+        See :meth:`~mysql.fabric.scheduler.Scheduler.get_statistics`.
+        """
+        with self.__threads_lock:
+            statistics = self.__scheduler.get_statistics()
+            for priority_class, name in \
+                enumerate(_scheduler.PRIORITY_CLASSES):
+                statistics[name]["coalesced"] = \
+                    self.__coalesced[priority_class]
+            return statistics
+
     def start(self):
         """Start the executor.
         """
@@ -717,18 +1205,83 @@ class Executor(Singleton):
             _LOGGER.info("Starting Executor.")
 
             _LOGGER.info("Setting %s executor(s).", self.__number_executors)
-            for thread_number in range(0, self.__number_executors):
-                thread_name = "Executor-{0}".format(thread_number)
-                executor = ExecutorThread(self.__scheduler, thread_name)
+            for _ in range(0, self.__number_executors):
+                self._start_executor()
+
+            _LOGGER.info("Executor started.")
+
+    def next_procedure(self, executor):
+        """Wait for the next procedure to be executed by an executor
+        thread.
+
+        If the thread does not find any procedure within the idle timeout
+        and there are more threads than the minimum, it retires.
+
+        :param executor: Reference to the ExecutorThread.
+        :return: Procedure or None if the thread must stop.
+        """
+        with self.__threads_lock:
+            self.__idle_executors += 1
+            self._adjust_executors()
+        try:
+            while True:
                 try:
-                    executor.start()
-                except Exception as error:
-                    _LOGGER.error("Error starting thread (%s): (%s).",
-                        thread_name, error
+                    procedure = self.__scheduler.next_procedure(
+                        timeout=self.__idle_timeout
                     )
-                self.__executors.append(executor)
+                    break
+                except Queue.Empty:
+                    with self.__threads_lock:
+                        if executor in self.__executors and \
+                            len(self.__executors) > self.__number_executors:
+                            self.__executors.remove(executor)
+                            executor.retire()
+                            _LOGGER.info("Retired idle executor (%s).",
+                                         executor.name)
+                            return None
+        finally:
+            with self.__threads_lock:
+                self.__idle_executors -= 1
 
-            _LOGGER.info("Executor started.")
+        if procedure is not None:
+            with self.__threads_lock:
+                key = self.__coalescing_keys.pop(procedure, None)
+                if key is not None:
+                    assert(self.__coalescing[key] is procedure)
+                    del self.__coalescing[key]
+                self._adjust_executors()
+        return procedure
+
+    def _adjust_executors(self):
+        """Create threads if there are procedures waiting in the scheduler
+        and no idle thread to execute them or if there are fewer threads
+        than the minimum. This must be called with the threads' lock held.
+        """
+        if not self.__executors:
+            return
+        pending = self.__scheduler.get_number_pending()
+        missing = max(
+            self.__number_executors - len(self.__executors),
+            min(pending - self.__idle_executors,
+                self.__max_executors - len(self.__executors))
+        )
+        for _ in range(0, missing):
+            self._start_executor()
+
+    def _start_executor(self):
+        """Create and start an executor thread. This must be called with
+        the threads' lock held.
+        """
+        thread_name = "Executor-{0}".format(self.__thread_number)
+        self.__thread_number += 1
+        executor = ExecutorThread(self.__scheduler, thread_name, self)
+        try:
+            executor.start()
+        except Exception as error:
+            _LOGGER.error("Error starting thread (%s): (%s).",
+                thread_name, error
+            )
+        self.__executors.append(executor)
 
     def shutdown(self):
         """Shut down the executor.
@@ -783,7 +1336,8 @@ class Executor(Singleton):
         return procedures[0]
 
     def enqueue_procedures(self, within_procedure, actions,
-                           lockable_objects=None):
+                           lockable_objects=None, priority_class=None,
+                           coalesce=False):
         """Schedule a set of procedures.
 
         :within_procedure: Define if a new procedure will be created or not.
@@ -794,20 +1348,39 @@ class Executor(Singleton):
                        keyword arguments)}, ...]
         :param lockable_objects: Set of objects to be locked by the concurrency
                                  control mechanism.
+        :param priority_class: Priority class of new procedures or None
+                               for administrative ones. It is ignored if
+                               jobs are created within the current
+                               procedure.
+        :param coalesce: Whether an action that is identical to the one of
+                         a procedure which has not started yet, i.e. same
+                         callable, arguments and lockable objects, should
+                         be served by that procedure instead of a new one.
+                         The caller gets a reference to the procedure that
+                         already exists and so the same result. This only
+                         applies to procedures created outside a job. It
+                         may also be a function that is called with the
+                         action's arguments and returns the key that
+                         identifies the action instead of all of them.
         :return: Return a set of procedure objects.
         """
         if not len(actions):
             return []
 
+        if priority_class is None:
+            priority_class = _scheduler.PRIORITY_ADMIN
+
         with self.__threads_lock:
             self._assert_running()
 
             return self._do_enqueue_procedures(
-                within_procedure, actions, lockable_objects
+                within_procedure, actions, lockable_objects, priority_class,
+                coalesce
             )
 
     def _do_enqueue_procedures(self, within_procedure, actions,
-                               lockable_objects):
+                               lockable_objects, priority_class,
+                               coalesce=False):
         """Schedule a set of procedures.
         """
         procedures = None
@@ -817,13 +1390,29 @@ class Executor(Singleton):
                 raise _errors.ProgrammingError(
                     "One can only create a new job from a job."
                 )
-            procedures, jobs = self._create_jobs(actions, lockable_objects)
-            assert(len(set(procedures)) == len(set(jobs)))
-            # There is no need to catch exceptions at this point. They will
-            # be automatically caught by the caller which is usually the
-            # XML-RPC session thread.
-            _checkpoint.register(jobs, False)
-            self.__scheduler.enqueue_procedures(procedures)
+            coalesced = []
+            keys = [None] * len(actions)
+            if coalesce:
+                coalesced, actions, keys = self._coalesce_actions(
+                    actions, lockable_objects, priority_class, coalesce
+                )
+            procedures = []
+            if actions:
+                procedures, jobs = self._create_jobs(
+                    actions, lockable_objects, priority_class=priority_class
+                )
+                assert(len(set(procedures)) == len(set(jobs)))
+                # There is no need to catch exceptions at this point. They
+                # will be automatically caught by the caller which is
+                # usually the XML-RPC session thread.
+                _checkpoint.register(jobs, False)
+                for key, job in zip(keys, jobs):
+                    if key is not None and key not in self.__coalescing:
+                        self.__coalescing[key] = job.procedure
+                        self.__coalescing_keys[job.procedure] = key
+                self.__scheduler.enqueue_procedures(procedures)
+                self._adjust_executors()
+            procedures = coalesced + procedures
         else:
             current_job = executor.current_job
             current_procedure = current_job.procedure
@@ -836,7 +1425,9 @@ class Executor(Singleton):
                 )
                 current_job.append_jobs(jobs)
             else:
-                procedures, jobs = self._create_jobs(actions, lockable_objects)
+                procedures, jobs = self._create_jobs(
+                    actions, lockable_objects, priority_class=priority_class
+                )
                 assert(len(set(procedures)) == len(set(jobs)))
                 current_job.append_procedures(procedures)
         assert(procedures is not None)
@@ -877,6 +1468,7 @@ class Executor(Singleton):
             actions, lockable_objects, proc_uuid
         )
         self.__scheduler.enqueue_procedures(procedures)
+        self._adjust_executors()
         assert(set([job.procedure for job in jobs]) == set(procedures))
         assert(set([job.procedure.uuid for job in jobs]) ==
                set([procedure.uuid for procedure in procedures])
@@ -886,8 +1478,10 @@ class Executor(Singleton):
 
     def remove_procedure(self, proc_uuid):
         """Although references are store into a WeakValueDictionary, this
-        method forces its removal.
+        method forces its removal. The procedure's record is also removed
+        from the history.
         """
+        self.__history.remove(proc_uuid)
         try:
             assert(isinstance(proc_uuid, _uuid.UUID))
             with self.__procedures_lock:
@@ -899,6 +1493,10 @@ class Executor(Singleton):
 
     def get_procedure(self, proc_uuid):
         """Retrieve a reference to a procedure.
+
+        If there is no reference to a procedure anymore, its record in
+        the history of finished procedures is returned. See
+        :class:`ProcedureHistory`.
         """
         _LOGGER.debug("Checking procedure (%s).", proc_uuid)
         try:
@@ -906,10 +1504,20 @@ class Executor(Singleton):
             with self.__procedures_lock:
                 procedure = self.__procedures[proc_uuid]
         except (KeyError, ValueError):
-            procedure = None
+            procedure = self.__history.get(proc_uuid)
 
         return procedure
 
+    def record_procedure(self, procedure):
+        """Record a finished procedure in the history.
+        """
+        self.__history.add(procedure)
+
+    def get_history_statistics(self):
+        """Return statistics on the history of finished procedures.
+        """
+        return self.__history.get_statistics()
+
     def wait_for_procedure(self, procedure):
         """Wait until the procedure finishes the execution of all
         its jobs.
@@ -936,30 +1544,98 @@ class Executor(Singleton):
         if self.__executors:
             raise _errors.ExecutorError("Executor is already running.")
 
-    def _create_jobs(self, actions, lockable_objects, proc_uuid=None):
+    def _coalesce_actions(self, actions, lockable_objects, priority_class,
+                          coalesce):
+        """Find the procedures which have not started yet and execute
+        the same actions. This must be called with the threads' lock held.
+        See :meth:`enqueue_procedures`.
+
+        :return: List with the procedures found, list with the actions
+                 that need new procedures and list with the keys that
+                 identify these actions.
+        """
+        coalesced = []
+        remaining = []
+        keys = []
+        objects = frozenset(lockable_objects or ())
+        for action in actions:
+            do_action, _, args, kwargs = action["action"]
+            if callable(coalesce):
+                key = (do_action, coalesce(*args, **kwargs), objects)
+            else:
+                key = (do_action, tuple(args),
+                       tuple(sorted(kwargs.items())), objects)
+            try:
+                procedure = self.__coalescing.get(key)
+            except TypeError:
+                # Arguments that cannot be hashed are never coalesced.
+                key = procedure = None
+            if procedure is not None:
+                _LOGGER.debug(
+                    "Coalesced action (%s) into procedure (%s).",
+                    do_action, procedure.uuid
+                )
+                self.__coalesced[priority_class] += 1
+                coalesced.append(procedure)
+            else:
+                remaining.append(action)
+                keys.append(key)
+        return coalesced, remaining, keys
+
+    def _create_jobs(self, actions, lockable_objects, proc_uuid=None,
+                     priority_class=_scheduler.PRIORITY_ADMIN):
         """Create a set of jobs.
         """
         procedures = set()
         jobs = []
         for number in range(0, len(actions)):
             job = self._create_job(
-                actions[number], lockable_objects, proc_uuid
+                actions[number], lockable_objects, proc_uuid, priority_class
             )
             jobs.append(job)
             procedures.add(job.procedure)
         return list(procedures), jobs
 
-    def _create_job(self, action, lockable_objects, proc_uuid=None):
+    def _create_job(self, action, lockable_objects, proc_uuid=None,
+                    priority_class=_scheduler.PRIORITY_ADMIN):
         """Create a job.
         """
         procedure = None
         with self.__procedures_lock:
             procedure = self.__procedures.get(proc_uuid, None)
             if procedure is None:
-                procedure = Procedure(proc_uuid, lockable_objects)
+                procedure = Procedure(
+                    proc_uuid, lockable_objects, priority_class
+                )
                 self.__procedures[procedure.uuid] = procedure
 
         assert(procedure is not None)
         do_action, description, args, kwargs = action["action"]
         job_uuid = action["job"]
         return Job(procedure, do_action, description, args, kwargs, job_uuid)
+
+def configure(config):
+    """Set configuration values.
+    """
+    try:
+        value = config.get("executor", "metrics")
+        JobMetrics.ENABLED = value.lower() != "no"
+    except (_config.NoOptionError, _config.NoSectionError):
+        pass
+
+    for option, attribute, convert in (
+        ("history_size", "SIZE", int),
+        ("history_age", "AGE", float),
+        ("history_tracebacks", "TRACEBACKS", int)):
+        try:
+            value = convert(config.get("executor", option))
+            minimum = getattr(ProcedureHistory, "MIN_" + attribute)
+            if value < minimum:
+                _LOGGER.warning(
+                    "Procedure history's %s cannot be lower than %s.",
+                    option, minimum
+                )
+                value = minimum
+            setattr(ProcedureHistory, "MAX_" + attribute, value)
+        except (_config.NoOptionError, _config.NoSectionError, ValueError):
+            pass
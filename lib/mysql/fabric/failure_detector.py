@@ -137,6 +137,20 @@ class FailureDetector(object):
         """
         self.__check = False
 
+    @staticmethod
+    def _is_alive(server, detection_timeout):
+        """Check whether a server is alive using recent health information
+        if there is any.
+        """
+        from mysql.fabric.server import MySQLServer
+
+        health = HealthCache.get(server.uuid)
+        if health is not None:
+            return health["is_alive"]
+        alive = MySQLServer.is_alive(server, detection_timeout)
+        HealthCache.set(server.uuid, {"is_alive" : alive})
+        return alive
+
     def _run(self):
         """Function that verifies servers' availabilities.
         """
@@ -145,6 +159,7 @@ class FailureDetector(object):
             MySQLServer,
             ConnectionManager,
         )
+        from mysql.fabric.error_log import ErrorLog
 
         ignored_status = [MySQLServer.FAULTY]
         quarantine = {}
@@ -158,11 +173,13 @@ class FailureDetector(object):
         while self.__check:
             try:
                 unreachable = set()
-                group = Group.fetch(self.__group_id)
+                group, servers = Group.fetch_with_servers(
+                    [self.__group_id]
+                ).get(self.__group_id, (None, []))
                 if group is not None:
-                    for server in group.servers():
+                    for server in servers:
                         if server.status in ignored_status or \
-                            MySQLServer.is_alive(server, detection_timeout):
+                            self._is_alive(server, detection_timeout):
                             if server.status == MySQLServer.FAULTY:
                                 connection_manager.kill_connections(server)
                             continue
@@ -194,10 +211,16 @@ class FailureDetector(object):
                             # a new one never promoted.
                             server.status = MySQLServer.FAULTY
                             connection_manager.kill_connections(server)
-                            
+
+                            # The report's procedure does not register
+                            # the failure in the error log.
+                            reporter = threading.current_thread().name
+                            ErrorLog.add(
+                                server, get_time(), reporter,
+                                MySQLServer.FAULTY
+                            )
                             procedures = trigger("REPORT_FAILURE", None,
-                                str(server.uuid),
-                                threading.current_thread().name,
+                                str(server.uuid), reporter,
                                 MySQLServer.FAULTY, False
                             )
                             executor = _executor.Executor()
@@ -218,6 +241,56 @@ class FailureDetector(object):
         _persistence.deinit_thread()
 
 
+class HealthCache(object):
+    """Short-lived cache with servers' health information.
+
+    It is shared by the failure detector and the health commands so that
+    a server which has just been checked is not contacted again within
+    :attr:`_TTL` seconds. Each entry is a dictionary that has at least the
+    `is_alive` key.
+    """
+    LOCK = threading.Lock()
+    ENTRIES = {}
+
+    _MIN_TTL = 0.0
+    _TTL = _DEFAULT_TTL = 1.0
+
+    @staticmethod
+    def get(server_uuid):
+        """Return the health information of a server if it is recent.
+
+        :param server_uuid: Server's uuid.
+        :return: Dictionary with health information or None.
+        """
+        with HealthCache.LOCK:
+            entry = HealthCache.ENTRIES.get(str(server_uuid))
+        if entry is None:
+            return None
+        health, cached = entry
+        if time.time() - cached > HealthCache._TTL:
+            return None
+        return health
+
+    @staticmethod
+    def set(server_uuid, health):
+        """Store the health information of a server.
+
+        :param server_uuid: Server's uuid.
+        :param health: Dictionary with health information.
+        """
+        if HealthCache._TTL <= 0:
+            return
+        with HealthCache.LOCK:
+            HealthCache.ENTRIES[str(server_uuid)] = (health, time.time())
+
+    @staticmethod
+    def clear():
+        """Remove all entries.
+        """
+        with HealthCache.LOCK:
+            HealthCache.ENTRIES = {}
+
+
 def configure(config):
     """Set configuration values.
     """
@@ -258,3 +331,16 @@ def configure(config):
         FailureDetector._DETECTION_TIMEOUT = int(detection_timeout)
     except (_config.NoOptionError, _config.NoSectionError, ValueError):
         pass
+
+    try:
+        health_cache_ttl = \
+            float(config.get("failure_tracking", "health_cache_ttl"))
+        if health_cache_ttl < HealthCache._MIN_TTL:
+            _LOGGER.warning(
+                "Health cache TTL cannot be lower than %s.",
+                HealthCache._MIN_TTL
+            )
+            health_cache_ttl = HealthCache._MIN_TTL
+        HealthCache._TTL = float(health_cache_ttl)
+    except (_config.NoOptionError, _config.NoSectionError, ValueError):
+        pass
@@ -39,6 +39,7 @@ import logging
 from mysql.fabric.server import Group,  MySQLServer
 import mysql.fabric.replication as _replication
 import mysql.fabric.errors as _errors
+import mysql.fabric.utils as _utils
 
 _LOGGER = logging.getLogger(__name__)
 
@@ -48,6 +49,9 @@ GROUP_MASTER_NOT_RUNNING = "Group master not running %s"
 GROUP_REPLICATION_SERVER_ERROR = \
     "Error accessing server (%s) while configuring group replication. %s."
 
+#Maximum number of slave groups that are configured at the same time.
+MAX_GROUP_REPLICATION_WORKERS = 16
+
 def start_group_slaves(master_group_id):
     """Start the slave groups for the given master group. The
     method will be used in the events that requires, a group, that
@@ -55,8 +59,13 @@ def start_group_slaves(master_group_id):
     enable shard, enable shard requires that a group start all
     the slaves that are registered with it.
 
+    The slave groups are configured concurrently, so an unreachable
+    slave group does not delay the others.
+
     :param master_group_id: The master group ID. The ID belongs to the master
                             whose slaves need to be started.
+    :return: Dictionary that maps the slave groups' ids to the error found
+             while configuring them or None.
     """
     # Fetch the master group corresponding to the master group
     # ID.
@@ -67,26 +76,47 @@ def start_group_slaves(master_group_id):
 
     # Setup replication with masters of the groups registered as master
     # groups. master_group.slave_group_ids contains the list of the group
-    # IDs that are slaves to this master. Iterate through this list and start
-    # replication with the registered slaves.
+    # IDs that are slaves to this master. Fetch the servers involved in
+    # replication within this thread, as it owns the state store's
+    # connection, and configure them concurrently.
+    outcomes = {}
+    replications = []
     for slave_group_id in master_group.slave_group_ids:
-        slave_group = Group.fetch(slave_group_id)
-        # Setup replication with the slave group.
         try:
-            setup_group_replication(master_group_id, slave_group.group_id)
-        except (_errors.GroupError, _errors.DatabaseError) as error:
-            _LOGGER.warning(
-                "Error while configuring group replication between "
-                "(%s) and (%s): (%s).", master_group_id, slave_group.group_id,
-                error
+            master, slave = _fetch_group_replication_servers(
+                master_group_id, slave_group_id
             )
+            replications.append((slave_group_id, master, slave))
+        except _errors.GroupError as error:
+            outcomes[slave_group_id] = error
+
+    results = _utils.run_concurrently(
+        [_configure_group_replication_function(master, slave)
+         for _, master, slave in replications],
+        MAX_GROUP_REPLICATION_WORKERS
+    )
+    for (slave_group_id, _, _), (_, error) in zip(replications, results):
+        outcomes[slave_group_id] = error
+        if error is None:
+            _add_group_replication_references(master_group_id, slave_group_id)
+
+    _check_group_replication_outcomes(
+        "Error while configuring group replication between (%s) and (%s): "
+        "(%s).", master_group_id, outcomes
+    )
+    return outcomes
 
 def stop_group_slaves(master_group_id):
     """Stop the group slaves for the given master group. This will be used
     for use cases that required all the slaves replicating from this group to
     be stopped. An example use case would be disabling a shard.
 
+    The slave groups are stopped concurrently, so an unreachable slave
+    group does not delay the others.
+
     :param master_group_id: The master group ID.
+    :return: Dictionary that maps the slave groups' ids to the error found
+             while stopping them or None.
     """
     master_group = Group.fetch(master_group_id)
     if master_group is None:
@@ -95,6 +125,8 @@ def stop_group_slaves(master_group_id):
         (master_group_id, ))
 
     # Stop the replication on all of the registered slaves for the group.
+    outcomes = {}
+    slaves = []
     for slave_group_id in master_group.slave_group_ids:
 
         slave_group = Group.fetch(slave_group_id)
@@ -110,21 +142,68 @@ def stop_group_slaves(master_group_id):
             # replication.
             continue
 
-        try:
-            slave_group_master.connect()
-            _replication.stop_slave(slave_group_master, wait=True)
-            # Reset the slave to remove the reference of the master so
-            # that when the server is used as a slave next it does not
-            # complaint about having a different master.
-            _replication.reset_slave(slave_group_master, clean=True)
-        except _errors.DatabaseError as error:
-            # Server is not accessible, unable to connect to the server.
-            _LOGGER.warning(
-                "Error while unconfiguring group replication between "
-                "(%s) and (%s): (%s).", master_group_id, slave_group.group_id,
-                error
-            )
+        slaves.append((slave_group_id, slave_group_master))
+
+    results = _utils.run_concurrently(
+        [_unconfigure_group_replication_function(slave)
+         for _, slave in slaves],
+        MAX_GROUP_REPLICATION_WORKERS
+    )
+    for (slave_group_id, _), (_, error) in zip(slaves, results):
+        outcomes[slave_group_id] = error
+
+    _check_group_replication_outcomes(
+        "Error while unconfiguring group replication between (%s) and (%s): "
+        "(%s).", master_group_id, outcomes
+    )
+    return outcomes
+
+def _check_group_replication_outcomes(message, master_group_id, outcomes):
+    """Report the errors found while changing replication between a master
+    group and its slave groups.
+
+    Errors related to groups or servers are just logged, so that the
+    remaining groups are not affected. Any other error is raised after
+    all slave groups have been processed.
+
+    :param message: Message used to report errors.
+    :param master_group_id: The master group ID.
+    :param outcomes: Dictionary that maps the slave groups' ids to the
+                     error found while processing them or None.
+    """
+    unexpected = None
+    for slave_group_id, error in outcomes.items():
+        if error is None:
             continue
+        if not isinstance(error, (_errors.GroupError, _errors.DatabaseError)):
+            unexpected = error
+        _LOGGER.warning(message, master_group_id, slave_group_id, error)
+    if unexpected is not None:
+        raise unexpected
+
+def _unconfigure_group_replication_function(slave_group_master):
+    """Return a function that stops and resets replication on the master
+    of a slave group.
+    """
+    def _unconfigure():
+        """Stop and reset replication on the master of a slave group.
+        """
+        slave_group_master.connect()
+        _replication.stop_slave(slave_group_master, wait=True)
+        # Reset the slave to remove the reference of the master so
+        # that when the server is used as a slave next it does not
+        # complaint about having a different master.
+        _replication.reset_slave(slave_group_master, clean=True)
+    return _unconfigure
+
+def _configure_group_replication_function(master, slave):
+    """Return a function that sets up replication between two servers.
+    """
+    def _configure():
+        """Set up replication between two servers.
+        """
+        _configure_group_replication(master, slave)
+    return _configure
 
 def stop_group_slave(group_master_id,  group_slave_id,  clear_ref):
     """Stop the slave on the slave group. This utility method is the
@@ -187,6 +266,21 @@ def setup_group_replication(group_master_id,  group_slave_id):
     :param group_slave_id: The group whose master will act as the slave in the
                                       replication setup.
     """
+    master, slave = _fetch_group_replication_servers(
+        group_master_id, group_slave_id
+    )
+    _configure_group_replication(master, slave)
+    _add_group_replication_references(group_master_id, group_slave_id)
+
+def _fetch_group_replication_servers(group_master_id,  group_slave_id):
+    """Fetch the masters of the two groups involved in replication.
+
+    :param group_master_id: The group whose master will act as the master
+                            in the replication setup.
+    :param group_slave_id: The group whose master will act as the slave in
+                           the replication setup.
+    :return: Tuple with the master and the slave servers.
+    """
     group_master = Group.fetch(group_master_id)
     group_slave = Group.fetch(group_slave_id)
 
@@ -227,25 +321,36 @@ def setup_group_replication(group_master_id,  group_slave_id):
         raise _errors.GroupError \
         (GROUP_MASTER_NOT_RUNNING % (group_master.group_id, ))
 
-    try:
-        master.connect()
-    except _errors.DatabaseError as error: 
-        #Server is not accessible, unable to connect to the server.
-        raise _errors.GroupError(
-            GROUP_REPLICATION_SERVER_ERROR %  (group_slave.master, error)
-        )
-
     if not server_running(slave):
         #The server is already down. We cannot connect to it to setup
         #replication.
         raise _errors.GroupError \
             (GROUP_MASTER_NOT_RUNNING % (group_slave.group_id, ))
 
+    return master, slave
+
+def _configure_group_replication(master, slave):
+    """Make the slave replicate from the master.
+
+    It does not access the state store and may be called concurrently
+    for different slaves.
+
+    :param master: Server that will act as the master.
+    :param slave: Server that will act as the slave.
+    """
+    try:
+        master.connect()
+    except _errors.DatabaseError as error:
+        #Server is not accessible, unable to connect to the server.
+        raise _errors.GroupError(
+            GROUP_REPLICATION_SERVER_ERROR %  (master.uuid, error)
+        )
+
     try:
         slave.connect()
     except _errors.DatabaseError as error:
         raise _errors.GroupError(
-            GROUP_REPLICATION_SERVER_ERROR %  (group_master.master, error)
+            GROUP_REPLICATION_SERVER_ERROR %  (slave.uuid, error)
         )
 
     _replication.stop_slave(slave, wait=True)
@@ -257,6 +362,14 @@ def setup_group_replication(group_master_id,  group_slave_id):
 
     _replication.start_slave(slave, wait=True)
 
+def _add_group_replication_references(group_master_id,  group_slave_id):
+    """Register the groups involved in replication in each other.
+
+    :param group_master_id: The id of the master group.
+    :param group_slave_id: The id of the slave group.
+    """
+    group_master = Group.fetch(group_master_id)
+    group_slave = Group.fetch(group_slave_id)
     try:
         group_master.add_slave_group_id(group_slave_id)
         group_slave.add_master_group_id(group_master_id)
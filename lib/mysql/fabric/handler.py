@@ -16,7 +16,9 @@
 #
 """Methods and classes to store Fabric's log entries.
 """
+import collections
 import logging
+import threading
 
 from mysql.fabric import (
     persistence as _persistence,
@@ -27,6 +29,10 @@ from mysql.fabric.utils import (
     get_time_from_timestamp,
 )
 
+from mysql.fabric.log_partitions import (
+    LogPartitions,
+)
+
 _LOGGER = logging.getLogger(__name__)
 
 _CREATE_FABRIC_LOG = (
@@ -86,6 +92,14 @@ _INSERT_FABRIC_LOG = (
     "message, category, type) VALUES(%s, %s, %s, %s, %s, %s)"
 )
 
+#The placeholder is replaced by one _FABRIC_LOG_ROW per entry.
+_INSERT_FABRIC_LOGS = (
+    "INSERT INTO log (subject, reported, reporter, "
+    "message, category, type) VALUES %s"
+)
+
+_FABRIC_LOG_ROW = "(%s, %s, %s, %s, %s, %s)"
+
 
 class MySQLFilter(logging.Filter):
     """Filter records that are not supposed to be written to the logging
@@ -173,18 +187,55 @@ class MySQLHandler(logging.Handler, _persistence.Persistable):
 
     TYPES = [ START, STOP, ABORT, PROMOTE, DEMOTE ]
 
+    # Entries are written by a background writer once it is started by
+    # :meth:`start_writer`. Until then, or if it is stopped, they are
+    # synchronously written by the thread that logs them.
+    MIN_QUEUE_SIZE = 1
+    QUEUE_SIZE = _DEFAULT_QUEUE_SIZE = 10000
+    MIN_FLUSH_INTERVAL = 0.01
+    FLUSH_INTERVAL = _DEFAULT_FLUSH_INTERVAL = 1.0
+    MAX_BATCH_SIZE = 500
+    SHUTDOWN_TIMEOUT = 10.0
+
+    # What is discarded when an entry is logged and the queue is full.
+    DROP_NEWEST = "drop_newest"
+    DROP_OLDEST = "drop_oldest"
+    OVERFLOW_POLICIES = [ DROP_NEWEST, DROP_OLDEST ]
+    OVERFLOW = DROP_NEWEST
+
+    QUEUE_LOCK = threading.Condition()
+    QUEUE = collections.deque()
+    WRITER = None
+    STOPPING = False
+
+    # Number of entries written, dropped because the queue was full and
+    # lost because the writer failed to write them.
+    WRITTEN = 0
+    DROPPED = 0
+    FAILED = 0
+
     @staticmethod
     def create(persister=None):
         """Create the objects(tables) that will store Fabric's logs.
 
+        If the log tables are partitioned, old entries are removed by
+        dropping partitions instead of by an event. See
+        :class:`~mysql.fabric.log_partitions.LogPartitions`.
+
         :param persister: Persister to persist the object to.
         :raises: DatabaseError If the table already exists.
         """
-        persister.exec_stmt(_CREATE_FABRIC_LOG)
-        persister.exec_stmt(
-            _CREATE_EVENT_FABRIC_LOG % (MySQLHandler.PRUNE_TIME,
-            MySQLHandler.PRUNE_TIME)
-        )
+        if LogPartitions.ENABLED:
+            persister.exec_stmt(LogPartitions.partitioned_table(
+                _CREATE_FABRIC_LOG,
+                LogPartitions.retention(MySQLHandler.PRUNE_TIME)
+            ))
+        else:
+            persister.exec_stmt(_CREATE_FABRIC_LOG)
+            persister.exec_stmt(
+                _CREATE_EVENT_FABRIC_LOG % (MySQLHandler.PRUNE_TIME,
+                MySQLHandler.PRUNE_TIME)
+            )
         persister.exec_stmt(
             _CREATE_GROUP_VIEW % (
             MySQLHandler.idx_category(MySQLHandler.GROUP),
@@ -212,6 +263,133 @@ class MySQLHandler(logging.Handler, _persistence.Persistable):
             info_type)}
         )
 
+    @staticmethod
+    def add_many(rows, persister=None):
+        """Add Fabric's log entries in a single statement.
+
+        :param rows: List of tuples with the parameters of :meth:`add`
+                     except the persister.
+        """
+        persister.exec_stmt(
+            _INSERT_FABRIC_LOGS % (", ".join([_FABRIC_LOG_ROW] * len(rows)), ),
+            {"params" : tuple(value for row in rows for value in row)}
+        )
+
+    @staticmethod
+    def start_writer():
+        """Start the background writer.
+        """
+        with MySQLHandler.QUEUE_LOCK:
+            if MySQLHandler.WRITER is not None:
+                return
+            writer = threading.Thread(
+                target=MySQLHandler._run_writer, name="LogWriter"
+            )
+            writer.daemon = True
+            MySQLHandler.STOPPING = False
+            MySQLHandler.WRITER = writer
+            writer.start()
+
+    @staticmethod
+    def shutdown_writer():
+        """Stop the background writer after it has written all queued
+        entries. Entries logged afterwards are synchronously written.
+        """
+        with MySQLHandler.QUEUE_LOCK:
+            writer = MySQLHandler.WRITER
+            if writer is None:
+                return
+            MySQLHandler.STOPPING = True
+            MySQLHandler.QUEUE_LOCK.notify_all()
+        writer.join(MySQLHandler.SHUTDOWN_TIMEOUT)
+        with MySQLHandler.QUEUE_LOCK:
+            if writer.is_alive():
+                _LOGGER.warning(
+                    "Log writer did not write (%s) entries within (%s) "
+                    "seconds.", len(MySQLHandler.QUEUE),
+                    MySQLHandler.SHUTDOWN_TIMEOUT
+                )
+            MySQLHandler.WRITER = None
+
+    @staticmethod
+    def get_statistics():
+        """Return the number of entries waiting to be written, written,
+        dropped because the queue was full and lost because they could not
+        be written.
+        """
+        with MySQLHandler.QUEUE_LOCK:
+            return (
+                len(MySQLHandler.QUEUE), MySQLHandler.WRITTEN,
+                MySQLHandler.DROPPED, MySQLHandler.FAILED
+            )
+
+    @staticmethod
+    def _enqueue(row):
+        """Queue an entry to be written by the background writer.
+
+        :return: False if there is no writer, True otherwise.
+        """
+        with MySQLHandler.QUEUE_LOCK:
+            if MySQLHandler.WRITER is None or MySQLHandler.STOPPING:
+                return False
+            queue = MySQLHandler.QUEUE
+            if len(queue) >= MySQLHandler.QUEUE_SIZE:
+                MySQLHandler.DROPPED += 1
+                if MySQLHandler.OVERFLOW == MySQLHandler.DROP_NEWEST:
+                    return True
+                queue.popleft()
+            queue.append(row)
+            if len(queue) == MySQLHandler.MAX_BATCH_SIZE:
+                MySQLHandler.QUEUE_LOCK.notify_all()
+            return True
+
+    @staticmethod
+    def _run_writer():
+        """Write the queued entries in batches until the writer is stopped
+        and there is nothing left to write.
+
+        A batch that cannot be written is dropped and the writer carries
+        on with the next one. If the writer exits for any other reason,
+        entries are synchronously written from then on.
+        """
+        queue = MySQLHandler.QUEUE
+        try:
+            _persistence.init_thread()
+            while True:
+                with MySQLHandler.QUEUE_LOCK:
+                    if len(queue) < MySQLHandler.MAX_BATCH_SIZE and \
+                        not MySQLHandler.STOPPING:
+                        MySQLHandler.QUEUE_LOCK.wait(
+                            MySQLHandler.FLUSH_INTERVAL
+                        )
+                    if not queue and MySQLHandler.STOPPING:
+                        break
+                    rows = [
+                        queue.popleft() for _ in
+                        range(min(len(queue), MySQLHandler.MAX_BATCH_SIZE))
+                    ]
+                if not rows:
+                    continue
+                try:
+                    MySQLHandler.add_many(rows)
+                    written, failed = len(rows), 0
+                except Exception as error:
+                    _LOGGER.warning(
+                        "Error writing (%s) log entries: (%s).", len(rows),
+                        error
+                    )
+                    written, failed = 0, len(rows)
+                with MySQLHandler.QUEUE_LOCK:
+                    MySQLHandler.WRITTEN += written
+                    MySQLHandler.FAILED += failed
+            _persistence.deinit_thread()
+        finally:
+            with MySQLHandler.QUEUE_LOCK:
+                if MySQLHandler.WRITER is threading.current_thread():
+                    MySQLHandler.WRITER = None
+                MySQLHandler.FAILED += len(queue)
+                queue.clear()
+
     @staticmethod
     def group_view(group_id=None, persister=None):
         """Fetch information on a Group.
@@ -286,6 +464,9 @@ class MySQLHandler(logging.Handler, _persistence.Persistable):
     def emit(self, record):
         """Write an entry to the logging table if the extern key was provided as
         part of the extra dictionary and yields True.
+
+        The entry is queued if the background writer is running and
+        written by the calling thread otherwise.
         """
         try:
             info_subject = record.subject
@@ -302,18 +483,21 @@ class MySQLHandler(logging.Handler, _persistence.Persistable):
             except AttributeError:
                 info_reported = get_time_from_timestamp(record.created)
 
-            MySQLHandler.add(
+            row = (
                 info_subject, info_reported, info_reporter,
                 self.format(record), info_category, info_type
             )
+            if not MySQLHandler._enqueue(row):
+                MySQLHandler.add(*row)
         except (KeyboardInterrupt, SystemExit):
             raise
         except:
             self.handleError(record)
 
     def flush(self):
-        """Flush information to the logging table. There is no need to do
-        anything here.
+        """Flush information to the logging table. Queued entries are
+        written by the background writer and only flushed when it is
+        stopped. See :meth:`shutdown_writer`.
         """
         pass
 
@@ -348,3 +532,31 @@ def configure(config):
         MySQLHandler.PRUNE_TIME = int(prune_time)
     except (_config.NoOptionError, _config.NoSectionError, ValueError):
         pass
+
+    for option, attribute, cast in (
+        ("queue_size", "QUEUE_SIZE", int),
+        ("flush_interval", "FLUSH_INTERVAL", float),
+    ):
+        try:
+            value = cast(config.get("logging", option))
+            minimum = getattr(MySQLHandler, "MIN_" + attribute)
+            if value < minimum:
+                _LOGGER.warning(
+                    "Option (%s) cannot be lower than %s.", option, minimum
+                )
+                value = minimum
+            setattr(MySQLHandler, attribute, value)
+        except (_config.NoOptionError, _config.NoSectionError, ValueError):
+            pass
+
+    try:
+        overflow = config.get("logging", "overflow").lower()
+        if overflow in MySQLHandler.OVERFLOW_POLICIES:
+            MySQLHandler.OVERFLOW = overflow
+        else:
+            _LOGGER.warning(
+                "Option (overflow) must be one of %s.",
+                MySQLHandler.OVERFLOW_POLICIES
+            )
+    except (_config.NoOptionError, _config.NoSectionError):
+        pass
@@ -0,0 +1,369 @@
+#
+# Copyright (c) 2013,2014, Oracle and/or its affiliates. All rights reserved.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; version 2 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+#
+"""This module contains a replication lag monitor which periodically samples
+how far every secondary is behind its group's master.
+
+The latest sample of each server is kept in memory so that lookups may
+discard secondaries which are lagging too much behind the master without
+having to contact the servers on every request.
+
+The monitor also tracks how far the masters of shard groups are behind
+the master of the global group they replicate from. It reads the
+GTID_EXECUTED of each of these servers once per interval and compares
+the sets locally.
+
+See :func:`~mysql.fabric.replication.get_slave_lag`.
+See :class:`~mysql.fabric.services.server.ServerLookups`.
+"""
+import threading
+import time
+import logging
+
+from mysql.fabric import (
+    errors as _errors,
+    persistence as _persistence,
+    config as _config,
+    replication as _replication,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+class LagMonitor(object):
+    """Responsible for periodically sampling the replication lag of all
+    secondaries.
+
+    A sample is discarded if it is older than :attr:`_STALE_SAMPLES`
+    sampling intervals, so a monitor that cannot reach a server does not
+    keep reporting an old lag for it.
+    """
+    LOCK = threading.Condition()
+    LAGS = {}
+    GLOBAL_LAGS = {}
+    MONITOR = None
+
+    _MIN_SAMPLING_INTERVAL = 1.0
+    _SAMPLING_INTERVAL = _DEFAULT_SAMPLING_INTERVAL = 5.0
+
+    _STALE_SAMPLES = 3
+
+    _MIN_WAIT_TIMEOUT = 0.0
+    _WAIT_TIMEOUT = _DEFAULT_WAIT_TIMEOUT = 60.0
+
+    @staticmethod
+    def start():
+        """Start the lag monitor.
+        """
+        _LOGGER.info("Starting lag monitor.")
+        with LagMonitor.LOCK:
+            if LagMonitor.MONITOR is None:
+                monitor = LagMonitor()
+                monitor._start()
+                LagMonitor.MONITOR = monitor
+
+    @staticmethod
+    def shutdown():
+        """Stop the lag monitor and forget all samples.
+        """
+        _LOGGER.info("Stopping lag monitor.")
+        with LagMonitor.LOCK:
+            if LagMonitor.MONITOR is not None:
+                LagMonitor.MONITOR._shutdown()
+                LagMonitor.MONITOR = None
+            LagMonitor.LAGS = {}
+            LagMonitor.GLOBAL_LAGS = {}
+
+    @staticmethod
+    def get_lag(server_uuid):
+        """Return the latest known lag of a server.
+
+        :param server_uuid: Server's uuid.
+        :return: Tuple with the seconds and the number of transactions
+                 the server is behind its master or None if there is no
+                 recent sample or replication is not running.
+        """
+        with LagMonitor.LOCK:
+            sample = LagMonitor.LAGS.get(str(server_uuid))
+        if sample is None:
+            return None
+        seconds_behind, gtids_behind, sampled = sample
+        if LagMonitor._is_stale(sampled):
+            return None
+        return seconds_behind, gtids_behind
+
+    @staticmethod
+    def is_lagging(server_uuid, max_lag):
+        """Check whether a server is lagging more than a threshold.
+
+        A server without a recent sample is considered to be lagging as
+        nothing can be said about how stale its data is.
+
+        :param server_uuid: Server's uuid.
+        :param max_lag: Maximum number of seconds behind the master.
+        :return: True if the server is lagging, False otherwise.
+        """
+        lag = LagMonitor.get_lag(server_uuid)
+        return lag is None or lag[0] > max_lag
+
+    @staticmethod
+    def get_global_lags(master_group_id):
+        """Return the latest known lag of the groups that replicate from
+        a group.
+
+        :param master_group_id: Master group's id, usually a global group.
+        :return: Dictionary that maps the slave groups' ids to the number
+                 of the master group's transactions they have not applied
+                 yet. Groups without a recent sample are not reported.
+        """
+        global_lags = {}
+        with LagMonitor.LOCK:
+            samples = LagMonitor.GLOBAL_LAGS.items()
+        for slave_group_id, sample in samples:
+            group_id, gtids_behind, _, sampled = sample
+            if group_id == master_group_id and \
+                not LagMonitor._is_stale(sampled):
+                global_lags[slave_group_id] = gtids_behind
+        return global_lags
+
+    @staticmethod
+    def wait_for_global_gtids(slave_group_ids, gtids, timeout=None):
+        """Wait until the masters of a set of groups have applied a set of
+        transactions according to the monitor's samples.
+
+        Groups that have not been sampled when the timeout expires are
+        reported as not having applied the transactions.
+
+        :param slave_group_ids: Groups' ids.
+        :param gtids: Set of transactions.
+        :param timeout: Time in seconds to wait for or None to wait for
+                        :attr:`_WAIT_TIMEOUT` seconds.
+        :return: List with the groups' ids that have not applied the
+                 transactions when the timeout expires.
+        :raises: ServiceError If the lag monitor is not running.
+        """
+        gtids = _replication.parse_gtids(gtids)
+        if timeout is None:
+            timeout = LagMonitor._WAIT_TIMEOUT
+        deadline = time.time() + float(timeout)
+        with LagMonitor.LOCK:
+            while True:
+                if LagMonitor.MONITOR is None or \
+                    not LagMonitor.MONITOR.is_alive():
+                    raise _errors.ServiceError("Lag monitor is not running.")
+                pending = []
+                for slave_group_id in slave_group_ids:
+                    sample = LagMonitor.GLOBAL_LAGS.get(slave_group_id)
+                    if sample is None or _replication.get_num_gtid_difference(
+                        gtids, sample[2]):
+                        pending.append(slave_group_id)
+                remaining = deadline - time.time()
+                if not pending or remaining <= 0:
+                    return pending
+                LagMonitor.LOCK.wait(
+                    min(remaining, LagMonitor._SAMPLING_INTERVAL)
+                )
+
+    @staticmethod
+    def _is_stale(sampled):
+        """Check whether a sample is too old to be used.
+        """
+        stale = LagMonitor._SAMPLING_INTERVAL * LagMonitor._STALE_SAMPLES
+        return time.time() - sampled > stale
+
+    def __init__(self):
+        """Constructor for LagMonitor.
+        """
+        self.__thread = None
+        self.__stop = threading.Event()
+
+    def _start(self):
+        """Start the sampling thread.
+        """
+        self.__stop.clear()
+        self.__thread = threading.Thread(target=self._run, name="LagMonitor")
+        self.__thread.daemon = True
+        self.__thread.start()
+
+    def is_alive(self):
+        """Check whether the sampling thread is running.
+        """
+        return self.__thread is not None and self.__thread.is_alive()
+
+    def _shutdown(self):
+        """Stop the sampling thread.
+        """
+        self.__stop.set()
+
+    def _run(self):
+        """Function that samples the secondaries' lag.
+        """
+        _persistence.init_thread()
+
+        while not self.__stop.is_set():
+            try:
+                lags, global_lags = self._sample()
+                with LagMonitor.LOCK:
+                    if not self.__stop.is_set():
+                        LagMonitor.LAGS = lags
+                        LagMonitor.GLOBAL_LAGS = global_lags
+                        LagMonitor.LOCK.notify_all()
+            except (_errors.ExecutorError, _errors.DatabaseError):
+                pass
+            except Exception as error:
+                _LOGGER.exception(error)
+
+            self.__stop.wait(LagMonitor._SAMPLING_INTERVAL)
+
+        _persistence.deinit_thread()
+
+    @staticmethod
+    def _sample():
+        """Sample the lag of every secondary in every group and of every
+        group that replicates from another group.
+
+        :return: Dictionary where keys are the servers' uuids and values
+                 are tuples with the seconds and transactions behind the
+                 master and when the sample was taken. Dictionary where
+                 keys are the slave groups' ids and values are tuples with
+                 the master group's id, the transactions behind it, the
+                 slave group master's parsed GTID_EXECUTED and when the
+                 sample was taken.
+        """
+        from mysql.fabric.server import (
+            Group,
+            MySQLServer,
+        )
+
+        lags = {}
+        masters = {}
+        master_groups = []
+        groups = Group.fetch_with_servers(Group.groups())
+        for group_id, (group, servers) in groups.iteritems():
+            if group.master is None:
+                continue
+
+            slave_group_ids = group.slave_group_ids
+            if slave_group_ids:
+                master_groups.append((group_id, slave_group_ids))
+
+            master = None
+            for server in servers:
+                if server.uuid == group.master:
+                    master = server
+                    break
+            if master is None:
+                continue
+            try:
+                master.connect()
+            except _errors.DatabaseError:
+                continue
+            masters[group_id] = master
+
+            for server in servers:
+                if server.status != MySQLServer.SECONDARY:
+                    continue
+                try:
+                    server.connect()
+                    lag = _replication.get_slave_lag(server, master)
+                except _errors.DatabaseError as error:
+                    _LOGGER.debug(
+                        "Error sampling lag of server (%s): %s.",
+                        server.uuid, error
+                    )
+                    continue
+                if lag is None:
+                    continue
+                seconds_behind, gtids_behind = lag
+                lags[str(server.uuid)] = (
+                    seconds_behind, gtids_behind, time.time()
+                )
+
+        global_lags = {}
+        executed = {}
+        for group_id, slave_group_ids in master_groups:
+            master_gtids = LagMonitor._get_gtid_executed(
+                masters.get(group_id), executed
+            )
+            if master_gtids is None:
+                continue
+            for slave_group_id in slave_group_ids:
+                slave_gtids = LagMonitor._get_gtid_executed(
+                    masters.get(slave_group_id), executed
+                )
+                if slave_gtids is None:
+                    continue
+                global_lags[slave_group_id] = (
+                    group_id,
+                    _replication.get_num_gtid_difference(
+                        master_gtids, slave_gtids
+                    ),
+                    slave_gtids, time.time()
+                )
+
+        return lags, global_lags
+
+    @staticmethod
+    def _get_gtid_executed(server, executed):
+        """Return a server's parsed GTID_EXECUTED reading it at most once
+        per sampling round.
+
+        :param server: Server connected or None.
+        :param executed: Dictionary with the sets already read in this
+                         round.
+        """
+        if server is None:
+            return None
+        uuid = str(server.uuid)
+        if uuid not in executed:
+            try:
+                executed[uuid] = _replication.parse_gtids(
+                    server.get_gtid_status()[0].GTID_EXECUTED
+                )
+            except (_errors.DatabaseError, _errors.ProgrammingError) as error:
+                _LOGGER.debug(
+                    "Error reading executed transactions from server (%s): "
+                    "%s.", server.uuid, error
+                )
+                executed[uuid] = None
+        return executed[uuid]
+
+def configure(config):
+    """Set configuration values.
+    """
+    try:
+        sampling_interval = \
+            float(config.get("servers", "lag_sampling_interval"))
+        if sampling_interval < LagMonitor._MIN_SAMPLING_INTERVAL:
+            _LOGGER.warning(
+                "Lag sampling interval cannot be lower than %s.",
+                LagMonitor._MIN_SAMPLING_INTERVAL
+            )
+            sampling_interval = LagMonitor._MIN_SAMPLING_INTERVAL
+        LagMonitor._SAMPLING_INTERVAL = float(sampling_interval)
+    except (_config.NoOptionError, _config.NoSectionError, ValueError):
+        pass
+
+    try:
+        wait_timeout = float(config.get("servers", "lag_wait_timeout"))
+        if wait_timeout < LagMonitor._MIN_WAIT_TIMEOUT:
+            _LOGGER.warning(
+                "Lag wait timeout cannot be lower than %s.",
+                LagMonitor._MIN_WAIT_TIMEOUT
+            )
+            wait_timeout = LagMonitor._MIN_WAIT_TIMEOUT
+        LagMonitor._WAIT_TIMEOUT = float(wait_timeout)
+    except (_config.NoOptionError, _config.NoSectionError, ValueError):
+        pass
@@ -0,0 +1,302 @@
+#
+# Copyright (c) 2013,2014, Oracle and/or its affiliates. All rights reserved.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; version 2 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+#
+"""This module maintains the partitions of the tables that keep Fabric's
+logs, i.e. error_log and log.
+
+If the storage.partitioned_logs option is set when the state store is
+set up, these tables are partitioned by range on the time entries were
+reported instead of being pruned by events that delete old entries. The
+partitions are named after their upper bound and the last one, pmax,
+holds entries that do not fit in any other partition. Fabric periodically
+adds partitions ahead of time and drops the partitions whose entries are
+older than the tables' retention, which does not require scanning the
+tables.
+
+The retention is computed from the tables' prune_time options as the
+events do, so entries are kept as long whichever layout is used. See
+:meth:`LogPartitions.retention`.
+
+See :class:`~mysql.fabric.error_log.ErrorLog`.
+See :class:`~mysql.fabric.handler.MySQLHandler`.
+"""
+import datetime
+import threading
+import logging
+
+from mysql.fabric import (
+    errors as _errors,
+    persistence as _persistence,
+    config as _config,
+)
+
+from mysql.fabric.utils import (
+    get_time,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+_PARTITION_NAME_FORMAT = "p%Y%m%d%H%M%S"
+
+_PARTITION_BOUND_FORMAT = "%Y-%m-%d %H:%M:%S"
+
+_LAST_PARTITION = (
+    "PARTITION pmax VALUES LESS THAN (MAXVALUE)"
+)
+
+_PARTITION = (
+    "PARTITION {name} VALUES LESS THAN ('{bound}')"
+)
+
+_PARTITION_BY = (
+    " PARTITION BY RANGE COLUMNS(reported) ({partitions})"
+)
+
+_QUERY_PARTITIONS = (
+    "SELECT PARTITION_NAME FROM INFORMATION_SCHEMA.PARTITIONS "
+    "WHERE TABLE_SCHEMA = %s AND TABLE_NAME = %s "
+    "ORDER BY PARTITION_ORDINAL_POSITION"
+)
+
+_DROP_PARTITIONS = (
+    "ALTER TABLE {table} DROP PARTITION {names}"
+)
+
+_ADD_PARTITIONS = (
+    "ALTER TABLE {table} REORGANIZE PARTITION pmax INTO ({partitions})"
+)
+
+class LogPartitions(_persistence.Persistable):
+    """Create and maintain the partitions of the log tables.
+
+    Each partition spans the table's retention divided by
+    :attr:`PARTITIONS_PER_RETENTION`, so entries are kept at most that
+    much longer than the retention. There are always at least
+    :attr:`FUTURE_PARTITIONS` partitions ahead of the current time.
+    """
+    ENABLED = False
+
+    PARTITIONS_PER_RETENTION = 4
+    MAX_RETENTION = 838 * 3600 + 59 * 60 + 59
+    MIN_PARTITION_INTERVAL = 60
+    FUTURE_PARTITIONS = 2
+
+    MAINTENANCE_INTERVAL = 60.0
+
+    LOCK = threading.Lock()
+    MAINTAINER = None
+
+    @staticmethod
+    def retention(prune_time):
+        """Return the time after which entries are removed from a table
+        whose prune_time option is given.
+
+        The events that prune the tables when they are not partitioned
+        remove entries older than MAKETIME(prune_time, 0, 0), that is,
+        prune_time is a number of hours and MySQL caps the result at
+        :attr:`MAX_RETENTION`.
+
+        :param prune_time: Value of the table's prune_time option.
+        :return: Time in seconds.
+        """
+        return min(int(prune_time) * 3600, LogPartitions.MAX_RETENTION)
+
+    @staticmethod
+    def partition_interval(retention):
+        """Return the time spanned by each partition.
+
+        :param retention: Time in seconds after which entries are removed.
+        :return: Time in seconds.
+        """
+        return max(
+            int(retention) // LogPartitions.PARTITIONS_PER_RETENTION,
+            LogPartitions.MIN_PARTITION_INTERVAL
+        )
+
+    @staticmethod
+    def partitioned_table(create_stmt, retention, now=None):
+        """Return the statement that creates a partitioned log table.
+
+        The reported column is declared as DATETIME because TIMESTAMP
+        columns cannot be used to partition by range columns. Both store
+        the UTC times written by Fabric.
+
+        :param create_stmt: Statement that creates the table without
+                            partitions.
+        :param retention: Time in seconds after which entries are removed.
+        :param now: Current time. Defaults to :func:`get_time`.
+        """
+        now = now or get_time()
+        interval = LogPartitions.partition_interval(retention)
+        bounds = LogPartitions._next_bounds(
+            LogPartitions._floor(now, interval), now, interval
+        )
+        return create_stmt.replace(
+            "reported TIMESTAMP", "reported DATETIME"
+        ) + _PARTITION_BY.format(
+            partitions=LogPartitions._partitions(bounds)
+        )
+
+    @staticmethod
+    def maintain(table, retention, now=None, persister=None):
+        """Drop the expired partitions of a table and add partitions ahead
+        of time.
+
+        :param table: Table's name.
+        :param retention: Time in seconds after which entries are removed.
+        :param now: Current time. Defaults to :func:`get_time`.
+        :param persister: Persister to persist the object to.
+        :return: False if the table is not partitioned by Fabric, True
+                 otherwise.
+        """
+        rows = persister.exec_stmt(
+            _QUERY_PARTITIONS, {"params" : (persister.database, table)}
+        )
+        names = [row[0] for row in rows or []]
+        if not names or names[-1] != "pmax":
+            return False
+
+        now = now or get_time()
+        interval = LogPartitions.partition_interval(retention)
+        bounds = [
+            datetime.datetime.strptime(name, _PARTITION_NAME_FORMAT)
+            for name in names[:-1]
+        ]
+
+        expired = now - datetime.timedelta(seconds=int(retention))
+        dropped = [bound for bound in bounds if bound <= expired]
+        if dropped:
+            _LOGGER.debug(
+                "Dropping (%s) expired partition(s) of table (%s).",
+                len(dropped), table
+            )
+            persister.exec_stmt(_DROP_PARTITIONS.format(
+                table=table, names=", ".join(
+                    bound.strftime(_PARTITION_NAME_FORMAT)
+                    for bound in dropped
+                )
+            ))
+
+        last = LogPartitions._floor(now, interval)
+        if bounds:
+            last = max(bounds[-1], last)
+        added = LogPartitions._next_bounds(last, now, interval)
+        if added:
+            _LOGGER.debug(
+                "Adding (%s) partition(s) to table (%s).", len(added), table
+            )
+            persister.exec_stmt(_ADD_PARTITIONS.format(
+                table=table, partitions=LogPartitions._partitions(added)
+            ))
+        return True
+
+    @staticmethod
+    def start():
+        """Start the thread that maintains the partitions.
+        """
+        with LogPartitions.LOCK:
+            if LogPartitions.MAINTAINER is None:
+                stop = threading.Event()
+                thread = threading.Thread(
+                    target=LogPartitions._run, args=(stop, ),
+                    name="LogPartitions"
+                )
+                thread.daemon = True
+                thread.start()
+                LogPartitions.MAINTAINER = stop
+
+    @staticmethod
+    def shutdown():
+        """Stop the thread that maintains the partitions.
+        """
+        with LogPartitions.LOCK:
+            if LogPartitions.MAINTAINER is not None:
+                LogPartitions.MAINTAINER.set()
+                LogPartitions.MAINTAINER = None
+
+    @staticmethod
+    def _run(stop):
+        """Maintain the partitions of the log tables until it is stopped.
+        Tables that are not partitioned are no longer checked.
+        """
+        from mysql.fabric.error_log import ErrorLog
+        from mysql.fabric.handler import MySQLHandler
+
+        _persistence.init_thread()
+
+        tables = [
+            ("error_log", lambda: ErrorLog._PRUNE_TIME),
+            ("log", lambda: MySQLHandler.PRUNE_TIME),
+        ]
+        while tables and not stop.is_set():
+            for table, prune_time in list(tables):
+                try:
+                    if not LogPartitions.maintain(
+                        table, LogPartitions.retention(prune_time())
+                    ):
+                        tables.remove((table, prune_time))
+                except _errors.DatabaseError as error:
+                    _LOGGER.warning(
+                        "Error maintaining partitions of table (%s): (%s).",
+                        table, error
+                    )
+            stop.wait(LogPartitions.MAINTENANCE_INTERVAL)
+
+        _persistence.deinit_thread()
+
+    @staticmethod
+    def _floor(when, interval):
+        """Return the latest time before a given one that is a multiple of
+        an interval since the epoch.
+        """
+        epoch = datetime.datetime(1970, 1, 1)
+        seconds = int((when - epoch).total_seconds())
+        return epoch + datetime.timedelta(seconds=seconds - seconds % interval)
+
+    @staticmethod
+    def _next_bounds(last, now, interval):
+        """Return the upper bounds of the partitions that follow the one
+        whose upper bound is last so that there are enough partitions
+        ahead of now.
+        """
+        bounds = []
+        interval = datetime.timedelta(seconds=interval)
+        ahead = now + interval * LogPartitions.FUTURE_PARTITIONS
+        while last < ahead:
+            last += interval
+            bounds.append(last)
+        return bounds
+
+    @staticmethod
+    def _partitions(bounds):
+        """Return the definition of the partitions with the given upper
+        bounds followed by pmax.
+        """
+        return ", ".join([
+            _PARTITION.format(
+                name=bound.strftime(_PARTITION_NAME_FORMAT),
+                bound=bound.strftime(_PARTITION_BOUND_FORMAT)
+            ) for bound in bounds
+        ] + [_LAST_PARTITION])
+
+def configure(config):
+    """Set configuration values.
+    """
+    try:
+        partitioned = config.get("storage", "partitioned_logs")
+        LogPartitions.ENABLED = partitioned.lower() == "yes"
+    except (_config.NoOptionError, _config.NoSectionError):
+        pass
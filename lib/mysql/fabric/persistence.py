@@ -44,6 +44,7 @@ code for initializing the persister system for a thread is::
    persistence.init_thread()
 
 """
+import collections
 import functools
 import inspect
 import logging
@@ -55,8 +56,13 @@ import mysql.fabric.errors as _errors
 
 from mysql.fabric.server_utils import (
     MYSQL_DEFAULT_PORT,
+    StatementTracer,
     connect_to_mysql,
+    close_mysql_prepared_stmt,
+    exec_mysql_prepared_stmt,
     exec_mysql_stmt,
+    exec_mysql_stmts,
+    prepare_mysql_stmt,
     destroy_mysql_connection,
     is_valid_mysql_connection,
     reestablish_mysql_connection
@@ -327,6 +333,255 @@ class Persistable(object):
 
     __metaclass__ = PersistentMeta
 
+class ObjectCache(object):
+    """Process-wide read-through cache of rows fetched from the state store
+    on behalf of persistable objects such as groups, servers and shards.
+
+    Rows are cached instead of objects so that every caller gets its own
+    object. Each entry is tagged with the versions of the tables it was
+    read from and with a global epoch. When a transaction that wrote to a
+    table commits, the table's version is bumped and entries read from it
+    become stale. Writes whose tables cannot be identified bump the epoch,
+    which makes all entries stale. See :meth:`written_tables`.
+
+    A persister in a transaction does not use the cache for tables that it
+    has changed and only stores rows if no write has committed since the
+    transaction began. Writes done by other processes, such as other Fabric
+    nodes sharing the state store, are not seen, so the cache must be
+    disabled through :attr:`ENABLED` in such setups.
+    """
+    ENABLED = True
+    MAX_ENTRIES = DEFAULT_MAX_ENTRIES = 10000
+
+    LOCK = threading.Lock()
+    ENTRIES = collections.OrderedDict()
+    VERSIONS = {}
+    EPOCH = 0
+    HITS = {}
+    MISSES = {}
+
+    # Statements that do not change any table.
+    READS = frozenset([
+        "SELECT", "SHOW", "BEGIN", "START", "COMMIT", "ROLLBACK", "SET",
+        "EXPLAIN", "DESCRIBE", "DO"
+    ])
+
+    @staticmethod
+    def fetch(key, tables, query, persister):
+        """Return the rows identified by a key reading them with query
+        if they are not cached.
+
+        :param key: Tuple that identifies the rows whose first element
+                    identifies the kind of object.
+        :param tables: Tuple with the tables the rows are read from.
+        :param query: Callable that reads the rows from the state store.
+        :param persister: Persister that is used by query.
+        """
+        if not ObjectCache.ENABLED:
+            return query()
+
+        versions = None
+        get_cache_versions = getattr(persister, "get_cache_versions", None)
+        if get_cache_versions is not None:
+            versions = get_cache_versions(tables)
+        if versions is None:
+            return query()
+
+        kind = key[0]
+        with ObjectCache.LOCK:
+            entry = ObjectCache.ENTRIES.get(key)
+            if entry is not None and entry[0] == versions:
+                ObjectCache.HITS[kind] = ObjectCache.HITS.get(kind, 0) + 1
+                return entry[1]
+            ObjectCache.MISSES[kind] = ObjectCache.MISSES.get(kind, 0) + 1
+
+        rows = query()
+        if rows is not None:
+            rows = tuple(rows)
+
+        with ObjectCache.LOCK:
+            if versions == ObjectCache._get_versions(tables):
+                ObjectCache.ENTRIES.pop(key, None)
+                ObjectCache.ENTRIES[key] = (versions, rows)
+                while len(ObjectCache.ENTRIES) > ObjectCache.MAX_ENTRIES:
+                    ObjectCache.ENTRIES.popitem(last=False)
+        return rows
+
+    @staticmethod
+    def get_versions(tables=None):
+        """Return the current epoch and the versions of a set of tables.
+        If tables is None, return the epoch and a copy of all versions.
+        """
+        with ObjectCache.LOCK:
+            if tables is None:
+                return ObjectCache.EPOCH, dict(ObjectCache.VERSIONS)
+            return ObjectCache._get_versions(tables)
+
+    @staticmethod
+    def _get_versions(tables):
+        """Return the current epoch and the versions of a set of tables.
+        This must be called with the lock held.
+        """
+        return (ObjectCache.EPOCH, ) + tuple(
+            ObjectCache.VERSIONS.get(table, 0) for table in tables
+        )
+
+    @staticmethod
+    def invalidate(tables):
+        """Make entries read from a set of tables stale.
+
+        :param tables: Iterable with the tables or None to make all
+                       entries stale.
+        """
+        with ObjectCache.LOCK:
+            if tables is None:
+                ObjectCache.EPOCH += 1
+                ObjectCache.ENTRIES.clear()
+                return
+            for table in tables:
+                ObjectCache.VERSIONS[table] = \
+                    ObjectCache.VERSIONS.get(table, 0) + 1
+
+    @staticmethod
+    def written_tables(stmt_str):
+        """Return the tables that a statement may change.
+
+        :return: Empty tuple if the statement does not change any table,
+                 tuple with the table's name if it changes a single table
+                 or None if the tables cannot be identified.
+        """
+        words = _skip_statement_prefix(stmt_str).split(None, 4)
+        if not words:
+            return ()
+        verb = words[0].upper()
+        if verb in ObjectCache.READS:
+            return ()
+        position = None
+        if verb in ("INSERT", "REPLACE"):
+            position = 1
+            if words[position].upper() in ("IGNORE", "LOW_PRIORITY",
+                                           "DELAYED", "HIGH_PRIORITY"):
+                position += 1
+            if words[position].upper() == "INTO":
+                position += 1
+        elif verb == "UPDATE":
+            position = 1
+            if len(words) < 3 or words[2].upper() != "SET":
+                return None
+        elif verb == "DELETE":
+            if words[1].upper() != "FROM":
+                return None
+            position = 2
+        elif verb == "ALTER":
+            if words[1].upper() != "TABLE":
+                return None
+            position = 2
+        if position is None or len(words) <= position:
+            return None
+        table = words[position].split("(", 1)[0].replace("`", "")
+        return (table.rsplit(".", 1)[-1].lower(), )
+
+    @staticmethod
+    def get_statistics():
+        """Return a dictionary that maps the kinds of objects cached to a
+        tuple with the number of hits, misses and entries.
+        """
+        with ObjectCache.LOCK:
+            entries = {}
+            for key in ObjectCache.ENTRIES:
+                entries[key[0]] = entries.get(key[0], 0) + 1
+            kinds = set(ObjectCache.HITS) | set(ObjectCache.MISSES)
+            return dict(
+                (kind, (ObjectCache.HITS.get(kind, 0),
+                        ObjectCache.MISSES.get(kind, 0),
+                        entries.get(kind, 0)))
+                for kind in kinds
+            )
+
+    @staticmethod
+    def clear():
+        """Remove all entries.
+        """
+        ObjectCache.invalidate(None)
+
+class ReplicaReads(object):
+    """Process-wide state of the read-only replicas of the state store.
+
+    Commands that are not procedures read from a replica. Writes,
+    transactions and procedures always go to the primary. See
+    :meth:`MySQLPersister.read_from_replicas`.
+
+    Every write committed by Fabric bumps :attr:`VERSION`. Before reading
+    from a replica, a persister checks that the replica has executed the
+    primary's GTID_EXECUTED, which is read once per version and shared by
+    all persisters. Once a replica has been checked, it is used without
+    further checks until Fabric commits another write or, if
+    :attr:`MAX_STALENESS` is set, until the GTIDs it was checked against
+    are older than that number of seconds. In the latter case, reads from
+    replicas do not use the :class:`ObjectCache`. If a replica has not
+    caught up or cannot be accessed, the primary is used.
+
+    Writes done by other processes, such as other Fabric nodes sharing the
+    state store, are not seen. Writes to :attr:`IGNORED_TABLES` do not
+    bump the version because they are only read by statistics.
+    """
+    ADDRESSES = []
+    MAX_STALENESS = DEFAULT_MAX_STALENESS = 0.0
+    RETRY_INTERVAL = 5.0
+    IGNORED_TABLES = frozenset(["checkpoints", "log"])
+
+    LOCK = threading.Lock()
+    VERSION = 0
+    PRIMARY_GTIDS = None
+    NEXT_ADDRESS = 0
+    READS = 0
+    FALLBACKS = 0
+    CHECKS = 0
+
+    @staticmethod
+    def next_address():
+        """Return the address of the next replica in a round-robin
+        fashion or None if there is no replica.
+        """
+        with ReplicaReads.LOCK:
+            if not ReplicaReads.ADDRESSES:
+                return None
+            index = ReplicaReads.NEXT_ADDRESS % len(ReplicaReads.ADDRESSES)
+            ReplicaReads.NEXT_ADDRESS = index + 1
+            return ReplicaReads.ADDRESSES[index]
+
+    @staticmethod
+    def record_write(tables):
+        """Record that Fabric has committed a write.
+
+        :param tables: Iterable with the tables changed or None if they
+                       are unknown.
+        """
+        if tables is not None and \
+            ReplicaReads.IGNORED_TABLES.issuperset(tables):
+            return
+        with ReplicaReads.LOCK:
+            ReplicaReads.VERSION += 1
+
+    @staticmethod
+    def count(reads=0, fallbacks=0, checks=0):
+        """Update the statistics.
+        """
+        with ReplicaReads.LOCK:
+            ReplicaReads.READS += reads
+            ReplicaReads.FALLBACKS += fallbacks
+            ReplicaReads.CHECKS += checks
+
+    @staticmethod
+    def get_statistics():
+        """Return a tuple with the number of statements sent to replicas,
+        sent to the primary because no replica was up to date or available
+        and the number of times replicas were checked.
+        """
+        with ReplicaReads.LOCK:
+            return (ReplicaReads.READS, ReplicaReads.FALLBACKS,
+                    ReplicaReads.CHECKS)
+
 class MySQLPersister(object):
     """Class responsible for persisting objects to a MySQL database.
 
@@ -355,10 +610,22 @@ class MySQLPersister(object):
         "UPDATE",             # update rows
     ]
 
+    # Whether statements passed to defer_stmt() are sent along with the
+    # next BEGIN or COMMIT.
+    group_commit = False
+
+    # Whether statements executed with the prepared option are sent as
+    # server-side prepared statements.
+    prepared_stmts = False
+
+    # Maximum number of statements kept prepared on a connection.
+    MAX_PREPARED_STMTS = 64
+
     @classmethod
     def init(cls, host, user, password=None, port=None, database=None,
              connection_timeout=None, connection_attempts=None,
-             connection_delay=None, auth_plugin=None):
+             connection_delay=None, auth_plugin=None, group_commit=None,
+             prepared_stmts=None):
         """Initialize the object persistance system.
 
         This function initializes the persistance system. The function
@@ -383,6 +650,13 @@ class MySQLPersister(object):
                                  :const:`DEFAULT_CONNECT_DELAY`.
         :param auth_plugin: Use auth_plugin as authencation plugin for
                             authentication with the database server.
+        :param group_commit: Whether deferred statements are sent along
+                             with the next BEGIN or COMMIT. Default is
+                             False. See :meth:`defer_stmt`.
+        :param prepared_stmts: Whether statements executed with the
+                               prepared option are sent as server-side
+                               prepared statements. Default is False.
+                               See :meth:`exec_stmt`.
         """
         if port is None:
             port = MYSQL_DEFAULT_PORT
@@ -407,6 +681,11 @@ class MySQLPersister(object):
         cls.connection_attempts = connection_attempts
         cls.connection_delay = connection_delay
         cls.database = database
+        cls.group_commit = bool(group_commit)
+        cls.prepared_stmts = bool(prepared_stmts)
+        StatementTracer.STORE_ADDRESSES = frozenset(
+            [(host, port)] + list(ReplicaReads.ADDRESSES)
+        )
 
     @classmethod
     def setup(cls):
@@ -444,6 +723,16 @@ class MySQLPersister(object):
         """
         self.__cnx = None
         self.__check_connection = True
+        self.__deferred = []
+        self.__cache_versions = None
+        self.__written_tables = set()
+        self.__replica_reads = False
+        self.__replica_cnx = None
+        self.__replica_version = None
+        self.__replica_verified_at = 0
+        self.__replica_failed_at = 0
+        self.__prepared = collections.OrderedDict()
+        self.__replica_prepared = collections.OrderedDict()
 
         assert (self.connection_info is not None)
         try:
@@ -466,30 +755,140 @@ class MySQLPersister(object):
         try:
             if self.__cnx:
                 destroy_mysql_connection(self.__cnx)
+            if self.__replica_cnx:
+                destroy_mysql_connection(self.__replica_cnx)
         except AttributeError:
             pass
 
+    def is_valid(self):
+        """Return whether the persister has a valid connection to the
+        state store.
+        """
+        return is_valid_mysql_connection(self.__cnx)
+
     def begin(self):
         """Start a new transaction.
+
+        Deferred statements are executed before the transaction starts.
         """
-        self.exec_stmt("BEGIN")
+        self._exec_with_deferred("BEGIN")
         self.__check_connection = False
+        if ObjectCache.ENABLED:
+            self.__cache_versions = ObjectCache.get_versions()
 
     def commit(self):
         """Commit an on-going transaction.
+
+        Deferred statements are executed before the transaction commits.
         """
         try:
-            self.exec_stmt("COMMIT")
+            self._exec_with_deferred("COMMIT")
         finally:
             self.__check_connection = True
+            if self.__written_tables:
+                tables = None if None in self.__written_tables else \
+                    self.__written_tables
+                ReplicaReads.record_write(tables)
+                ObjectCache.invalidate(tables)
+            self.__cache_versions = None
+            self.__written_tables = set()
 
     def rollback(self):
         """Roll back an on-going transaction.
+
+        Deferred statements are discarded.
         """
+        self.__deferred = []
         try:
             self.exec_stmt("ROLLBACK")
         finally:
             self.__check_connection = True
+            self.__cache_versions = None
+            self.__written_tables = set()
+
+    def defer_stmt(self, stmt_str, options=None):
+        """Execute a statement whose result is not needed.
+
+        If group commit is enabled, the statement is sent to the server
+        along with the next BEGIN or COMMIT in a single round trip. This
+        means that errors are only reported by :meth:`begin` or
+        :meth:`commit`. Otherwise, the statement is immediately executed.
+
+        :param stmt_str: Statement.
+        :param options: Options. Only params is used. See :meth:`exec_stmt`.
+        """
+        if not self.group_commit:
+            self.exec_stmt(stmt_str, options)
+            return
+        options = options or {}
+        self.__deferred.append((stmt_str, options.get("params", ())))
+        if ObjectCache.ENABLED or ReplicaReads.ADDRESSES:
+            self._register_write(stmt_str)
+
+    def read_from_replicas(self, enabled):
+        """Set whether queries executed outside a transaction are sent to
+        a read-only replica of the state store. See :class:`ReplicaReads`.
+
+        Once a statement that changes the state store is executed, queries
+        go to the primary until this is called again.
+
+        :param enabled: Whether replicas should be used.
+        :return: The previous setting.
+        """
+        previous = self.__replica_reads
+        self.__replica_reads = enabled
+        return previous
+
+    def get_cache_versions(self, tables):
+        """Return the versions that rows read from a set of tables by this
+        persister are tagged with in the cache. See :class:`ObjectCache`.
+
+        :return: Tuple with the versions or None if the cache must not be
+                 used because the current transaction changed the tables.
+        """
+        if self.__replica_reads and ReplicaReads.MAX_STALENESS and \
+            ReplicaReads.ADDRESSES:
+            return None
+        if self.__check_connection:
+            return ObjectCache.get_versions(tables)
+        if self.__cache_versions is None or None in self.__written_tables \
+            or self.__written_tables.intersection(tables):
+            return None
+        epoch, versions = self.__cache_versions
+        return (epoch, ) + tuple(versions.get(table, 0) for table in tables)
+
+    def _register_write(self, stmt_str):
+        """Make entries read from the tables changed by a statement stale
+        when its changes are committed.
+        """
+        tables = ObjectCache.written_tables(stmt_str)
+        if tables == ():
+            return
+        if tables is None or \
+            not ReplicaReads.IGNORED_TABLES.issuperset(tables):
+            self.__replica_reads = False
+        if self.__check_connection:
+            # There is no transaction so the statement is committed.
+            ReplicaReads.record_write(tables)
+            ObjectCache.invalidate(tables)
+        elif tables is None:
+            self.__written_tables.add(None)
+        else:
+            self.__written_tables.update(tables)
+
+    def _exec_with_deferred(self, stmt_str):
+        """Execute a statement without parameters preceded by the deferred
+        statements.
+        """
+        if not self.__deferred:
+            self.exec_stmt(stmt_str)
+            return
+        statements = self.__deferred + [(stmt_str, ())]
+        self.__deferred = []
+        if self.__check_connection and \
+            not is_valid_mysql_connection(self.__cnx):
+            self._try_to_fix_connection()
+        exec_mysql_stmts(self.__cnx, statements)
 
     def auth_mysql_token(self):
         """Returns the authentication plugin data found in handshake"""
@@ -525,19 +924,188 @@ class MySQLPersister(object):
         the connection is valid or not. If the connection is invalid, it tries
         to restablish it as MySQL might disconnect inactive connections.
 
+        Queries are sent to a replica if :meth:`read_from_replicas` is set,
+        there is no on-going transaction and the replica is up to date.
+
+        Statements executed often may set the prepared option, in which
+        case they are sent as server-side prepared statements if
+        :attr:`prepared_stmts` is set. The server parses them once per
+        connection and their result sets are always fetched, so the option
+        cannot be combined with the fetch, columns or raw options.
+
         See :meth:`~mysql.fabric.server_utils.exec_stmt`.
         """
+        prepared = self.prepared_stmts and options is not None and \
+            options.get("prepared", False)
+        if self.__replica_reads and self.__check_connection and \
+            ReplicaReads.ADDRESSES and _is_query(stmt_str):
+            if self._check_replica() is not None:
+                try:
+                    if prepared:
+                        result = self._exec_prepared_stmt(
+                            self.__replica_cnx, self.__replica_prepared,
+                            stmt_str, options
+                        )
+                    else:
+                        result = exec_mysql_stmt(
+                            self.__replica_cnx, stmt_str, options
+                        )
+                    ReplicaReads.count(reads=1)
+                    return result
+                except _errors.DatabaseError as error:
+                    self._disconnect_from_replica(error)
+            ReplicaReads.count(fallbacks=1)
+
         while True:
             if self.__check_connection and \
                 not is_valid_mysql_connection(self.__cnx):
                 self._try_to_fix_connection()
-            return exec_mysql_stmt(
-                self.__cnx, stmt_str, options
+            if prepared:
+                result = self._exec_prepared_stmt(
+                    self.__cnx, self.__prepared, stmt_str, options
+                )
+            else:
+                result = exec_mysql_stmt(
+                    self.__cnx, stmt_str, options
+                )
+            if ObjectCache.ENABLED or ReplicaReads.ADDRESSES:
+                self._register_write(stmt_str)
+            return result
+
+    def _exec_prepared_stmt(self, cnx, prepared, stmt_str, options):
+        """Execute a statement as a prepared statement on a connection
+        preparing it if it is not among the connection's most recently
+        used statements.
+
+        :param cnx: Connection.
+        :param prepared: Ordered dictionary that maps the statements
+                         prepared on the connection, from the least to the
+                         most recently used, to the string that was
+                         prepared and its cursor.
+        """
+        entry = prepared.pop(stmt_str, None)
+        if entry is None:
+            if len(prepared) >= self.MAX_PREPARED_STMTS:
+                _, (_, cur) = prepared.popitem(last=False)
+                close_mysql_prepared_stmt(cur)
+            entry = (stmt_str, prepare_mysql_stmt(cnx, stmt_str))
+        prepared_str, cur = entry
+        try:
+            result = exec_mysql_prepared_stmt(
+                cnx, cur, prepared_str, options
+            )
+        except _errors.DatabaseError:
+            close_mysql_prepared_stmt(cur)
+            raise
+        prepared[stmt_str] = entry
+        return result
+
+    def _check_replica(self):
+        """Check whether the replica is up to date connecting to it if
+        necessary.
+
+        :return: True if the replica has executed all writes committed by
+                 Fabric, False if it may be behind by at most
+                 :attr:`ReplicaReads.MAX_STALENESS` seconds or None if the
+                 primary must be used.
+        """
+        if self.__replica_cnx is not None and \
+            self.__replica_version == ReplicaReads.VERSION:
+            return True
+        now = time.time()
+        if self.__replica_cnx is not None and \
+            now - self.__replica_verified_at <= ReplicaReads.MAX_STALENESS:
+            return False
+        if self.__replica_cnx is None:
+            if now - self.__replica_failed_at < ReplicaReads.RETRY_INTERVAL:
+                return None
+            self._connect_to_replica()
+            if self.__replica_cnx is None:
+                return None
+
+        version, gtids, fetched_at = self._get_primary_gtids()
+        try:
+            row = exec_mysql_stmt(
+                self.__replica_cnx, _QUERY_GTID_SUBSET,
+                {"params" : (gtids, )}
+            )
+        except _errors.DatabaseError as error:
+            self._disconnect_from_replica(error)
+            return None
+        ReplicaReads.count(checks=1)
+        if not int(row[0][0]):
+            return None
+
+        self.__replica_version = version
+        self.__replica_verified_at = fetched_at
+        if version == ReplicaReads.VERSION:
+            return True
+        if time.time() - fetched_at <= ReplicaReads.MAX_STALENESS:
+            return False
+        return None
+
+    def _get_primary_gtids(self):
+        """Return the version of the writes committed by Fabric along with
+        the primary's GTID_EXECUTED that contains them and when it was
+        read, reading it if no other persister has done so.
+        """
+        with ReplicaReads.LOCK:
+            version = ReplicaReads.VERSION
+            state = ReplicaReads.PRIMARY_GTIDS
+        if state is not None and state[0] == version:
+            return state
+
+        fetched_at = time.time()
+        if self.__check_connection and \
+            not is_valid_mysql_connection(self.__cnx):
+            self._try_to_fix_connection()
+        row = exec_mysql_stmt(self.__cnx, _QUERY_GTID_EXECUTED)
+        state = (version, row[0][0], fetched_at)
+        with ReplicaReads.LOCK:
+            if ReplicaReads.PRIMARY_GTIDS is None or \
+                ReplicaReads.PRIMARY_GTIDS[0] <= version:
+                ReplicaReads.PRIMARY_GTIDS = state
+        return state
+
+    def _connect_to_replica(self):
+        """Connect to the next replica.
+        """
+        address = ReplicaReads.next_address()
+        if address is None:
+            return
+        host, port = address
+        connection_info = dict(self.connection_info, host=host, port=port)
+        try:
+            self.__replica_cnx = connect_to_mysql(
+                autocommit=True, database=self.database, **connection_info
+            )
+        except _errors.DatabaseError as error:
+            _LOGGER.warning(
+                "Error accessing state store replica (%s:%s): (%s).",
+                host, port, error
             )
+            self.__replica_failed_at = time.time()
+
+    def _disconnect_from_replica(self, error):
+        """Close the connection to a replica after an error.
+        """
+        _LOGGER.warning("Error accessing state store replica: (%s).", error)
+        try:
+            destroy_mysql_connection(self.__replica_cnx)
+        except _errors.DatabaseError:
+            pass
+        self.__replica_cnx = None
+        self.__replica_prepared.clear()
+        self.__replica_version = None
+        self.__replica_verified_at = 0
+        self.__replica_failed_at = time.time()
 
     def _try_to_fix_connection(self):
         """Try to get a new connection if the current one is stale.
         """
+        # The statements prepared on the old connection no longer exist
+        # and their identifiers may be reused on the new one.
+        self.__prepared.clear()
         for attempt in range(0, self.connection_attempts):
             try:
                 if self.__cnx:
@@ -557,15 +1125,82 @@ class MySQLPersister(object):
                 )
             time.sleep(self.connection_delay)
 
+_QUERY_GTID_EXECUTED = "SELECT @@GLOBAL.GTID_EXECUTED"
+
+_QUERY_GTID_SUBSET = "SELECT GTID_SUBSET(%s, @@GLOBAL.GTID_EXECUTED)"
+
+def _skip_statement_prefix(stmt_str):
+    """Return a statement without the whitespaces, opening parentheses and
+    comments that precede its first keyword.
+
+    Comments that MySQL executes, i.e. /*! ... */, are kept.
+    """
+    stmt_str = stmt_str.lstrip(" \t\r\n(")
+    while True:
+        if stmt_str.startswith("/*") and not stmt_str.startswith("/*!"):
+            end = stmt_str.find("*/", 2)
+            end = len(stmt_str) if end == -1 else end + 2
+        elif stmt_str.startswith(("--", "#")):
+            end = stmt_str.find("\n")
+            end = len(stmt_str) if end == -1 else end + 1
+        else:
+            return stmt_str
+        stmt_str = stmt_str[end:].lstrip(" \t\r\n(")
+
+def _is_query(stmt_str):
+    """Return whether a statement only reads the state store and can be
+    sent to any server.
+    """
+    stmt_str = _skip_statement_prefix(stmt_str).upper()
+    return stmt_str.startswith("SELECT") and \
+        "LAST_INSERT_ID" not in stmt_str and "FOR UPDATE" not in stmt_str
+
 def current_persister():
     """Return the persister for the current thread.
     """
     return PersistentMeta.thread_local.persister
 
+_IDLE_PERSISTERS = []
+_IDLE_PERSISTERS_LOCK = threading.Lock()
+
+def prime_persister():
+    """Create a persister and keep it until a thread asks for one, so that
+    the thread does not have to wait for a connection to the state store.
+    """
+    persister = MySQLPersister()
+    if not persister.is_valid():
+        raise _errors.DatabaseError(
+            "Error connecting to the state store."
+        )
+    with _IDLE_PERSISTERS_LOCK:
+        _IDLE_PERSISTERS.append(persister)
+
+def get_persister():
+    """Return a persister primed by :func:`prime_persister` if there is
+    any or create a new one. Persisters whose connection is no longer valid
+    are discarded.
+    """
+    while True:
+        with _IDLE_PERSISTERS_LOCK:
+            if not _IDLE_PERSISTERS:
+                break
+            persister = _IDLE_PERSISTERS.pop()
+        if persister.is_valid():
+            return persister
+        _LOGGER.debug("Discarding persister without a valid connection.")
+    return MySQLPersister()
+
+def release_persister(persister):
+    """Give a persister that is not used anymore back so that a thread
+    created later on does not have to open a new connection.
+    """
+    with _IDLE_PERSISTERS_LOCK:
+        _IDLE_PERSISTERS.append(persister)
+
 def init_thread():
     """Initialize the persistence system for the thread.
     """
-    PersistentMeta.init_thread(MySQLPersister())
+    PersistentMeta.init_thread(get_persister())
 
 def deinit_thread():
     """Initialize the persistence system for the thread.
@@ -576,7 +1211,8 @@ _LOGGER = logging.getLogger(__name__)
 
 def init(host, user, password=None, port=None, database=None,
          connection_timeout=None, connection_attempts=None,
-         connection_delay=None, auth_plugin=None):
+         connection_delay=None, auth_plugin=None, group_commit=None,
+         prepared_stmts=None):
     """Initialize the persistance system.
 
     This function is idempotent in the sense that it can be executed
@@ -598,6 +1234,11 @@ def init(host, user, password=None, port=None, database=None,
     :param connection_delay: Delay after an atempt to connect or reconnect
                              to the database server. Default is
                              :const:`DEFAULT_CONNECT_DELAY`.
+    :param group_commit: Whether deferred statements are sent along with
+                         the next BEGIN or COMMIT.
+    :param prepared_stmts: Whether statements executed with the prepared
+                           option are sent as server-side prepared
+                           statements.
     """
     _LOGGER.info(
         "Initializing persister: user (%s), server (%s:%d), database (%s).",
@@ -609,7 +1250,8 @@ def init(host, user, password=None, port=None, database=None,
         connection_timeout=connection_timeout,
         connection_attempts=connection_attempts,
         connection_delay=connection_delay,
-        auth_plugin=auth_plugin
+        auth_plugin=auth_plugin, group_commit=group_commit,
+        prepared_stmts=prepared_stmts
     )
 
 def setup(config=None):
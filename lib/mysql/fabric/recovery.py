@@ -17,10 +17,24 @@
 
 """This module is responsible for ensuring that the system is in a
 consistent state after a crash.
+
+Procedures that were interrupted while executing a job have the job's undo
+action executed. Undo actions that lock any common object form a chain and
+are executed one after the other, whereas independent chains are executed
+concurrently. Afterwards, procedures that still have jobs to execute are
+rescheduled.
+
+Checkpoints are read in batches so that they are never all kept in memory.
+All batches are read within a single transaction through a dedicated
+persister, so checkpoints created by procedures that are undone or
+rescheduled while the recovery is running are never recovered twice.
 """
 import logging
+import time
 
 import mysql.fabric.executor as _executor
+import mysql.fabric.persistence as _persistence
+import mysql.fabric.utils as _utils
 
 from mysql.fabric.checkpoint import (
     Checkpoint,
@@ -28,56 +42,180 @@ from mysql.fabric.checkpoint import (
 
 _LOGGER = logging.getLogger(__name__)
 
+# Maximum number of checkpoints read from the state store at once.
+RECOVERY_BATCH_SIZE = 1000
+
+# Maximum number of undo chains executed at the same time.
+MAX_RECOVERY_WORKERS = 16
+
 def recovery():
     """Recover after a crash any incomplete procedure.
 
-    It assumes that the executor is already running and that the recovery
-    is sequential. In the future, we may consider optimizing this function.
+    It assumes that the executor is already running.
 
     :return: False, if nothing bad happened while recovering. Otherwise,
              return True.
     """
+    start = time.time()
     Checkpoint.cleanup()
 
+    reader = _persistence.get_persister()
+    reader.begin()
+    try:
+        return _recovery(reader, start)
+    finally:
+        reader.rollback()
+        _persistence.release_persister(reader)
+
+def _recovery(reader, start):
+    """Undo interrupted jobs and reschedule procedures reading checkpoints
+    through the reader's transaction.
+    """
+    n_unfinished, n_registered = Checkpoint.count_recovery(persister=reader)
+    if n_registered:
+        _LOGGER.info(
+            "Recovering %s procedure(s), %s of them interrupted while "
+            "executing a job.", n_registered, n_unfinished
+        )
+
     error = False
-    for checkpoint in Checkpoint.unfinished():
-
-        if checkpoint.undo_action:
-            procedure = _executor.Executor().enqueue_procedure(
-                False, checkpoint.undo_action,
-                "Recovering %s." % (checkpoint.undo_action, ),
-                checkpoint.lockable_objects,
-                *checkpoint.param_args, **checkpoint.param_kwargs
-                )
-            procedure.wait()
-            if procedure.status[-1]['success'] != _executor.Job.SUCCESS:
-                _LOGGER.error("Error while recovering %s.",
-                (checkpoint.do_action, ))
-                error = True
+    n_undone = 0
+    for checkpoints in Checkpoint.unfinished_batches(
+        RECOVERY_BATCH_SIZE, persister=reader):
+        chains = _group_by_lockable_objects(
+            checkpoint for checkpoint in checkpoints
+            if checkpoint.undo_action
+        )
+        outcomes = _utils.run_concurrently(
+            [_undo_chain_function(chain) for chain in chains],
+            MAX_RECOVERY_WORKERS
+        )
+        for result, chain_error in outcomes:
+            if chain_error is not None:
+                _LOGGER.error("Error while recovering: %s.", chain_error)
+            error = error or chain_error is not None or not result
+        n_undone += len(checkpoints)
+        _LOGGER.info(
+            "Recovery progress: %s of %s interrupted procedure(s) undone.",
+            n_undone, n_unfinished
+        )
 
+    n_rescheduled = 0
     actions = []
     procedure_uuid = None
-    for checkpoint in Checkpoint.registered():
-        actions.append({
-            "job" : checkpoint.job_uuid,
-            "action" : (checkpoint.do_action,
-            "Recovering %s." % (checkpoint.do_action, ),
-            checkpoint.param_args, checkpoint.param_kwargs)}
-            )
-
-        if procedure_uuid is not None and \
-            procedure_uuid != checkpoint.proc_uuid:
-            _executor.Executor().reschedule_procedure(
-                procedure_uuid, actions, checkpoint.lockable_objects
-            )
-            procedure_uuid = None
-            actions = []
-
-        procedure_uuid = checkpoint.proc_uuid
+    lockable_objects = None
+    for checkpoints in Checkpoint.registered_batches(
+        RECOVERY_BATCH_SIZE, persister=reader):
+        for checkpoint in checkpoints:
+            if procedure_uuid is not None and \
+                procedure_uuid != checkpoint.proc_uuid:
+                _executor.Executor().reschedule_procedure(
+                    procedure_uuid, actions, lockable_objects
+                )
+                n_rescheduled += 1
+                actions = []
+
+            procedure_uuid = checkpoint.proc_uuid
+            lockable_objects = checkpoint.lockable_objects
+            actions.append({
+                "job" : checkpoint.job_uuid,
+                "action" : (checkpoint.do_action,
+                "Recovering %s." % (checkpoint.do_action, ),
+                checkpoint.param_args, checkpoint.param_kwargs)}
+                )
+        _LOGGER.info(
+            "Recovery progress: %s of %s procedure(s) rescheduled.",
+            n_rescheduled, n_registered
+        )
 
     if procedure_uuid is not None:
         _executor.Executor().reschedule_procedure(
-            procedure_uuid, actions, checkpoint.lockable_objects
+            procedure_uuid, actions, lockable_objects
+        )
+        n_rescheduled += 1
+
+    if n_registered:
+        _LOGGER.info(
+            "Recovery finished in %.3f seconds: %s procedure(s) undone and "
+            "%s procedure(s) rescheduled.", time.time() - start, n_undone,
+            n_rescheduled
         )
 
     return error
+
+def _group_by_lockable_objects(checkpoints):
+    """Group checkpoints whose undo actions lock any common object.
+
+    Sets of lockable objects that overlap are merged, so checkpoints in
+    different groups never lock the same object and may be undone
+    concurrently. Checkpoints that do not lock any object form a single
+    group.
+
+    :param checkpoints: Iterable with checkpoints.
+    :return: List of lists of checkpoints in the order they were found.
+    """
+    parents = {}
+
+    def _find(obj):
+        """Return the object that represents the group of an object.
+        """
+        root = obj
+        while parents[root] != root:
+            root = parents[root]
+        while parents[obj] != root:
+            parents[obj], obj = root, parents[obj]
+        return root
+
+    found = []
+    for checkpoint in checkpoints:
+        objects = list(checkpoint.lockable_objects or ()) or [None]
+        for obj in objects:
+            parents.setdefault(obj, obj)
+        root = _find(objects[0])
+        for obj in objects[1:]:
+            other = _find(obj)
+            if other != root:
+                parents[other] = root
+        found.append((checkpoint, objects[0]))
+
+    chains = {}
+    order = []
+    for checkpoint, obj in found:
+        key = _find(obj)
+        if key not in chains:
+            chains[key] = []
+            order.append(key)
+        chains[key].append(checkpoint)
+    return [chains[key] for key in order]
+
+def _undo_chain_function(chain):
+    """Return a function that executes the undo actions of a chain of
+    checkpoints one after the other.
+
+    The function returns False if any undo action fails.
+    """
+    def _undo_chain():
+        """Execute the undo actions within a thread with its own
+        persister.
+        """
+        persister = _persistence.get_persister()
+        _persistence.PersistentMeta.init_thread(persister)
+        try:
+            success = True
+            for checkpoint in chain:
+                procedure = _executor.Executor().enqueue_procedure(
+                    False, checkpoint.undo_action,
+                    "Recovering %s." % (checkpoint.undo_action, ),
+                    checkpoint.lockable_objects,
+                    *checkpoint.param_args, **checkpoint.param_kwargs
+                    )
+                procedure.wait()
+                if procedure.status[-1]['success'] != _executor.Job.SUCCESS:
+                    _LOGGER.error("Error while recovering %s.",
+                    (checkpoint.do_action, ))
+                    success = False
+            return success
+        finally:
+            _persistence.PersistentMeta.deinit_thread()
+            _persistence.release_persister(persister)
+    return _undo_chain
@@ -36,10 +36,42 @@ _MASTER_POS_WAIT = "SELECT MASTER_POS_WAIT(%s, %s, %s)"
 
 _GTID_WAIT = "SELECT WAIT_UNTIL_SQL_THREAD_AFTER_GTIDS(%s, %s)"
 
+_SLAVE_THREADS_STATUS = (
+    "SELECT conn.SERVICE_STATE as Slave_IO_Running, "
+    "conn.LAST_ERROR_NUMBER as Last_IO_Errno, "
+    "conn.LAST_ERROR_MESSAGE as Last_IO_Error, "
+    "app.SERVICE_STATE as Slave_SQL_Running, "
+    "err.LAST_ERROR_NUMBER as Last_SQL_Errno, "
+    "err.LAST_ERROR_MESSAGE as Last_SQL_Error "
+    "FROM performance_schema.replication_connection_status AS conn "
+    "INNER JOIN performance_schema.replication_applier_status AS app "
+    "LEFT JOIN (SELECT LAST_ERROR_NUMBER = 0 AS no_error, 0 AS source, "
+    "LAST_ERROR_NUMBER, LAST_ERROR_MESSAGE "
+    "FROM performance_schema.replication_applier_status_by_coordinator "
+    "UNION ALL SELECT LAST_ERROR_NUMBER = 0, 1, "
+    "LAST_ERROR_NUMBER, LAST_ERROR_MESSAGE "
+    "FROM performance_schema.replication_applier_status_by_worker "
+    "ORDER BY no_error, source LIMIT 1) AS err ON TRUE"
+)
+
+# Dictionary that maps a server, i.e. its uuid and version, to whether its
+# slave's threads status can be read from the performance_schema.
+_PERFORMANCE_SCHEMA_STATUS = {}
+
 IO_THREAD = "IO_THREAD"
 
 SQL_THREAD = "SQL_THREAD"
 
+# Interval in seconds used to poll a slave's status for the first time
+# while waiting for a condition, i.e. slave's thread(s) start or stop.
+_MIN_POLL_INTERVAL = 0.005
+
+# The poll interval is multiplied by this factor after each attempt.
+_POLL_BACKOFF = 2
+
+# Maximum interval in seconds between two consecutive polls.
+_MAX_POLL_INTERVAL = 0.5
+
 @_server.server_logging
 def get_master_status(server):
     """Return the master status. In order to ease the navigation through
@@ -144,7 +176,9 @@ def is_slave_thread_running(server, threads=None):
 
     :param server: MySQL Server.
     """
-    return _check_condition(server, threads, True)
+    return _check_condition(
+        server, threads, True, _slave_threads_status_reader(server)
+    )
 
 @_server.server_logging
 def slave_has_master(server):
@@ -202,6 +236,84 @@ def get_num_gtid(gtids, server_uuid=None):
             difference += int(rgno) - int(lgno)
     return difference
 
+def parse_gtids(gtids):
+    """Parse a set of transactions into a dictionary.
+
+    The parsing is done locally so that sets of transactions can be
+    compared without asking a server to do so. For example, the set
+    "A:1-5:7,B:3" is transformed into {"A" : [(1, 5), (7, 7)],
+    "B" : [(3, 3)]}, where the intervals of each server are sorted and
+    merged.
+
+    :param gtids: Set of transactions.
+    :return: Dictionary that maps the servers' uuids in upper case to
+             lists with (first, last) intervals.
+    """
+    intervals = {}
+    sid = None
+    for gtid in gtids.replace("\n", "").split(","):
+        gtid = gtid.strip()
+        if not gtid:
+            continue
+        parts = gtid.split(":")
+        if len(parts) > 1:
+            sid = parts[0].strip().upper()
+            trx_ids = parts[1:]
+        elif sid:
+            trx_ids = parts
+        else:
+            raise _errors.ProgrammingError(
+                "Malformed GTID (%s)." % (gtid, )
+            )
+        for trx_id in trx_ids:
+            try:
+                if trx_id.find("-") != -1:
+                    lgno, rgno = trx_id.split("-")
+                    interval = (int(lgno), int(rgno))
+                else:
+                    interval = (int(trx_id), int(trx_id))
+            except ValueError:
+                raise _errors.ProgrammingError(
+                    "Malformed GTID (%s)." % (gtid, )
+                )
+            intervals.setdefault(sid, []).append(interval)
+
+    for sid, sid_intervals in intervals.items():
+        sid_intervals.sort()
+        merged = [sid_intervals[0]]
+        for lgno, rgno in sid_intervals[1:]:
+            last_lgno, last_rgno = merged[-1]
+            if lgno <= last_rgno + 1:
+                merged[-1] = (last_lgno, max(last_rgno, rgno))
+            else:
+                merged.append((lgno, rgno))
+        intervals[sid] = merged
+    return intervals
+
+def get_num_gtid_difference(gtids, other_gtids):
+    """Return the number of transactions in a set that are not in another
+    set.
+
+    :param gtids: Set of transactions parsed by :func:`parse_gtids`.
+    :param other_gtids: Set of transactions parsed by :func:`parse_gtids`.
+    """
+    difference = 0
+    for sid, intervals in gtids.items():
+        other_intervals = other_gtids.get(sid, [])
+        idx = 0
+        for lgno, rgno in intervals:
+            difference += rgno - lgno + 1
+            while idx < len(other_intervals) and \
+                other_intervals[idx][1] < lgno:
+                idx += 1
+            other_idx = idx
+            while other_idx < len(other_intervals) and \
+                other_intervals[other_idx][0] <= rgno:
+                other_lgno, other_rgno = other_intervals[other_idx]
+                difference -= min(rgno, other_rgno) - max(lgno, other_lgno) + 1
+                other_idx += 1
+    return difference
+
 def get_slave_num_gtid_behind(server, master_gtids, master_uuid=None):
     """Get the number of transactions behind the master.
 
@@ -302,17 +414,18 @@ def wait_for_slave_thread(server, timeout=None, wait_for_running=True,
     :param server: MySQL Server.
     :param timeout: Number of seconds one waits until the condition is
                     achieved. If it is None, one waits indefinitely.
+    :type timeout: Integer or float.
     :param wait_for_running: If one should check whether threads are
                              running or stopped.
     :type check_if_running: Bool
     :param threads: Which threads should be checked.
     :type threads: `SQL_THREAD` or `IO_THREAD`.
     """
-    while (timeout is None or timeout > 0) and \
-           not _check_condition(server, threads, wait_for_running):
-        time.sleep(1)
-        timeout = timeout - 1 if timeout is not None else None
-    if not _check_condition(server, threads, wait_for_running):
+    get_status = _slave_threads_status_reader(server)
+    if not _wait_for_condition(
+        lambda: _check_condition(server, threads, wait_for_running,
+                                 get_status),
+        timeout):
         raise _errors.TimeoutError(
             "Error waiting for slave's thread(s) to either start or stop."
             )
@@ -371,11 +484,8 @@ def wait_for_slave_status_thread(server, thread, status, timeout=None):
     :param timeout: Number of seconds one waits until the condition is
                     achieved. If it is None, one waits indefinitely.
     """
-    while (timeout is None or timeout > 0) and \
-           not _check_status_condition(server, thread, status):
-        time.sleep(1)
-        timeout = timeout - 1 if timeout is not None else None
-    if not _check_status_condition(server, thread, status):
+    if not _wait_for_condition(
+        lambda: _check_status_condition(server, thread, status), timeout):
         raise _errors.TimeoutError(
             "Error waiting for slave's thread (%s) to exhibit status (%s)." %
             (thread, status)
@@ -561,6 +671,33 @@ def check_slave_delay(slave, master):
     :param master: Reference to the master (MySQL Server).
     :return: A dictionary with delays, if there is any.
     """
+    status, _ = _check_slave_delay(slave, master)
+    return status
+
+@_server.server_logging
+def get_slave_lag(slave, master):
+    """Return how far a slave is behind its master.
+
+    Unlike :func:`check_slave_delay`, which reports no delay in this
+    case, the lag is unknown if `Seconds_Behind_Master` is NULL, i.e. the
+    slave's threads are not running.
+
+    :param slave: Reference to a slave (MySQL Server).
+    :param master: Reference to the master (MySQL Server).
+    :return: Tuple with the seconds and transactions behind the master or
+             None if the lag is unknown.
+    """
+    status, seconds_behind = _check_slave_delay(slave, master)
+    if status["is_not_running"] or status["is_not_configured"] or \
+        seconds_behind is None:
+        return None
+    return status["seconds_behind"], status["gtids_behind"]
+
+def _check_slave_delay(slave, master):
+    """Return the slave's delay as reported by :func:`check_slave_delay`
+    along with the slave's `Seconds_Behind_Master`, which is None if it is
+    unknown.
+    """
     status = {
         'is_not_running': False,
         'is_not_configured': False,
@@ -571,13 +708,13 @@ def check_slave_delay(slave, master):
 
     if not slave.is_connected() or not master.is_connected():
         status["is_not_running"] = True
-        return status
+        return status, None
 
     slave_status = get_slave_status(slave)
 
     if not slave_status:
         status["is_not_configured"] = True
-        return status
+        return status, None
 
     # Check if the slave must lag behind the master.
     sql_delay = slave_status[0].SQL_Delay
@@ -598,9 +735,86 @@ def check_slave_delay(slave, master):
         if num_gtids_behind:
             status["gtids_behind"] = num_gtids_behind
 
-    return status
+    return status, seconds_behind
+
+def _wait_for_condition(check, timeout):
+    """Wait until a condition is achieved or the timeout expires.
 
-def _check_condition(server, threads, check_if_running):
+    The condition is polled with an interval that starts at
+    `_MIN_POLL_INTERVAL` and is multiplied by `_POLL_BACKOFF` after each
+    attempt up to `_MAX_POLL_INTERVAL`. So changes that happen almost
+    immediately, such as a slave's thread starting, are noticed within
+    a few milliseconds while long waits do not flood the server with
+    queries.
+
+    :param check: Callable that returns whether the condition has been
+                  achieved or not.
+    :param timeout: Number of seconds one waits until the condition is
+                    achieved. If it is None, one waits indefinitely.
+    :return: Whether the condition has been achieved or not.
+    """
+    deadline = time.time() + timeout if timeout is not None else None
+    interval = _MIN_POLL_INTERVAL
+    while not check():
+        if deadline is not None:
+            remaining = deadline - time.time()
+            if remaining <= 0:
+                return False
+            interval = min(interval, remaining)
+        time.sleep(interval)
+        interval = min(interval * _POLL_BACKOFF, _MAX_POLL_INTERVAL)
+    return True
+
+def _slave_threads_status_reader(server):
+    """Return a function that fetches the status of the slave's threads.
+
+    If the server has the performance_schema's replication tables, i.e.
+    version 5.7.2 or later and the performance_schema is enabled, they
+    are used to fetch only the columns required to check the threads'
+    status in a single query. Otherwise, the `SHOW SLAVE STATUS` command
+    is used. Which one is used is checked once per server, so every poll
+    sends a single statement.
+
+    In both cases, the function returns a list of named tuples with the
+    following fields: Slave_IO_Running, Last_IO_Errno, Last_IO_Error,
+    Slave_SQL_Running, Last_SQL_Errno and Last_SQL_Error. The SQL thread's
+    error is the coordinator's one if a multi-threaded slave's coordinator
+    has stopped, like in `SHOW SLAVE STATUS`, or otherwise a worker's one.
+
+    :param server: MySQL Server.
+    """
+    key = (str(server.uuid), server.version)
+    supported = _PERFORMANCE_SCHEMA_STATUS.get(key)
+    if supported is None:
+        try:
+            supported = server.check_version_compat((5, 7, 2)) and \
+                server.get_variable("PERFORMANCE_SCHEMA") in ("ON", "1")
+        except (_errors.DatabaseError, AttributeError):
+            return lambda: get_slave_status(server)
+        _PERFORMANCE_SCHEMA_STATUS[key] = supported
+    if supported:
+        return lambda: _get_slave_threads_status(server)
+    return lambda: get_slave_status(server)
+
+def _get_slave_threads_status(server):
+    """Return the slave's threads status from the performance_schema's
+    replication tables. The thread's state is converted to the values
+    reported by `SHOW SLAVE STATUS`, i.e. "Yes", "No" or "Connecting".
+
+    :param server: MySQL Server.
+    """
+    ret = server.exec_stmt(_SLAVE_THREADS_STATUS, {"columns" : True})
+    states = {"ON" : "Yes", "OFF" : "No", "CONNECTING" : "Connecting"}
+    return [
+        row._replace(
+            Slave_IO_Running=states.get(row.Slave_IO_Running.upper(),
+                                        row.Slave_IO_Running),
+            Slave_SQL_Running=states.get(row.Slave_SQL_Running.upper(),
+                                         row.Slave_SQL_Running),
+        ) for row in ret
+    ]
+
+def _check_condition(server, threads, check_if_running, get_status=None):
     """Check if slave's threads are either running or stopped. If the
     `SQL_THREAD` or the `IO_THREAD` are stopped and there is an error,
     the :class:`~mysql.fabric.errors.DatabaseError` exception is raised.
@@ -611,6 +825,8 @@ def _check_condition(server, threads, check_if_running):
     :param check_if_running: If one should check whether threads are
                              running or stopped.
     :type check_if_running: Bool
+    :param get_status: Function used to fetch the slave's threads status.
+                       If it is None, `SHOW SLAVE STATUS` is used.
     """
     if not threads:
         threads = (SQL_THREAD, IO_THREAD)
@@ -622,7 +838,7 @@ def _check_condition(server, threads, check_if_running):
     io_errno = sql_errno = 0
     io_error = sql_error = ""
 
-    ret = get_slave_status(server)
+    ret = get_status() if get_status else get_slave_status(server)
     if ret:
         io_status = ret[0].Slave_IO_Running.upper() == check_stmt
         io_error = ret[0].Last_IO_Error
@@ -18,24 +18,74 @@
 """This is the scheduler which is used to guarantee that conflicting procedures
 cannot be concurrently executed. Locks are atomically acquired through the
 LockManager class in one single step thus avoiding deadlock issues.
+
+Procedures belong to a priority class. Failover and health procedures are
+served before administrative ones which are served before bulk data
+movement such as cloning a server or splitting a shard. To avoid
+starvation, a procedure's priority increases by one class for every
+:data:`AGING_INTERVAL` seconds it waits.
 """
+import collections
 import threading
 import logging
+import time
 import Queue
 
 import mysql.fabric.errors as _errors
 import mysql.fabric.utils as _utils
+import mysql.fabric.config as _config
 
 _LOGGER = logging.getLogger(__name__)
 
+# Priority classes. Lower values are served first.
+PRIORITY_FAILOVER = 0
+PRIORITY_ADMIN = 1
+PRIORITY_BULK = 2
+
+PRIORITY_CLASSES = ("failover", "admin", "bulk")
+
+# Time in seconds after which a waiting procedure is promoted by one
+# priority class.
+DEFAULT_AGING_INTERVAL = 10.0
+
+MIN_AGING_INTERVAL = 0.1
+
+AGING_INTERVAL = DEFAULT_AGING_INTERVAL
+
+def get_priority_class(procedure):
+    """Return a procedure's priority class. Procedures which do not define
+    one are administrative.
+    """
+    return getattr(procedure, "priority_class", PRIORITY_ADMIN)
+
+def get_effective_priority(priority_class, enqueued, now):
+    """Return the priority of a procedure taking into account how long it
+    has been waiting. Lower values are served first.
+
+    :param priority_class: Procedure's priority class.
+    :param enqueued: When the procedure was enqueued.
+    :param now: Current time.
+    """
+    return priority_class - (now - enqueued) / AGING_INTERVAL
+
 class Scheduler(object):
     """Class responsible for scheduling procedures.
+
+    Procedures waiting for a thread are kept in one queue per priority
+    class and :meth:`next_procedure` picks the head with the highest
+    effective priority. See :func:`get_effective_priority`.
     """
     def __init__(self):
         """Constructor for Scheduler.
         """
         self.__lock_manager = LockManager()
-        self.__queue = Queue.Queue()
+        self.__lock = threading.Condition()
+        self.__lanes = [collections.deque() for _ in PRIORITY_CLASSES]
+        self.__stops = 0
+        self.__statistics = [
+            {"dispatched" : 0, "wait_time" : 0.0, "max_wait_time" : 0.0}
+            for _ in PRIORITY_CLASSES
+        ]
 
     @property
     def lock_manager(self):
@@ -56,21 +106,58 @@ class Scheduler(object):
 
         :param procedure: Reference to a procedure.
         """
-        if procedure:
-            _LOGGER.debug("Enqueued procedure (%s).", procedure.uuid)
-        self.__queue.put(procedure)
+        with self.__lock:
+            if procedure:
+                _LOGGER.debug("Enqueued procedure (%s).", procedure.uuid)
+                self.__lanes[get_priority_class(procedure)].append(
+                    (procedure, time.time())
+                )
+            else:
+                self.__stops += 1
+            self.__lock.notify()
+
+    def get_number_pending(self):
+        """Return the approximate number of procedures that were enqueued
+        but have not been picked up by any thread yet.
+        """
+        with self.__lock:
+            return sum(len(lane) for lane in self.__lanes)
+
+    def get_statistics(self):
+        """Return how long procedures waited for a thread per priority
+        class::
+
+            {"failover" : {"pending" : 0, "dispatched" : 10,
+                           "wait_time" : 0.5, "max_wait_time" : 0.1},
+             ...
+            }
 
-    def next_procedure(self, condition=None):
+        :return: Dictionary with the number of procedures waiting, the
+                 number of procedures picked up by a thread, the total
+                 and maximum time in seconds they waited.
+        """
+        with self.__lock:
+            statistics = {}
+            for priority_class, name in enumerate(PRIORITY_CLASSES):
+                statistics[name] = dict(self.__statistics[priority_class])
+                statistics[name]["pending"] = len(self.__lanes[priority_class])
+            return statistics
+
+    def next_procedure(self, condition=None, timeout=None):
         """Get the next procedure to be executed.
 
         :param condition: Condition variable which is used to notify the
                           caller when the locks are acquired or another
                           thread breaks its locks.
+        :param timeout: Time in seconds to wait for a procedure or None
+                        to wait until one is enqueued.
         :return: Return a reference to a procedure that is ready to be
                  executed.
         :rtype: Procedure
+        :raises: Queue.Empty if no procedure is enqueued within the
+                 timeout.
         """
-        procedure = self.__queue.get()
+        procedure = self._dequeue_procedure(timeout)
         if procedure is not None:
             _LOGGER.debug("Locking procedure (%s).", procedure.uuid)
             self.__lock_manager.lock(
@@ -90,12 +177,209 @@ class Scheduler(object):
         """
         if procedure is not None:
             self.__lock_manager.release(procedure)
-            self.__queue.task_done()
             _LOGGER.debug("Unlocked procedure (%s).", procedure.uuid)
 
+    def _dequeue_procedure(self, timeout):
+        """Remove the procedure with the highest effective priority from
+        the queues. A request to stop is only served when there is no
+        procedure waiting.
+        """
+        deadline = None if timeout is None else time.time() + timeout
+        with self.__lock:
+            while True:
+                now = time.time()
+                best = None
+                for lane in self.__lanes:
+                    if not lane:
+                        continue
+                    procedure, enqueued = lane[0]
+                    priority = get_effective_priority(
+                        get_priority_class(procedure), enqueued, now
+                    )
+                    if best is None or priority < best[0] or \
+                        (priority == best[0] and enqueued < best[2]):
+                        best = (priority, lane, enqueued)
+                if best is not None:
+                    _, lane, enqueued = best
+                    procedure, _ = lane.popleft()
+                    wait_time = now - enqueued
+                    statistics = \
+                        self.__statistics[get_priority_class(procedure)]
+                    statistics["dispatched"] += 1
+                    statistics["wait_time"] += wait_time
+                    statistics["max_wait_time"] = \
+                        max(statistics["max_wait_time"], wait_time)
+                    return procedure
+                if self.__stops:
+                    self.__stops -= 1
+                    return None
+                if deadline is None:
+                    self.__lock.wait()
+                else:
+                    remaining = deadline - now
+                    if remaining <= 0:
+                        raise Queue.Empty
+                    self.__lock.wait(remaining)
+
+
+class _WaitQueue(object):
+    """Queue with the procedures that hold or wait for the lock on an
+    object. The head of the queue holds the lock.
+
+    It is implemented as a doubly linked list indexed by procedure so
+    that procedures can be appended or removed from anywhere in constant
+    time.
+
+    A procedure put in the queue with :meth:`insert` overtakes the ones
+    behind the last barrier with a lower effective priority. The head and
+    the procedures put in the queue with :meth:`append` are barriers and
+    are never overtaken. As effective priorities decrease at the same
+    pace, the procedures behind the last barrier stay sorted by effective
+    priority and, for each priority class, the last procedure that it
+    cannot overtake only moves towards the tail. This procedure is kept
+    for each priority class so that inserting is amortized constant time.
+    """
+    def __init__(self):
+        """Constructor for _WaitQueue.
+        """
+        self.__previous = {}
+        self.__next = {}
+        self.__head = None
+        self.__tail = None
+        # Dictionary that maps inserted procedures to their priority class
+        # and when they were enqueued.
+        self.__waiting = {}
+        # Last barrier or None if it is the head.
+        self.__barrier = None
+        # Dictionaries that map a barrier to the barriers ahead of it and
+        # behind it.
+        self.__ahead = {}
+        self.__behind = {}
+        # For each priority class, a procedure which is not behind the
+        # last one that it cannot overtake or None if it is the head.
+        self.__tails = [None] * len(PRIORITY_CLASSES)
+
+    def __len__(self):
+        """Return the number of procedures in the queue.
+        """
+        return len(self.__next)
+
+    def __iter__(self):
+        """Iterate over the procedures from the head to the tail.
+        """
+        procedure = self.__head
+        while procedure is not None:
+            yield procedure
+            procedure = self.__next[procedure]
+
+    def __contains__(self, procedure):
+        """Check whether a procedure is in the queue.
+        """
+        return procedure in self.__next
+
+    @property
+    def head(self):
+        """Return the procedure at the head of the queue or None.
+        """
+        return self.__head
+
+    def append(self, procedure):
+        """Put a procedure at the tail of the queue. It is never overtaken.
+        """
+        self._link(None, procedure)
+        self.__ahead[procedure] = self.__barrier
+        if self.__barrier is not None:
+            self.__behind[self.__barrier] = procedure
+        self.__barrier = procedure
+        self.__tails = [procedure] * len(PRIORITY_CLASSES)
+
+    def insert(self, procedure, priority_class, enqueued):
+        """Put a procedure ahead of the procedures behind the last barrier
+        with a lower effective priority.
+
+        :param procedure: Procedure to insert.
+        :param priority_class: Procedure's priority class.
+        :param enqueued: When the procedure is enqueued.
+        """
+        anchor = self.__tails[priority_class]
+        if anchor is None:
+            anchor = self.__head
+        successor = None
+        if anchor is not None:
+            successor = self.__next[anchor]
+            while successor in self.__waiting:
+                waiting_class, waiting_enqueued = self.__waiting[successor]
+                if get_effective_priority(waiting_class, waiting_enqueued,
+                    enqueued) > priority_class:
+                    break
+                successor = self.__next[successor]
+        self._link(successor, procedure)
+        self.__waiting[procedure] = (priority_class, enqueued)
+        self.__tails[priority_class] = procedure
+
+    def remove(self, procedure):
+        """Remove a procedure from the queue.
+
+        :raises: KeyError if the procedure is not in the queue.
+        """
+        previous = self.__previous.pop(procedure)
+        successor = self.__next.pop(procedure)
+        if previous is None:
+            self.__head = successor
+        else:
+            self.__next[previous] = successor
+        if successor is None:
+            self.__tail = previous
+        else:
+            self.__previous[successor] = previous
+
+        self.__waiting.pop(procedure, None)
+        tail = previous
+        if procedure in self.__ahead:
+            ahead = self.__ahead.pop(procedure)
+            behind = self.__behind.pop(procedure, None)
+            if behind is not None:
+                self.__ahead[behind] = ahead
+            else:
+                self.__barrier = ahead
+                # The procedures behind the previous barrier can be
+                # overtaken again if there is no procedure behind it.
+                if successor is None:
+                    tail = ahead
+            if behind is not None and ahead is not None:
+                self.__behind[ahead] = behind
+            elif ahead is not None:
+                del self.__behind[ahead]
+        self.__tails = [
+            tail if waiting is procedure else waiting
+            for waiting in self.__tails
+        ]
+
+    def _link(self, successor, procedure):
+        """Put a procedure ahead of another one or at the tail if the
+        successor is None.
+        """
+        assert(procedure not in self.__next)
+        if successor is None:
+            previous = self.__tail
+            self.__tail = procedure
+        else:
+            previous = self.__previous[successor]
+            self.__previous[successor] = procedure
+        if previous is None:
+            self.__head = procedure
+        else:
+            self.__next[previous] = procedure
+        self.__previous[procedure] = previous
+        self.__next[procedure] = successor
+
 
 class LockManager(object):
     """Class that implements a lock system.
+
+    Every operation on a request only touches the objects it asks for
+    and the procedures at the head of their queues, so its cost does
+    not depend on how many other requests are enqueued.
     """
     def __init__(self):
         """Constructor for the LockSystem.
@@ -105,7 +389,7 @@ class LockManager(object):
 
         # Dictionary that works as a set of queues and maps objects to
         # threads that acquired their locks or are willing to acquire
-        # them.
+        # them. See _WaitQueue.
         self.__objects = {}
 
         # Dictionary that maps a procedure to a 3-tuple that contains
@@ -114,9 +398,9 @@ class LockManager(object):
         # variable if there is any.
         self.__procedures = {}
 
-        # List with procedures that acquire all the necessary locks and
-        # can be executed.
-        self.__free = []
+        # Ordered set with procedures that acquire all the necessary locks
+        # and can be executed.
+        self.__free = collections.OrderedDict()
 
     @property
     def objects(self):
@@ -129,7 +413,9 @@ class LockManager(object):
         :rtype: Dictionary
         """
         with self.__lock:
-            return self.__objects.copy()
+            return dict(
+                (obj, list(queue)) for obj, queue in self.__objects.iteritems()
+            )
 
     @property
     def procedures(self):
@@ -161,7 +447,7 @@ class LockManager(object):
         :rtype: List
         """
         with self.__lock:
-            return list(self.__free)
+            return self.__free.keys()
 
     def lock(self, procedure, objects, force=False, condition=None):
         """Request locks for a procedure and wait until they are acquired.
@@ -294,10 +580,7 @@ class LockManager(object):
         # Remove the information on the procedure from the procedures'
         # dictionary and from the free list if it is there.
         del self.__procedures[procedure]
-        try:
-            self.__free.remove(procedure)
-        except ValueError:
-            pass
+        self.__free.pop(procedure, None)
 
         # Remove the information on the procedure from the objects'
         # dictionary.
@@ -311,21 +594,21 @@ class LockManager(object):
                 # If the queue is empty, remove the object from the
                 # dictionary.
                 del self.__objects[obj]
-            elif wait_queue[0] not in self.__free:
+            elif wait_queue.head not in self.__free:
                 # If a procedure is at the head of the queue it has a lock
                 # on the object.
-                head_procedures.add(wait_queue[0])
+                head_procedures.add(wait_queue.head)
 
         _LOGGER.debug("Possible affected procedures %s.", head_procedures)
         for procedure in head_procedures:
             objects, _, _ = self.__procedures[procedure]
-            procedures = set([self.__objects[obj][0] for obj in objects])
+            procedures = set([self.__objects[obj].head for obj in objects])
             assert(len(procedures) > 0)
             if procedures == set([procedure]):
                 _LOGGER.debug("Procedure %s is ready to be executed.", procedure)
                 # If the requested set of objects is equal to the acquired
                 # set of objects, the procedure is ready to go.
-                self.__free.append(procedure)
+                self.__free[procedure] = True
                 self.__lock.notify_all()
 
     def _enqueue(self, procedure, objects):
@@ -348,17 +631,28 @@ class LockManager(object):
             pass
 
         ready = True
+        now = time.time()
         for obj in objects:
-            queue = self.__objects.get(obj, [])
+            queue = self.__objects.get(obj)
+            if queue is None:
+                queue = self.__objects[obj] = _WaitQueue()
             if len(queue) != 0:
                 ready = False
-            queue.append(procedure)
-            self.__objects[obj] = queue
+            # A procedure that requests a single object overtakes waiting
+            # procedures with a lower effective priority that also request
+            # only this object. The head of the queue and procedures that
+            # request several objects are never overtaken so that the order
+            # in which multiple locks are granted does not change and no
+            # deadlock can be introduced.
+            if len(objects) == 1:
+                queue.insert(procedure, get_priority_class(procedure), now)
+            else:
+                queue.append(procedure)
 
         self.__procedures[procedure] = (objects, None, None)
 
         if ready:
-            self.__free.append(procedure)
+            self.__free[procedure] = True
             self.__lock.notify_all()
 
     def _check_conflicts(self, objects):
@@ -366,7 +660,7 @@ class LockManager(object):
         for locks on a list of objects given as parameter.
         """
         assert(isinstance(objects, set))
-        procedures = [self.__objects.get(obj, []) for obj in objects]
+        procedures = [self.__objects.get(obj, ()) for obj in objects]
         return list(set([proc for lst_proc in procedures for proc in lst_proc]))
 
     def _break_conflicts(self, objects):
@@ -421,3 +715,19 @@ class LockManager(object):
             raise _errors.LockManagerError(
                 "The procedure (%s) was never enqueued." % (procedure, )
             )
+
+def configure(config):
+    """Set configuration values.
+    """
+    global AGING_INTERVAL
+    try:
+        aging_interval = float(config.get("executor", "priority_aging"))
+        if aging_interval < MIN_AGING_INTERVAL:
+            _LOGGER.warning(
+                "Priority aging interval cannot be lower than %s.",
+                MIN_AGING_INTERVAL
+            )
+            aging_interval = MIN_AGING_INTERVAL
+        AGING_INTERVAL = aging_interval
+    except (_config.NoOptionError, _config.NoSectionError, ValueError):
+        pass
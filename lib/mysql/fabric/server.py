@@ -61,7 +61,8 @@ from mysql.fabric.server_utils import (
     disconnect_mysql_connection,
     destroy_mysql_connection,
     split_host_port,
-    is_valid_mysql_connection
+    is_valid_mysql_connection,
+    StatementTracer,
 )
 
 _LOGGER = logging.getLogger(__name__)
@@ -88,6 +89,31 @@ def server_logging(function):
         return ret
     return wrapper_check
 
+def _query_by_group_ids(query, column, group_ids, persister):
+    """Execute a query that loads rows for a set of groups.
+
+    The state store compares groups' ids according to the column's
+    collation, so the rows that it returns may not hold the ids that were
+    requested. The query's first column tells which of the requested ids
+    each row matches and the placeholders are replaced by
+    :func:`~mysql.fabric.utils.in_list_matches` and
+    :func:`~mysql.fabric.utils.in_list_placeholders`.
+    """
+    return persister.exec_stmt(
+        query % (_utils.in_list_matches(column, group_ids),
+                 _utils.in_list_placeholders(group_ids)),
+        {"params" : group_ids + group_ids}
+    )
+
+def _requested_group_ids(matches, group_ids):
+    """Return the requested groups' ids that a row matches.
+    """
+    requested = []
+    for group_id, match in zip(group_ids, str(matches)):
+        if match == "1" and group_id not in requested:
+            requested.append(group_id)
+    return requested
+
 
 class Group(_persistence.Persistable):
     """Provide interfaces to organize servers into groups.
@@ -167,6 +193,23 @@ class Group(_persistence.Persistable):
     QUERY_GROUP = ("SELECT group_id, description, master_uuid, "
                    "master_defined, status FROM groups WHERE group_id = %s")
 
+    #SQL Statement to retrieve a set of groups from the state_store along
+    #with the requested ids that each one matches. See _query_by_group_ids.
+    QUERY_GROUPS_BY_ID = ("SELECT %s, group_id, description, master_uuid, "
+                          "master_defined, status FROM groups "
+                          "WHERE group_id IN (%s)")
+
+    #SQL Statement to retrieve a set of groups along with their servers
+    #from the state_store. Groups without servers are returned in a single
+    #row whose server's columns are NULL.
+    QUERY_GROUPS_WITH_SERVERS = (
+        "SELECT %s, g.group_id, g.description, g.master_uuid, "
+        "g.master_defined, g.status, s.server_uuid, s.server_address, "
+        "s.mode, s.status, s.weight, s.group_id FROM groups AS g "
+        "LEFT JOIN servers AS s ON s.group_id = g.group_id "
+        "WHERE g.group_id IN (%s)"
+        )
+
     #SQL Statement to update the group's master.
     UPDATE_MASTER = ("UPDATE groups SET master_uuid = %s, master_defined = %s "
                      "WHERE group_id = %s")
@@ -505,20 +548,93 @@ class Group(_persistence.Persistable):
                  None if the Group object does not exist.
         """
         group = None
-        cur = persister.exec_stmt(
-            Group.QUERY_GROUP, {"fetch" : False, "params" : (group_id, )}
+        rows = _persistence.ObjectCache.fetch(
+            ("groups", group_id), ("groups", ),
+            lambda: persister.exec_stmt(
+                Group.QUERY_GROUP,
+                {"params" : (group_id, ), "prepared" : True}
+            ), persister
         )
-        row = cur.fetchone()
-        if row:
-            group_id, description, master, master_defined, status = row
-            if master:
-                master = _uuid.UUID(master)
-            group = Group(
-                group_id=group_id, description=description, master=master,
-                master_defined=master_defined, status=status
-                )
+        if rows:
+            group = Group._from_row(rows[0])
         return group
 
+    @staticmethod
+    def fetch_many(group_ids, persister=None):
+        """Return the group objects identified by a set of group_ids by
+        loading them from the state store in a single statement.
+
+        :param group_ids: List with the group_ids.
+        :param persister: Persister to persist the object to.
+        :return: Dictionary where keys are the requested group_ids and
+                 values are the Group objects. Groups that do not exist
+                 are not in the dictionary.
+        """
+        group_ids = tuple(group_ids)
+        if not group_ids:
+            return {}
+
+        rows = _persistence.ObjectCache.fetch(
+            ("groups", group_ids), ("groups", ),
+            lambda: _query_by_group_ids(
+                Group.QUERY_GROUPS_BY_ID, "group_id", group_ids, persister
+            ), persister
+        )
+        groups = {}
+        for row in rows:
+            group = Group._from_row(row[1:])
+            for group_id in _requested_group_ids(row[0], group_ids):
+                groups[group_id] = group
+        return groups
+
+    @staticmethod
+    def fetch_with_servers(group_ids, persister=None):
+        """Return the group objects identified by a set of group_ids along
+        with their servers by loading them from the state store in a single
+        statement.
+
+        :param group_ids: List with the group_ids.
+        :param persister: Persister to persist the object to.
+        :return: Dictionary where keys are the requested group_ids and
+                 values are tuples with the Group object and a list with
+                 its servers. Groups that do not exist are not in the
+                 dictionary.
+        """
+        group_ids = tuple(group_ids)
+        if not group_ids:
+            return {}
+
+        rows = _persistence.ObjectCache.fetch(
+            ("groups_servers", group_ids), ("groups", "servers"),
+            lambda: _query_by_group_ids(
+                Group.QUERY_GROUPS_WITH_SERVERS, "g.group_id", group_ids,
+                persister
+            ), persister
+        )
+        found = {}
+        groups = {}
+        for row in rows:
+            group_id = row[1]
+            if group_id not in found:
+                found[group_id] = (Group._from_row(row[1:6]), [])
+                for requested_id in _requested_group_ids(row[0], group_ids):
+                    groups[requested_id] = found[group_id]
+            if row[6] is not None:
+                found[group_id][1].append(MySQLServer(row=row[6:]))
+        return groups
+
+    @staticmethod
+    def _from_row(row):
+        """Return a group object from a row read from the state store.
+        """
+        group_id, description, master, master_defined, status = row
+        if master:
+            master = _uuid.UUID(master)
+        return Group(
+            group_id=group_id, description=description, master=master,
+            master_defined=master_defined, status=status
+            )
+
     @staticmethod
     def add(group, persister=None):
         """Write a group object into the state store.
@@ -554,19 +670,196 @@ class Group(_persistence.Persistable):
         )
 
 
+class _ServerConnections(object):
+    """Connections to a single server along with the lock that protects
+    them.
+
+    :ivar lock: Condition used to protect the other attributes and wait
+                for connections to be released.
+    :ivar idle: List with (connection, created, released) tuples.
+    :ivar tracker: Dictionary that maps connections in use to when they
+                   were created.
+    :ivar statistics: Dictionary with the counters in
+                      ConnectionManager.STATISTICS.
+    """
+    def __init__(self):
+        """Constructor for _ServerConnections.
+        """
+        self.lock = threading.Condition(threading.Lock())
+        self.idle = []
+        self.tracker = {}
+        self.statistics = dict(
+            (name, 0) for name in ConnectionManager.STATISTICS
+        )
+
+
 class ConnectionManager(_utils.Singleton):
     """Manages MySQL Servers' connections.
 
     The pool is internally implemented as a dictionary that maps a server's
-    uuid to a sequence of connections.
+    uuid to its idle connections, the connections in use and counters.
+    Each server has its own lock so that requests to different servers do
+    not contend with each other, and sockets are closed after the lock is
+    released. The most recently released connection is reused first so
+    that the others may become idle for long enough to be evicted.
+
+    The pool may be bounded through the following limits which are set per
+    server:
+
+    * MAX_IDLE - Maximum number of idle connections kept in the pool.
+    * MAX_TOTAL - Maximum number of pooled connections, either idle or in
+      use. When it is reached, requests wait up to WAIT_TIMEOUT seconds for
+      a connection to be released. Zero means no limit.
+    * IDLE_TIMEOUT - Idle connections older than this are evicted by a
+      background thread. Zero disables the eviction.
+    * MAX_AGE - Connections older than this are closed instead of being
+      reused. Zero means no limit.
     """
+    MAX_IDLE = 16
+    MAX_TOTAL = 0
+    WAIT_TIMEOUT = 10.0
+    IDLE_TIMEOUT = 300.0
+    MAX_AGE = 3600.0
+
+    _MIN_EVICTION_INTERVAL = 1.0
+
+    STATISTICS = ('hits', 'misses', 'creates', 'evictions', 'waits',
+                  'wait_time')
+
     def __init__(self):
         """Creates a ConnectionManager object.
         """
         super(ConnectionManager, self).__init__()
-        self.__pool = {}
-        self.__lock = threading.RLock()
-        self.__tracker = {}
+        self.__servers = {}
+        self.__lock = threading.Lock()
+        self.__evictor = None
+        self.__stop = threading.Event()
+
+    def _get_server_connections(self, uuid):
+        """Return the object that holds the connections to a server.
+        """
+        try:
+            return self.__servers[uuid]
+        except KeyError:
+            with self.__lock:
+                return self.__servers.setdefault(uuid, _ServerConnections())
+
+    def start(self):
+        """Start the thread that evicts idle connections.
+        """
+        with self.__lock:
+            if self.__evictor is None and ConnectionManager.IDLE_TIMEOUT > 0:
+                self.__stop.clear()
+                self.__evictor = threading.Thread(
+                    target=self._run_eviction, name="ConnectionEvictor"
+                )
+                self.__evictor.daemon = True
+                self.__evictor.start()
+
+    def shutdown(self):
+        """Stop the thread that evicts idle connections.
+        """
+        with self.__lock:
+            self.__stop.set()
+            self.__evictor = None
+
+    def _run_eviction(self):
+        """Periodically evict idle connections.
+        """
+        interval = max(
+            ConnectionManager.IDLE_TIMEOUT / 2,
+            ConnectionManager._MIN_EVICTION_INTERVAL
+        )
+        while not self.__stop.is_set():
+            try:
+                self.evict_connections()
+            except Exception as error:
+                _LOGGER.exception(error)
+            self.__stop.wait(interval)
+
+    def evict_connections(self):
+        """Close idle connections that were not used for more than
+        IDLE_TIMEOUT seconds or are older than MAX_AGE seconds.
+        """
+        now = time.time()
+        for connections in self.__servers.values():
+            evicted = []
+            with connections.lock:
+                kept = []
+                for entry in connections.idle:
+                    if self._is_expired(entry, now):
+                        evicted.append(entry[0])
+                    else:
+                        kept.append(entry)
+                if evicted:
+                    connections.idle = kept
+                    connections.statistics['evictions'] += len(evicted)
+                    connections.lock.notify_all()
+            self._destroy_connections(evicted)
+
+    @staticmethod
+    def _is_expired(entry, now):
+        """Check whether an idle connection must be evicted.
+
+        :param entry: Tuple with the connection, when it was created and
+                      when it was released.
+        """
+        _, created, released = entry
+        return (ConnectionManager.IDLE_TIMEOUT > 0 and \
+            now - released > ConnectionManager.IDLE_TIMEOUT) or \
+            ConnectionManager._is_retired(created, now)
+
+    @staticmethod
+    def _is_retired(created, now):
+        """Check whether a connection is too old to be reused.
+        """
+        return ConnectionManager.MAX_AGE > 0 and \
+            now - created > ConnectionManager.MAX_AGE
+
+    @staticmethod
+    def _destroy_connections(connections):
+        """Close connections abruptly without holding any lock.
+        """
+        for cnx in connections:
+            _LOGGER.debug("Releasing connection (%s).", cnx)
+            try:
+                destroy_mysql_connection(cnx)
+            except _errors.DatabaseError as error:
+                _LOGGER.debug("Error releasing connection (%s): %s.",
+                              cnx, error)
+
+    @staticmethod
+    def _wait_for_slot(server, connections):
+        """Wait until a new connection to a server may be created without
+        exceeding MAX_TOTAL. The server's lock must be held.
+
+        :return: Whether there is a connection in the pool that may be
+                 used instead.
+        """
+        if ConnectionManager.MAX_TOTAL <= 0 or \
+            server.user != server.server_user:
+            return False
+        start = time.time()
+        waited = False
+        while len(connections.tracker) + len(connections.idle) >= \
+            ConnectionManager.MAX_TOTAL:
+            if connections.idle:
+                break
+            remaining = start + ConnectionManager.WAIT_TIMEOUT - time.time()
+            if remaining <= 0:
+                connections.statistics['wait_time'] += time.time() - start
+                raise _errors.DatabaseError(
+                    "Timeout waiting for a connection to server (%s). There "
+                    "are already (%s) connections." %
+                    (server.uuid, ConnectionManager.MAX_TOTAL)
+                )
+            if not waited:
+                connections.statistics['waits'] += 1
+                waited = True
+            connections.lock.wait(remaining)
+        if waited:
+            connections.statistics['wait_time'] += time.time() - start
+        return bool(connections.idle)
 
     def _do_create_connection(self, server):
         """Create a connection and return it.
@@ -578,16 +871,26 @@ class ConnectionManager(_utils.Singleton):
         any call that might be hanged because of a faulty server.
         """
         cnx = None
+        connections = self._get_server_connections(server.uuid)
 
-        with self.__lock:
+        with connections.lock:
+            if self._wait_for_slot(server, connections):
+                return None
             cnx = create_mysql_connection()
-            self._track_connection(server, cnx)
+            self._track_connection(server, cnx, time.time())
+            connections.statistics['creates'] += 1
 
         host, port = split_host_port(server.address)
-        connect_to_mysql(
-            cnx, autocommit=True, host=host, port=port,
-            user=server.user, passwd=server.passwd
-        )
+        try:
+            connect_to_mysql(
+                cnx, autocommit=True, host=host, port=port,
+                user=server.user, passwd=server.passwd
+            )
+        except _errors.DatabaseError:
+            with connections.lock:
+                self._untrack_connection(server, cnx)
+                connections.lock.notify_all()
+            raise
         return cnx
 
     def _do_get_connection(self, server):
@@ -600,49 +903,54 @@ class ConnectionManager(_utils.Singleton):
         if server.user != server.server_user:
             return
         # Since we need a server_user connection, we can now immediately
-        # pop one from the pool.
-        with self.__lock:
-            try:
-                cnx = self.__pool[server.uuid].pop()
-                self._track_connection(server, cnx)
-            except (KeyError, IndexError):
-                pass
+        # pop one from the pool. Connections that are too old are retired.
+        connections = self._get_server_connections(server.uuid)
+        retired = []
+        with connections.lock:
+            while True:
+                try:
+                    cnx, created, _ = connections.idle.pop()
+                except IndexError:
+                    connections.statistics['misses'] += 1
+                    cnx = None
+                    break
+                if self._is_retired(created, time.time()):
+                    retired.append(cnx)
+                    connections.statistics['evictions'] += 1
+                    continue
+                self._track_connection(server, cnx, created)
+                connections.statistics['hits'] += 1
+                break
+        self._destroy_connections(retired)
         return cnx
 
-    def _track_connection(self, server, cnx):
-        """Register that a connection is about to be used.
+    def _track_connection(self, server, cnx, created):
+        """Register that a connection is about to be used. The server's
+        lock must be held.
         """
-        tracker = self.__tracker.get(server.uuid, [])
+        tracker = self._get_server_connections(server.uuid).tracker
         assert cnx not in tracker
-        tracker.append(cnx)
-        self.__tracker[server.uuid] = tracker
+        tracker[cnx] = created
         _LOGGER.debug("Track %s %s", str(server.uuid), str(cnx))
 
     def _untrack_connection(self, server, cnx):
-        """Unregister a connection after its use.
+        """Unregister a connection after its use. The server's lock must be
+        held.
+
+        :return: When the connection was created or None if it was not
+                 tracked.
         """
         # In some cases it can happen, that a server object is copied.
         # And so it can happen, that the same connection is tried to
         # untrack twice. Be cautious, not to raise an exception in this
         # case.
-        try:
-            tracker = self.__tracker[server.uuid]
-        except KeyError:
-            _LOGGER.debug("Nothing tracked for %s %s",
-                          str(server.uuid), str(cnx))
-        else:
-            # tracker is a list of cnx objects.
-            try:
-                tracker.remove(cnx)
-            except ValueError:
-                _LOGGER.debug("Not tracked %s %s",
-                              str(server.uuid), str(cnx))
-            finally:
-                # If we removed the last connection for this server,
-                # remove the whole mapping entry.
-                if len(tracker) == 0:
-                    del self.__tracker[server.uuid]
-            _LOGGER.debug("Untracking %s %s", str(server.uuid), str(cnx))
+        tracker = self._get_server_connections(server.uuid).tracker
+        # tracker maps cnx objects to their creation time.
+        created = tracker.pop(cnx, None)
+        if created is None:
+            _LOGGER.debug("Not tracked %s %s", str(server.uuid), str(cnx))
+        _LOGGER.debug("Untracking %s %s", str(server.uuid), str(cnx))
+        return created
 
     def get_connection(self, server):
         """Get a connection.
@@ -650,79 +958,114 @@ class ConnectionManager(_utils.Singleton):
         The method gets a connection from a pool if there is any or
         create a fresh one.
         """
-        cnx = self._do_get_connection(server)
-        while cnx:
-            assert server.user != None and cnx.user == server.user
-            if is_valid_mysql_connection(cnx):
-                return cnx
-            cnx = self._do_get_connection(server)
-        return self._do_create_connection(server)
+        connections = self._get_server_connections(server.uuid)
+        invalid = []
+        try:
+            while True:
+                cnx = self._do_get_connection(server)
+                while cnx:
+                    assert server.user != None and cnx.user == server.user
+                    if is_valid_mysql_connection(cnx):
+                        return cnx
+                    with connections.lock:
+                        self._untrack_connection(server, cnx)
+                        connections.lock.notify_all()
+                    invalid.append(cnx)
+                    cnx = self._do_get_connection(server)
+                # If a connection was released while waiting to create a
+                # new one, try the pool again.
+                cnx = self._do_create_connection(server)
+                if cnx is not None:
+                    return cnx
+        finally:
+            self._destroy_connections(invalid)
 
     def release_connection(self, server, cnx):
         """Release a connection to the pool.
 
         It is up to the developer to check if the connection is still
         valid and belongs to this server before returning it to the
-        pool.
+        pool. The connection is closed instead if the pool already has
+        MAX_IDLE idle connections or the connection is older than MAX_AGE.
         """
         assert cnx is not None
+        connections = self._get_server_connections(server.uuid)
         # The pool of inactive connections holds only those connections,
         # that use the server_user credentials. Other connections are
         # established and disconnected directly, bypassing the pool.
         if server.user != server.server_user:
-            self._untrack_connection(server, cnx)
+            with connections.lock:
+                self._untrack_connection(server, cnx)
+                connections.lock.notify_all()
             disconnect_mysql_connection(cnx)
             return
         # Since we have a server_user connection, we can put it in the pool.
-        with self.__lock:
-            try:
-                self._untrack_connection(server, cnx)
-                if server.uuid not in self.__pool:
-                    self.__pool[server.uuid] = []
-                self.__pool[server.uuid].append(cnx)
-            except (KeyError, ValueError):
-                pass
+        now = time.time()
+        evicted = None
+        with connections.lock:
+            created = self._untrack_connection(server, cnx)
+            if created is None:
+                created = now
+            if len(connections.idle) >= ConnectionManager.MAX_IDLE or \
+                self._is_retired(created, now):
+                evicted = cnx
+                connections.statistics['evictions'] += 1
+            else:
+                connections.idle.append((cnx, created, now))
+            connections.lock.notify_all()
+        if evicted is not None:
+            self._destroy_connections([evicted])
 
     def get_number_connections(self, server):
         """Return the number of connections available in the pool.
         """
-        with self.__lock:
-            try:
-                return len(self.__pool[server.uuid])
-            except KeyError:
-                pass
-        return 0
+        connections = self.__servers.get(server.uuid)
+        if connections is None:
+            return 0
+        with connections.lock:
+            return len(connections.idle)
+
+    def get_statistics(self):
+        """Return statistics on the connections to each server.
+
+        :return: Dictionary that maps servers' uuids to dictionaries with
+                 the number of idle connections, connections in use and the
+                 counters in STATISTICS.
+        """
+        statistics = {}
+        for uuid, connections in self.__servers.items():
+            with connections.lock:
+                info = dict(connections.statistics)
+                info['idle'] = len(connections.idle)
+                info['in_use'] = len(connections.tracker)
+            statistics[uuid] = info
+        return statistics
 
     def purge_connections(self, server):
         """Close and remove all connections that belongs to a MySQL Server
         which is associated to a server.
         """
         _LOGGER.debug("Purging connections for %s", str(server.uuid))
-        with self.__lock:
-            try:
-                for cnx in self.__pool[server.uuid]:
-                    _LOGGER.debug("Releasing connection (%s).", cnx)
-                    destroy_mysql_connection(cnx)
-                del self.__pool[server.uuid]
-            except KeyError:
-                pass
-            try:
-                for cnx in self.__tracker[server.uuid]:
-                    _LOGGER.debug("Releasing connection (%s).", cnx)
-                    destroy_mysql_connection(cnx)
-                del self.__tracker[server.uuid]
-            except KeyError:
-                pass
+        connections = self.__servers.get(server.uuid)
+        if connections is None:
+            return
+        with connections.lock:
+            purged = [entry[0] for entry in connections.idle]
+            purged.extend(connections.tracker.keys())
+            connections.idle = []
+            connections.tracker = {}
+            connections.lock.notify_all()
+        self._destroy_connections(purged)
 
     def kill_connections(self, server):
         """Close all connections that are in use and belong to a MySQL Server.
         """
-        with self.__lock:
-            try:
-                for cnx in self.__tracker[server.uuid]:
-                    destroy_mysql_connection(cnx)
-            except KeyError:
-                pass
+        connections = self.__servers.get(server.uuid)
+        if connections is None:
+            return
+        with connections.lock:
+            killed = connections.tracker.keys()
+        self._destroy_connections(killed)
 
 class MySQLServer(_persistence.Persistable):
     """Proxy class that provides an interface to access a MySQL Server
@@ -829,6 +1172,15 @@ class MySQLServer(_persistence.Persistable):
         "FROM servers WHERE group_id = %s"
         )
 
+    #SQL Statement to retrieve the servers in a set of groups from the state
+    #store along with the requested ids that each one matches. See
+    #_query_by_group_ids.
+    QUERY_SERVERS_BY_GROUP_IDS = (
+        "SELECT %s, server_uuid, server_address, mode, status, weight, "
+        "group_id "
+        "FROM servers WHERE group_id IN (%s)"
+        )
+
     #SQL Statement to retrieve a server from the state store.
     QUERY_SERVER_BY_ADDRESS = (
         "SELECT server_uuid, server_address, mode, status, weight, group_id "
@@ -1379,14 +1731,46 @@ class MySQLServer(_persistence.Persistable):
                           state store.
         """
         ret = []
-        rows = persister.exec_stmt(MySQLServer.QUERY_SERVER_BY_GROUP_ID,
-            {"params" : (group_id, )}
+        rows = _persistence.ObjectCache.fetch(
+            ("servers", "group_id", group_id), ("servers", ),
+            lambda: persister.exec_stmt(MySQLServer.QUERY_SERVER_BY_GROUP_ID,
+                {"params" : (group_id, )}
+            ), persister
         )
         for row in rows:
             server = MySQLServer(row=row)
             ret.append(server)
         return ret
 
+    @staticmethod
+    def servers_for_groups(group_ids, persister=None):
+        """Return the servers in a set of groups by loading them from the
+        state store in a single statement.
+
+        :param group_ids: List with the groups' ids.
+        :param persister: The DB server that can be used to access the
+                          state store.
+        :return: Dictionary where keys are the requested groups' ids and
+                 values are lists with their servers.
+        """
+        group_ids = tuple(group_ids)
+        servers = dict((group_id, []) for group_id in group_ids)
+        if not group_ids:
+            return servers
+
+        rows = _persistence.ObjectCache.fetch(
+            ("servers", "group_ids", group_ids), ("servers", ),
+            lambda: _query_by_group_ids(
+                MySQLServer.QUERY_SERVERS_BY_GROUP_IDS, "group_id", group_ids,
+                persister
+            ), persister
+        )
+        for row in rows:
+            server = MySQLServer(row=row[1:])
+            for group_id in _requested_group_ids(row[0], group_ids):
+                servers[group_id].append(server)
+        return servers
+
     def check_version_compat(self, expected_version):
         """Check version of the server against requested version.
 
@@ -1630,14 +2014,15 @@ class MySQLServer(_persistence.Persistable):
         except (ValueError, TypeError, AttributeError):
             query = MySQLServer.QUERY_SERVER_BY_ADDRESS
 
-        cur = persister.exec_stmt(query, {
-            "fetch" : False,
-            "params" : (server_id, )
-        })
+        rows = _persistence.ObjectCache.fetch(
+            ("servers", query, server_id), ("servers", ),
+            lambda: persister.exec_stmt(
+                query, {"params" : (server_id, ), "prepared" : True}
+            ), persister
+        )
 
-        row = cur.fetchone()
-        if row:
-            return MySQLServer(row=row)
+        if rows:
+            return MySQLServer(row=rows[0])
 
     @staticmethod
     def dump_servers(version=None, patterns="", persister=None):
@@ -1746,6 +2131,40 @@ def configure(config):
     except (_config.NoOptionError, _config.NoSectionError, ValueError):
         pass
 
+    for option, attribute, cast in (
+        ("pool_max_idle", "MAX_IDLE", int),
+        ("pool_max_total", "MAX_TOTAL", int),
+        ("pool_wait_timeout", "WAIT_TIMEOUT", float),
+        ("pool_idle_timeout", "IDLE_TIMEOUT", float),
+        ("pool_max_age", "MAX_AGE", float),
+    ):
+        try:
+            value = cast(config.get("servers", option))
+            if value < 0:
+                _LOGGER.warning("Option (%s) cannot be lower than 0.", option)
+                value = cast(0)
+            setattr(ConnectionManager, attribute, value)
+        except (_config.NoOptionError, _config.NoSectionError, ValueError):
+            pass
+
+    try:
+        value = config.get("statistics", "statement_tracing")
+        StatementTracer.ENABLED = value.lower() == "yes"
+    except (_config.NoOptionError, _config.NoSectionError):
+        pass
+
+    try:
+        value = float(config.get("statistics", "statement_sampling"))
+        if not 0.0 < value <= 1.0:
+            _LOGGER.warning(
+                "Option (statement_sampling) must be greater than 0 and "
+                "not greater than 1."
+            )
+            value = min(max(value, 0.001), 1.0)
+        StatementTracer.SAMPLING = value
+    except (_config.NoOptionError, _config.NoSectionError, ValueError):
+        pass
+
     try:
         failover_interval = config.get("failure_tracking", "failover_interval")
         Group._FAILOVER_INTERVAL = int(failover_interval)
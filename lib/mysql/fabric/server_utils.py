@@ -17,7 +17,13 @@
 
 """Define functions that can be used throughout the code.
 """
+import bisect
+import decimal
 import logging
+import random
+import re
+import threading
+import time
 import mysql.connector
 
 import mysql.fabric.errors as _errors
@@ -26,6 +32,130 @@ _LOGGER = logging.getLogger(__name__)
 
 MYSQL_DEFAULT_PORT = 3306
 
+# Upper bounds in seconds of the buckets in the statements' latency
+# histograms.
+TRACE_BUCKETS = (0.0001, 0.001, 0.01, 0.1, 1.0)
+
+# Servers to which traced statements are sent.
+TRACE_TARGETS = ("store", "servers")
+
+class StatementTracer(object):
+    """Accumulate per statement counters and latency histograms.
+
+    Tracing is disabled by default and costs a single check per statement
+    in that case. When enabled, a fraction of the statements given by
+    :attr:`SAMPLING` is timed and recorded under its template, which is the
+    statement with literals replaced by placeholders, and under the kind of
+    server it was sent to: the state store, i.e. one of the addresses in
+    :attr:`STORE_ADDRESSES`, or a managed server.
+    """
+    ENABLED = False
+    SAMPLING = 1.0
+    STORE_ADDRESSES = frozenset()
+
+    # Maximum number of templates recorded per target. Statements whose
+    # templates do not fit are recorded under :attr:`OTHER`.
+    MAX_TEMPLATES = 1000
+    OTHER = "<other>"
+
+    LOCK = threading.Lock()
+
+    # Dictionary that maps a target and a template to a list with the
+    # number of samples, the number of errors, the total and maximum time
+    # and the histogram.
+    TEMPLATES = {}
+
+    # Dictionary that maps a target to the number of templates recorded
+    # for it, :attr:`OTHER` excluded.
+    COUNTS = {}
+
+    _LITERALS = re.compile(
+        r"'(?:[^'\\]|\\.)*'|\"(?:[^\"\\]|\\.)*\"|\b\d+(?:\.\d+)?\b"
+    )
+    _LISTS = re.compile(r"(?:(?:%s|\?)\s*,\s*)+(?:%s|\?)")
+    _SPACES = re.compile(r"\s+")
+
+    @staticmethod
+    def start():
+        """Return the time at which a statement started if it has to be
+        traced or None.
+        """
+        if not StatementTracer.ENABLED:
+            return None
+        if StatementTracer.SAMPLING < 1.0 and \
+            random.random() >= StatementTracer.SAMPLING:
+            return None
+        return time.time()
+
+    @staticmethod
+    def record(cnx, stmt_str, start, success):
+        """Record a statement's execution.
+
+        :param cnx: Connection the statement was sent to.
+        :param stmt_str: Statement.
+        :param start: Value returned by :meth:`start`.
+        :param success: Whether the statement succeeded or not.
+        """
+        elapsed = time.time() - start
+        address = (
+            getattr(cnx, "server_host", None),
+            getattr(cnx, "server_port", None)
+        )
+        target = "store" if address in StatementTracer.STORE_ADDRESSES \
+            else "servers"
+        template = StatementTracer.template(stmt_str)
+        with StatementTracer.LOCK:
+            entry = StatementTracer.TEMPLATES.get((target, template))
+            if entry is None:
+                count = StatementTracer.COUNTS.get(target, 0)
+                if count >= StatementTracer.MAX_TEMPLATES:
+                    template = StatementTracer.OTHER
+                    entry = StatementTracer.TEMPLATES.get((target, template))
+                else:
+                    StatementTracer.COUNTS[target] = count + 1
+                if entry is None:
+                    entry = StatementTracer.TEMPLATES[(target, template)] = \
+                        [0, 0, 0.0, 0.0] + [0] * (len(TRACE_BUCKETS) + 1)
+            entry[0] += 1
+            if not success:
+                entry[1] += 1
+            entry[2] += elapsed
+            if elapsed > entry[3]:
+                entry[3] = elapsed
+            entry[4 + bisect.bisect_left(TRACE_BUCKETS, elapsed)] += 1
+
+    @staticmethod
+    def template(stmt_str):
+        """Return a statement's template: literals are replaced by
+        placeholders and lists of placeholders by a single one.
+        """
+        template = StatementTracer._LITERALS.sub("?", stmt_str)
+        template = StatementTracer._LISTS.sub("%s, ...", template)
+        return StatementTracer._SPACES.sub(" ", template).strip()
+
+    @staticmethod
+    def statistics():
+        """Return a copy of the counters and histograms::
+
+            {(target, template) : [samples, errors, total, max,
+                                   bucket_0, ...]}
+
+        There is one bucket per bound in :data:`TRACE_BUCKETS` plus one.
+        """
+        with StatementTracer.LOCK:
+            return dict(
+                (key, list(entry))
+                for key, entry in StatementTracer.TEMPLATES.items()
+            )
+
+    @staticmethod
+    def clear():
+        """Discard all counters and histograms.
+        """
+        with StatementTracer.LOCK:
+            StatementTracer.TEMPLATES = {}
+            StatementTracer.COUNTS = {}
+
 def split_host_port(address, default_port=MYSQL_DEFAULT_PORT):
     """Return a tuple with host and port.
 
@@ -99,16 +229,20 @@ def exec_mysql_stmt(cnx, stmt_str, options=None):
             "No raw cursor available returning named tuple"
         )
 
-    _LOGGER.debug("Statement ({statement}, Params({parameters}).".format(
-        statement=stmt_str.replace('\n', '').replace('\r', ''),
-        parameters=params)
-    )
+    if _LOGGER.isEnabledFor(logging.DEBUG):
+        _LOGGER.debug(
+            "Statement (%s), Params(%s).",
+            stmt_str.replace('\n', '').replace('\r', ''), params
+        )
 
+    start = StatementTracer.start()
     cur = None
     try:
         cur = cnx.cursor(raw=raw, named_tuple=columns)
         cur.execute(stmt_str, params)
     except Exception as error:
+        if start is not None:
+            StatementTracer.record(cnx, stmt_str, start, False)
         if cnx.unread_result:
             cnx.get_rows()
         if cur:
@@ -128,16 +262,181 @@ def exec_mysql_stmt(cnx, stmt_str, options=None):
             if cnx.unread_result:
                 results = cur.fetchall()
         except mysql.connector.errors.InterfaceError as error:
+            if start is not None:
+                StatementTracer.record(cnx, stmt_str, start, False)
             raise _errors.DatabaseError(
                 "Command (%s, %s) failed fetching data from (%s). %s." %
                 (stmt_str, params, mysql_address_from_cnx(cnx), error)
             )
         finally:
             cur.close()
+        if start is not None:
+            StatementTracer.record(cnx, stmt_str, start, True)
         return results
 
+    if start is not None:
+        StatementTracer.record(cnx, stmt_str, start, True)
     return cur
 
+def exec_mysql_stmts(cnx, statements):
+    """Execute a list of statements in a single round trip to the server.
+    Their results are discarded.
+
+    If something goes wrong while executing a statement, the exception
+    :class:`~mysql.fabric.errors.DatabaseError` is raised and the
+    statements after it are not executed.
+
+    :param cnx: Database connection.
+    :param statements: List of tuples with a statement and its parameters.
+    """
+    if cnx is None:
+        raise _errors.DatabaseError("Invalid database connection.")
+
+    stmt_str = ";".join([stmt for stmt, _ in statements])
+    params = tuple(param for _, stmt_params in statements
+                   for param in (stmt_params or ()))
+
+    _LOGGER.debug("Statements (%s), Params(%s).", stmt_str, params)
+
+    start = StatementTracer.start()
+    cur = None
+    try:
+        cur = cnx.cursor()
+        for result in cur.execute(stmt_str, params, multi=True):
+            if result.with_rows:
+                result.fetchall()
+        if start is not None:
+            StatementTracer.record(cnx, stmt_str, start, True)
+    except Exception as error:
+        if start is not None:
+            StatementTracer.record(cnx, stmt_str, start, False)
+        if cnx.unread_result:
+            cnx.get_rows()
+        errno = getattr(error, 'errno', None)
+        raise _errors.DatabaseError(
+            "Command (%s, %s) failed accessing (%s). %s." %
+            (stmt_str, params, mysql_address_from_cnx(cnx), error),
+            errno
+        )
+    finally:
+        if cur:
+            cur.close()
+
+def prepare_mysql_stmt(cnx, stmt_str):
+    """Return a cursor that executes a statement as a server-side prepared
+    statement.
+
+    The statement is parsed by the server when it is executed for the first
+    time with :func:`exec_mysql_prepared_stmt` and its parameters and rows
+    are sent in the binary protocol from then on. The statement is freed
+    by :func:`close_mysql_prepared_stmt` or when the connection is closed.
+
+    :param cnx: Database connection.
+    :param stmt_str: The statement to prepare.
+    :return: Cursor.
+    """
+    if cnx is None:
+        raise _errors.DatabaseError("Invalid database connection.")
+
+    try:
+        return cnx.cursor(prepared=True)
+    except Exception as error:
+        errno = getattr(error, 'errno', None)
+        raise _errors.DatabaseError(
+            "Command (%s) failed preparing statement on (%s). %s." %
+            (stmt_str, mysql_address_from_cnx(cnx), error),
+            errno
+        )
+
+def exec_mysql_prepared_stmt(cnx, cur, stmt_str, options=None):
+    """Execute a statement prepared by :func:`prepare_mysql_stmt` and
+    return its result set as a list of tuples.
+
+    The connector only reuses the prepared statement if it is called with
+    the very same string object that was executed before, so callers must
+    keep the object around. Values are converted as they would be by the
+    text protocol used by :func:`exec_mysql_stmt`. If something goes wrong
+    while executing the statement, the exception
+    :class:`~mysql.fabric.errors.DatabaseError` is raised.
+
+    :param cnx: Database connection.
+    :param cur: Cursor returned by :func:`prepare_mysql_stmt`.
+    :param stmt_str: The statement.
+    :param options: Options to control behavior. Only params is used. See
+                    :func:`exec_mysql_stmt`.
+    :return: A result set as a list of tuples.
+    """
+    options = options or {}
+    params = options.get('params', ())
+
+    _LOGGER.debug("Prepared statement (%s), Params(%s).", stmt_str, params)
+
+    start = StatementTracer.start()
+    try:
+        cur.execute(stmt_str, params)
+        if cur.description is None:
+            rows = None
+        else:
+            converters = [
+                _BINARY_CONVERTERS.get(column[1])
+                for column in cur.description
+            ]
+            rows = [
+                tuple(
+                    value if value is None or converter is None \
+                    else converter(value)
+                    for converter, value in zip(converters, row)
+                ) for row in cur.fetchall()
+            ]
+        if start is not None:
+            StatementTracer.record(cnx, stmt_str, start, True)
+        return rows
+    except Exception as error:
+        if start is not None:
+            StatementTracer.record(cnx, stmt_str, start, False)
+        if cnx.unread_result:
+            try:
+                cnx.get_rows()
+            except Exception:
+                pass
+        errno = getattr(error, 'errno', None)
+        raise _errors.DatabaseError(
+            "Command (%s, %s) failed accessing (%s). %s." %
+            (stmt_str, params, mysql_address_from_cnx(cnx), error),
+            errno
+        )
+
+def close_mysql_prepared_stmt(cur):
+    """Free a statement prepared by :func:`prepare_mysql_stmt`. Errors are
+    ignored as the statement is freed anyway when the connection is closed.
+
+    This must not be called after the connection has been reestablished
+    as the server may have assigned the statement's identifier to another
+    statement.
+    """
+    try:
+        cur.close()
+    except Exception as error:
+        _LOGGER.debug("Error closing prepared statement: (%s).", error)
+
+def _bit_to_int(value):
+    """Convert a BIT value sent in the binary protocol into an integer.
+    """
+    result = 0
+    for char in value:
+        result = (result << 8) | ord(char)
+    return result
+
+# Conversions applied to values sent in the binary protocol that the text
+# protocol returns with a different type or precision. Single-precision
+# values are rounded to the digits that MySQL prints for them.
+_BINARY_CONVERTERS = {
+    mysql.connector.FieldType.BIT : _bit_to_int,
+    mysql.connector.FieldType.FLOAT : lambda value: float("%.6g" % value),
+    mysql.connector.FieldType.DECIMAL : decimal.Decimal,
+    mysql.connector.FieldType.NEWDECIMAL : decimal.Decimal,
+}
+
 def create_mysql_connection():
     """Create a MySQLConnection object.
     """
@@ -160,3 +160,36 @@ class WaitForProcedures(Command):
         for option in self.command_options:
             if option['dest'] in options:
                 option['action'] = "append"
+
+class GetProcedure(Command):
+    """Get information on a procedure, which is identified through its
+    uuid, without waiting for it to finish. Finished procedures can be
+    retrieved while they are kept in the executor's history.
+    """
+    group_name = "event"
+    command_name = "get_procedure"
+
+    def execute(self, proc_uuid):
+        """Get information on a procedure uniquely identified by its uuid.
+
+        If the procedure has finished, the same information returned by
+        :class:`WaitForProcedures` is returned. Otherwise, a result set
+        with the procedure's uuid and whether it has finished or not is
+        returned. If the procedure is not found, the following exception
+        is raised :class:`~mysql.fabric.errors.ProcedureError`.
+
+        :param proc_uuid: Procedure's UUID.
+        """
+        proc_uuid = _uuid.UUID(proc_uuid.strip())
+        procedure = _executor.Executor().get_procedure(proc_uuid)
+        if not procedure:
+            raise _errors.ProcedureError(
+                "Procedure (%s) was not found." % (proc_uuid, )
+            )
+
+        if procedure.is_complete():
+            return ProcedureCommand.wait_for_procedures([procedure, ], True)
+
+        rset = ResultSet(names=['uuid', 'finished'], types=[str, bool])
+        rset.append_row([str(procedure.uuid), False])
+        return CommandResult(None, results=rset)
@@ -27,6 +27,7 @@ from mysql.fabric.utils import (
 
 from mysql.fabric import (
     events as _events,
+    scheduler as _scheduler,
     server as _server,
     errors as _errors,
     error_log as _error_log,
@@ -43,7 +44,18 @@ from mysql.fabric.services.server import (
 
 _LOGGER = logging.getLogger(__name__)
 
-REPORT_ERROR = _events.Event("REPORT_ERROR")
+def _report_key(server_id, reporter, error, update_only):
+    """Return the key that identifies a report so that pending reports on
+    the same server are coalesced whoever reported them and whatever the
+    error was. Each report's entry in the error log is written when the
+    report is received, so coalescing does not change the number of
+    notifications and reporters that decide whether a server is unstable.
+    """
+    return (server_id, update_only)
+
+REPORT_ERROR = _events.Event(
+    "REPORT_ERROR", _scheduler.PRIORITY_FAILOVER, coalesce=_report_key
+)
 class ReportError(ProcedureGroup):
     """Report a server error.
 
@@ -76,13 +88,16 @@ class ReportError(ProcedureGroup):
         :param error: Error that has been reported.
         :param update_only: Only update the state store and skip provisioning.
         """
+        server = _append_error_log(server_id, reporter, error)
         procedures = _events.trigger(
-            REPORT_ERROR, self.get_lockable_objects(), server_id, reporter,
-            error, update_only
+            REPORT_ERROR, self.get_lockable_objects(), str(server.uuid),
+            reporter, error, update_only
         )
         return self.wait_for_procedures(procedures, synchronous)
 
-REPORT_FAILURE = _events.Event("REPORT_FAILURE")
+REPORT_FAILURE = _events.Event(
+    "REPORT_FAILURE", _scheduler.PRIORITY_FAILOVER, coalesce=_report_key
+)
 class ReportFailure(ProcedureGroup):
     """Report with certantity that a server has failed or is unreachable.
 
@@ -103,17 +118,21 @@ class ReportFailure(ProcedureGroup):
         :param error: Error that has been reported.
         :param update_only: Only update the state store and skip provisioning.
         """
+        server = _append_error_log(server_id, reporter, error)
         procedures = _events.trigger(
-            REPORT_FAILURE, self.get_lockable_objects(), server_id, reporter,
-            error, update_only
+            REPORT_FAILURE, self.get_lockable_objects(), str(server.uuid),
+            reporter, error, update_only
         )
         return self.wait_for_procedures(procedures, synchronous)
 
 @_events.on_event(REPORT_ERROR)
 def _report_error(server_id, reporter, error, update_only):
     """Report a server error.
+
+    The error has already been registered in the error log.
     """
-    (now, server) = _append_error_log(server_id, reporter, error)
+    server = _retrieve_server(server_id)
+    now = get_time()
 
     interval = get_time_delta(ReportError._NOTIFICATION_INTERVAL)
     st = _error_log.ErrorLog.fetch(server, interval, now)
@@ -127,8 +146,10 @@ def _report_error(server_id, reporter, error, update_only):
 @_events.on_event(REPORT_FAILURE)
 def _report_failure(server_id, reporter, error, update_only):
     """Report a server failure.
+
+    The failure has already been registered in the error log.
     """
-    (_, server) = _append_error_log(server_id, reporter, error)
+    server = _retrieve_server(server_id)
     _set_status_faulty(server, update_only)
 
 def _set_status_faulty(server, update_only):
@@ -153,16 +174,19 @@ def _set_status_faulty(server, update_only):
     )
 
 def _append_error_log(server_id, reporter, error):
-    """Check whether the server exist and is not faulty and register
-    error log.
+    """Check whether the server exists and register an error log entry.
+
+    This is called once per report, before the report's procedure is
+    scheduled.
+
+    :return: The server.
     """
     server = _retrieve_server(server_id)
-    now = get_time()
-    _error_log.ErrorLog.add(server, now, reporter, error)
+    _error_log.ErrorLog.add(server, get_time(), reporter, error)
 
     _LOGGER.warning("Reported issue (%s) for server (%s).", error, server.uuid)
 
-    return (now, server)
+    return server
 
 def configure(config):
     """Set configuration values.
@@ -16,12 +16,32 @@
 #
 """Retrieve statistic information.
 """
+import re
+
+import mysql.fabric.errors as _errors
 import mysql.fabric.utils as _utils
+import mysql.fabric.executor as _executor
+import mysql.fabric.scheduler as _scheduler
+
+from mysql.fabric.server import (
+    ConnectionManager,
+)
+
+from mysql.fabric.persistence import (
+    ObjectCache,
+    ReplicaReads,
+)
 
 from mysql.fabric.handler import (
     MySQLHandler,
 )
 
+from mysql.fabric.server_utils import (
+    TRACE_BUCKETS,
+    TRACE_TARGETS,
+    StatementTracer,
+)
+
 from mysql.fabric.command import (
     Command,
     CommandResult,
@@ -114,5 +134,264 @@ class Group(Command):
 
         return CommandResult(None, results=rset)
 
-            
+class Connections(Command):
+    """Retrieve statistics on connections to servers.
+    """
+    group_name = "statistics"
+    command_name = "connections"
+
+    def execute(self, server_id=None):
+        """Statistics on the connection pool.
+
+        It returns information on the connections Fabric keeps to each
+        server. Specifically, a list with the following fields: server's
+        uuid, number of idle connections, number of connections in use,
+        connections reused from the pool, requests that did not find an
+        idle connection, connections created, connections evicted, requests
+        that waited for a connection and how long they waited in seconds.
+
+        :param server_id: Server's UUID one wants to retrieve information on.
+        """
+        rset = ResultSet(
+            names=('server_uuid', 'idle', 'in_use', 'hits', 'misses',
+                   'creates', 'evictions', 'waits', 'wait_time'),
+            types=(str, long, long, long, long, long, long, long, float),
+        )
+
+        statistics = ConnectionManager().get_statistics()
+        for uuid in sorted(statistics.keys(), key=str):
+            if server_id is not None and str(uuid) != str(server_id):
+                continue
+            info = statistics[uuid]
+            rset.append_row([
+                str(uuid), info['idle'], info['in_use'], info['hits'],
+                info['misses'], info['creates'], info['evictions'],
+                info['waits'], info['wait_time']
+            ])
+
+        return CommandResult(None, results=rset)
+
+class Scheduler(Command):
+    """Retrieve statistics on the scheduler's queues.
+    """
+    group_name = "statistics"
+    command_name = "scheduler"
+
+    def execute(self):
+        """Statistics on the procedures waiting to be executed.
+
+        It returns information on each priority class, from the highest to
+        the lowest one. Specifically, a list with the following fields:
+        priority class, number of procedures waiting for an executor,
+        number of procedures picked up by an executor, how long they waited
+        in seconds, the longest time a procedure waited and number of
+        requests served by an identical procedure that was already waiting.
+        """
+        rset = ResultSet(
+            names=('priority_class', 'pending', 'dispatched', 'wait_time',
+                   'max_wait_time', 'coalesced'),
+            types=(str, long, long, float, float, long),
+        )
+
+        statistics = _executor.Executor().get_scheduler_statistics()
+        for name in _scheduler.PRIORITY_CLASSES:
+            info = statistics[name]
+            rset.append_row([
+                name, info['pending'], info['dispatched'], info['wait_time'],
+                info['max_wait_time'], info['coalesced']
+            ])
+
+        return CommandResult(None, results=rset)
+
+class Executor(Command):
+    """Retrieve statistics on the jobs executed per action.
+    """
+    group_name = "statistics"
+    command_name = "executor"
+
+    def execute(self, action=None):
+        """Statistics on the jobs executed.
+
+        It returns information on each action and phase of a job's
+        execution: time waiting in the executor's queue, executing the
+        action, writing checkpoints and committing. Specifically, a list
+        with the following fields: action, phase, number of jobs, number
+        of jobs that failed, number of samples, total time in seconds,
+        longest time and number of samples in each histogram's bucket.
+
+        :param action: Regular expression that filters the actions'
+                       names. If not specified, all actions are listed.
+        """
+        buckets = tuple(
+            "le_%s" % (bound, ) for bound in _executor.METRICS_BUCKETS
+        ) + ("gt_%s" % (_executor.METRICS_BUCKETS[-1], ), )
+        rset = ResultSet(
+            names=('action', 'phase', 'calls', 'errors', 'samples',
+                   'total_time', 'max_time') + buckets,
+            types=(str, str, long, long, long, float, float) + \
+                (long, ) * len(buckets),
+        )
+
+        pattern = re.compile(action) if action else None
+        statistics = _executor.JobMetrics.statistics()
+        for action_fqn in sorted(statistics.keys()):
+            if pattern is not None and not pattern.search(action_fqn):
+                continue
+            calls, errors, phases = statistics[action_fqn]
+            for name, phase in zip(_executor.METRICS_PHASES, phases):
+                rset.append_row([action_fqn, name, calls, errors] + phase)
+
+        return CommandResult(None, results=rset)
+
+class Procedures(Command):
+    """Retrieve statistics on the history of finished procedures.
+    """
+    group_name = "statistics"
+    command_name = "procedures"
+
+    def execute(self):
+        """Statistics on the history of finished procedures.
+
+        It returns a list with the following fields: number of finished
+        procedures kept in the history, how many of them keep full
+        tracebacks and how many were evicted or expired.
+        """
+        rset = ResultSet(
+            names=('records', 'tracebacks', 'evicted'),
+            types=(long, long, long),
+        )
+
+        info = _executor.Executor().get_history_statistics()
+        rset.append_row([
+            info['records'], info['tracebacks'], info['evicted']
+        ])
 
+        return CommandResult(None, results=rset)
+
+class Cache(Command):
+    """Retrieve statistics on the cache of objects read from the state
+    store.
+    """
+    group_name = "statistics"
+    command_name = "cache"
+
+    def execute(self):
+        """Statistics on the cache of objects read from the state store.
+
+        It returns information on each kind of object cached. Specifically,
+        a list with the following fields: kind of object, number of reads
+        served by the cache, number of reads that went to the state store
+        and number of entries cached.
+        """
+        rset = ResultSet(
+            names=('kind', 'hits', 'misses', 'entries'),
+            types=(str, long, long, long),
+        )
+
+        statistics = ObjectCache.get_statistics()
+        for kind in sorted(statistics.keys()):
+            hits, misses, entries = statistics[kind]
+            rset.append_row([kind, hits, misses, entries])
+
+        return CommandResult(None, results=rset)
+
+class Replicas(Command):
+    """Retrieve statistics on the reads sent to the state store's
+    replicas.
+    """
+    group_name = "statistics"
+    command_name = "replicas"
+
+    def execute(self):
+        """Statistics on the reads sent to the state store's replicas.
+
+        It returns a list with the following fields: number of statements
+        sent to replicas, number of statements sent to the primary because
+        no replica was up to date or available and number of times replicas
+        were checked against the primary.
+        """
+        rset = ResultSet(
+            names=('reads', 'fallbacks', 'checks'),
+            types=(long, long, long),
+        )
+
+        reads, fallbacks, checks = ReplicaReads.get_statistics()
+        rset.append_row([reads, fallbacks, checks])
+
+        return CommandResult(None, results=rset)
+
+class Log(Command):
+    """Retrieve statistics on the entries written to the log table.
+    """
+    group_name = "statistics"
+    command_name = "log"
+
+    def execute(self):
+        """Statistics on the entries written to the log table.
+
+        It returns a list with the following fields: number of entries
+        waiting to be written by the background writer, number of entries
+        written by it, number of entries dropped because its queue was
+        full and number of entries lost because they could not be written.
+        """
+        rset = ResultSet(
+            names=('queued', 'written', 'dropped', 'failed'),
+            types=(long, long, long, long),
+        )
+
+        queued, written, dropped, failed = MySQLHandler.get_statistics()
+        rset.append_row([queued, written, dropped, failed])
+
+        return CommandResult(None, results=rset)
+
+class Statements(Command):
+    """Retrieve statistics on the statements sent to the state store and
+    to the managed servers.
+    """
+    group_name = "statistics"
+    command_name = "statements"
+
+    def execute(self, target=None, limit=20):
+        """Statistics on the statements with the longest total time.
+
+        Statements are only traced if the statement_tracing option in the
+        statistics section is enabled and, if statement_sampling is lower
+        than 1, only that fraction of them is recorded. Statements are
+        grouped by template, which is the statement with its literals
+        replaced by placeholders.
+
+        It returns a list sorted by total time with the following fields:
+        where the statement was sent to (i.e. store or servers), template,
+        number of samples, number of samples that failed, total time in
+        seconds, longest time and number of samples in each histogram's
+        bucket.
+
+        :param target: Either store or servers. If not specified, both
+                       are listed.
+        :param limit: Maximum number of statements listed.
+        """
+        if target is not None and target not in TRACE_TARGETS:
+            raise _errors.ServiceError(
+                "Target (%s) must be one of %s." % (target, TRACE_TARGETS)
+            )
+        limit = int(limit)
+
+        buckets = tuple(
+            "le_%s" % (bound, ) for bound in TRACE_BUCKETS
+        ) + ("gt_%s" % (TRACE_BUCKETS[-1], ), )
+        rset = ResultSet(
+            names=('target', 'statement', 'samples', 'errors', 'total_time',
+                   'max_time') + buckets,
+            types=(str, str, long, long, float, float) + \
+                (long, ) * len(buckets),
+        )
+
+        statistics = [
+            (key, entry) for key, entry in StatementTracer.statistics().items()
+            if target is None or key[0] == target
+        ]
+        statistics.sort(key=lambda item: item[1][2], reverse=True)
+        for (stmt_target, template), entry in statistics[:limit]:
+            rset.append_row([stmt_target, template] + entry)
+
+        return CommandResult(None, results=rset)
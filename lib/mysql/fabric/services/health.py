@@ -17,11 +17,25 @@
 """Responsible for checking servers' health in a group.
 """
 import logging
+import threading
 
 from  mysql.fabric import (
     server as _server,
     replication as _replication,
     errors as _errors,
+    utils as _utils,
+)
+
+from mysql.fabric.failure_detector import (
+    HealthCache,
+)
+
+from mysql.fabric.services import (
+    server as _services_server,
+)
+
+from mysql.fabric.services.server import (
+    _retrieve_groups,
 )
 
 from mysql.fabric.command import (
@@ -32,6 +46,14 @@ from mysql.fabric.command import (
 
 _LOGGER = logging.getLogger(__name__)
 
+#Maximum number of servers that are checked at the same time.
+MAX_HEALTH_WORKERS = 32
+
+# Probes in progress. Dictionary that maps a server's uuid and whether it
+# is a master to the probe's thread and a list where its result is put.
+_PROBES_LOCK = threading.Lock()
+_PROBES = {}
+
 class CheckHealth(Command):
     """Check if any server within a group has failed and report health
     information.
@@ -42,71 +64,224 @@ class CheckHealth(Command):
     * is_alive - whether it is possible to access the server or not.
     * status - PRIMARY, SECONDARY, SPARE or FAULTY.
     * threads - Information on the replication threads.
+
+    Servers are checked concurrently and a server that does not answer
+    within the timeout is reported as not alive.
     """
     group_name = "group"
     command_name = "health"
 
-    def execute(self, group_id):
+    def execute(self, group_id, timeout=None):
         """Check if any server within a group has failed.
 
         :param group_id: Group's id.
+        :param timeout: Time in seconds after which a server is reported
+                        as not alive.
         """
+        group = _retrieve_group(group_id)
+        info, issues = _check_groups_health([group], timeout)
+        return CommandResult(None, results=[info, issues])
 
-        group = _server.Group.fetch(group_id)
-        if not group:
-            raise _errors.GroupError("Group (%s) does not exist." % (group_id, ))
-
-        info = ResultSet(
-            names=[
-                'uuid', 'is_alive', 'status',
-                'is_not_running', 'is_not_configured', 'io_not_running',
-                'sql_not_running', 'io_error', 'sql_error'
-            ],
-            types=[str, bool, str] + [bool] * 4 + [str, str]
-        )
-        issues = ResultSet(names=['issue'], types=[str])
-
-        for server in group.servers():
-            alive = False
-            is_master = (group.master == server.uuid)
-            status = server.status
-            why_slave_issues = {}
-            # These are used when server is not contactable.
-            why_slave_issues = {
-                'is_not_running': False,
-                'is_not_configured': False,
-                'io_not_running': False,
-                'sql_not_running': False,
-                'io_error': False,
-                'sql_error': False,
-            }
-            try:
-                # TODO: CHECK WHETHER WE SHOULD USE IS_ALIVE OR NOT.
-                server.connect()
-                alive = True
-                if not is_master:
-                    slave_issues, why_slave_issues = \
-                        _replication.check_slave_issues(server)
-                    str_master_uuid = _replication.slave_has_master(server)
-                    if (group.master is None or str(group.master) != \
-                        str_master_uuid) and not slave_issues:
-                        issues.append_row([
-                            "Group has master (%s) but server is connected " \
-                            "to master (%s)." % \
-                            (group.master, str_master_uuid)
-                        ])
-            except _errors.DatabaseError:
-                status = _server.MySQLServer.FAULTY
-            info.append_row([
-                server.uuid,
-                alive,
-                status,
-                why_slave_issues['is_not_running'],
-                why_slave_issues['is_not_configured'],
-                why_slave_issues['io_not_running'],
-                why_slave_issues['sql_not_running'],
-                why_slave_issues['io_error'],
-                why_slave_issues['sql_error'],
-            ])
+class CheckGroupsHealth(Command):
+    """Check if any server within a set of groups has failed and report
+    health information.
+
+    It is similar to the health command but the result has the group's
+    id in the first column and information on several groups is
+    retrieved in a single call.
+    """
+    group_name = "group"
+    command_name = "health_groups"
+
+    def execute(self, group_ids="", timeout=None):
+        """Check if any server within a set of groups has failed.
 
+        :param group_ids: Comma separated list of groups' ids. If it is
+                          empty, all groups are checked.
+        :param timeout: Time in seconds after which a server is reported
+                        as not alive.
+        """
+        if not group_ids:
+            group_ids = _server.Group.groups()
+        else:
+            group_ids = _utils.split_dump_pattern(group_ids)
+        groups = _retrieve_groups(group_ids)
+        info, issues = _check_groups_health(groups, timeout, True)
         return CommandResult(None, results=[info, issues])
+
+def _retrieve_group(group_id):
+    """Return a group object from an id.
+    """
+    group = _server.Group.fetch(group_id)
+    if not group:
+        raise _errors.GroupError("Group (%s) does not exist." % (group_id, ))
+    return group
+
+def _check_groups_health(groups, timeout, with_group_id=False):
+    """Check the health of all servers in a set of groups concurrently.
+
+    :param groups: List with groups.
+    :param timeout: Time in seconds after which a server is reported as
+                    not alive.
+    :param with_group_id: Whether the group's id should be reported.
+    :return: Result sets with information on servers and issues.
+    """
+    if timeout is None:
+        timeout = _services_server.DEFAULT_UNREACHABLE_TIMEOUT
+    timeout = float(timeout)
+
+    group_names = ['group_id'] if with_group_id else []
+    group_types = [str] if with_group_id else []
+    info = ResultSet(
+        names=group_names + [
+            'uuid', 'is_alive', 'status',
+            'is_not_running', 'is_not_configured', 'io_not_running',
+            'sql_not_running', 'io_error', 'sql_error'
+        ],
+        types=group_types + [str, bool, str] + [bool] * 4 + [str, str]
+    )
+    issues = ResultSet(names=group_names + ['issue'], types=group_types + [str])
+
+    servers = _server.MySQLServer.servers_for_groups(
+        [group.group_id for group in groups]
+    )
+    checks = [
+        (group, server) for group in groups
+        for server in servers[group.group_id]
+    ]
+    outcomes = _utils.run_concurrently(
+        [_health_check(group, server, timeout) for group, server in checks],
+        MAX_HEALTH_WORKERS
+    )
+
+    for (group, server), (health, error) in zip(checks, outcomes):
+        if error is not None:
+            _LOGGER.debug(
+                "Error checking health of server (%s): %s.",
+                server.uuid, error
+            )
+            health = _unreachable_health(group.master == server.uuid)
+        group_id = [group.group_id] if with_group_id else []
+        status = server.status
+        if not health['is_alive']:
+            status = _server.MySQLServer.FAULTY
+        why_slave_issues = health['why_slave_issues']
+        info.append_row(group_id + [
+            server.uuid,
+            health['is_alive'],
+            status,
+            why_slave_issues['is_not_running'],
+            why_slave_issues['is_not_configured'],
+            why_slave_issues['io_not_running'],
+            why_slave_issues['sql_not_running'],
+            why_slave_issues['io_error'],
+            why_slave_issues['sql_error'],
+        ])
+        str_master_uuid = health['master_uuid']
+        if health['is_alive'] and not health['is_master'] and \
+            not health['slave_issues'] and (group.master is None or \
+            str(group.master) != str_master_uuid):
+            issues.append_row(group_id + [
+                "Group has master (%s) but server is connected " \
+                "to master (%s)." % \
+                (group.master, str_master_uuid)
+            ])
+
+    return info, issues
+
+def _health_check(group, server, timeout):
+    """Return a function that checks the health of a server and gives up
+    after the timeout expires.
+
+    There is at most one probe per server in progress. A check that
+    starts while a probe is running waits for it instead of starting a
+    new one. A probe is not interrupted when a check gives up, but only
+    the results of probes that have completed are stored in the
+    :class:`~mysql.fabric.failure_detector.HealthCache`. So the timeout
+    requested by a caller never decides what the failure detector sees.
+    """
+    def _check():
+        """Check a server's health.
+        """
+        is_master = (group.master == server.uuid)
+        health = HealthCache.get(server.uuid)
+        if health is not None and \
+            (not health['is_alive'] or health.get('is_master') == is_master):
+            if 'why_slave_issues' in health:
+                return health
+            return _unreachable_health(is_master)
+
+        probe, result = _start_probe(server, is_master)
+        probe.join(timeout)
+        if not result:
+            _LOGGER.debug(
+                "Server (%s) did not answer within (%s) seconds.",
+                server.uuid, timeout
+            )
+            return _unreachable_health(is_master)
+        return result[0]
+    return _check
+
+def _start_probe(server, is_master):
+    """Return the probe in progress for a server, starting one if there is
+    none, and the list where its result is put.
+    """
+    key = (str(server.uuid), is_master)
+    with _PROBES_LOCK:
+        if key in _PROBES:
+            return _PROBES[key]
+        result = []
+        probe = threading.Thread(
+            target=_probe, args=(key, server, is_master, result),
+            name="HealthCheck(" + str(server.uuid) + ")"
+        )
+        probe.daemon = True
+        _PROBES[key] = (probe, result)
+        probe.start()
+        return probe, result
+
+def _probe(key, server, is_master, result):
+    """Check a server's health and store the result.
+    """
+    try:
+        health = _check_server_health(server, is_master)
+        HealthCache.set(server.uuid, health)
+        result.append(health)
+    finally:
+        with _PROBES_LOCK:
+            del _PROBES[key]
+
+def _check_server_health(server, is_master):
+    """Connect to a server and retrieve its health information.
+    """
+    health = _unreachable_health(is_master)
+    try:
+        # TODO: CHECK WHETHER WE SHOULD USE IS_ALIVE OR NOT.
+        server.connect()
+        health['is_alive'] = True
+        if not is_master:
+            health['slave_issues'], health['why_slave_issues'] = \
+                _replication.check_slave_issues(server)
+            health['master_uuid'] = _replication.slave_has_master(server)
+    except _errors.DatabaseError:
+        pass
+    return health
+
+def _unreachable_health(is_master):
+    """Return the health information of a server that is not alive.
+    """
+    return {
+        'is_alive': False,
+        'is_master': is_master,
+        'slave_issues': False,
+        'master_uuid': None,
+        # These are used when server is not contactable.
+        'why_slave_issues': {
+            'is_not_running': False,
+            'is_not_configured': False,
+            'io_not_running': False,
+            'sql_not_running': False,
+            'io_error': False,
+            'sql_error': False,
+        },
+    }
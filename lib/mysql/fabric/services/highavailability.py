@@ -26,6 +26,7 @@ import mysql.fabric.services.utils as _utils
 
 from  mysql.fabric import (
     events as _events,
+    scheduler as _scheduler,
     group_replication as _group_replication,
     server as _server,
     replication as _replication,
@@ -45,7 +46,9 @@ _LOGGER = logging.getLogger(__name__)
 # Find out which operation should be executed.
 DEFINE_HA_OPERATION = _events.Event()
 # Find a slave that was not failing to keep with the master's pace.
-FIND_CANDIDATE_FAIL = _events.Event("FAIL_OVER")
+FIND_CANDIDATE_FAIL = _events.Event(
+    "FAIL_OVER", _scheduler.PRIORITY_FAILOVER
+)
 # Check if the candidate is properly configured to become a master.
 CHECK_CANDIDATE_FAIL = _events.Event()
 # Wait until all slaves or a candidate process the relay log.
@@ -22,6 +22,8 @@ import getpass
 import logging
 import logging.handlers
 import os.path
+import threading
+import time
 import urlparse
 
 from mysql.fabric import (
@@ -31,8 +33,11 @@ from mysql.fabric import (
     events as _events,
     executor as _executor,
     failure_detector as _failure_detector,
+    lag_monitor as _lag_monitor,
+    log_partitions as _log_partitions,
     persistence as _persistence,
     recovery as _recovery,
+    scheduler as _scheduler,
     services as _services,
     utils as _utils,
     server as _server,
@@ -76,6 +81,15 @@ DEFAULT_N_EXECUTORS = 5
 #Default TTL value
 DEFAULT_TTL = 1
 
+# Number of connections opened to each server at startup.
+DEFAULT_WARMUP_CONNECTIONS = 0
+
+# Maximum time in seconds startup waits for connections to be opened.
+DEFAULT_WARMUP_TIMEOUT = 10.0
+
+# Maximum number of connections opened at the same time during startup.
+MAX_WARMUP_WORKERS = 16
+
 # MySQL's port
 _MYSQL_PORT = 3306
 
@@ -103,6 +117,50 @@ class Logging(Command):
         return CommandResult(None)
 
 
+class Executors(Command):
+    """Set the bounds on the number of executor threads.
+    """
+    group_name = "manage"
+    command_name = "executors"
+
+    def execute(self, min_executors=None, max_executors=None):
+        """Set the minimum and maximum number of executor threads.
+
+        Threads are created when procedures are waiting and there is no
+        idle thread to execute them, up to the maximum. Idle threads
+        retire until only the minimum is left. Any bound that is not
+        provided is kept. It returns the bounds, the number of running
+        and idle threads and the number of procedures waiting for one.
+
+        :param min_executors: Minimum number of executor threads.
+        :param max_executors: Maximum number of executor threads.
+        """
+        executor = _executor.Executor()
+        if min_executors is not None or max_executors is not None:
+            if min_executors is None:
+                min_executors = executor.get_number_executors()
+            if max_executors is None:
+                max_executors = executor.get_max_executors()
+            try:
+                min_executors = int(min_executors)
+                max_executors = int(max_executors)
+            except ValueError:
+                raise _errors.ExecutorError(
+                    "Number of executors must be an integer."
+                )
+            increasing = max_executors - executor.get_max_executors()
+            if increasing > 0:
+                _utils.check_number_threads(increasing)
+            executor.set_executor_bounds(min_executors, max_executors)
+
+        statistics = executor.get_executor_statistics()
+        names = ('min_executors', 'max_executors', 'running', 'idle',
+                 'pending')
+        rset = ResultSet(names=names, types=(int, ) * len(names))
+        rset.append_row([statistics[name] for name in names])
+        return CommandResult(None, results=rset)
+
+
 class Ping(Command):
     """Check whether Fabric server is running or not.
     """
@@ -167,6 +225,11 @@ class Setup(Command):
         # Configure connections.
         _configure_connections(self.config)
 
+        # Configure how the log tables are created.
+        _error_log.configure(self.config)
+        _logging.configure(self.config)
+        _log_partitions.configure(self.config)
+
         # Create database and objects.
         _persistence.setup(config=self.config)
 
@@ -296,8 +359,23 @@ def _configure_connections(config):
         number_executors = int(number_executors)
     except (_config.NoOptionError, _config.NoSectionError, ValueError):
         number_executors = DEFAULT_N_EXECUTORS
+    try:
+        max_executors = int(config.get('executor', "max_executors"))
+    except (_config.NoOptionError, _config.NoSectionError, ValueError):
+        max_executors = number_executors
+    if max_executors < number_executors:
+        _LOGGER.warning(
+            "Maximum number of executors cannot be lower than %s.",
+            number_executors
+        )
+        max_executors = number_executors
+    try:
+        idle_timeout = float(config.get('executor', "idle_timeout"))
+    except (_config.NoOptionError, _config.NoSectionError, ValueError):
+        idle_timeout = None
     executor = _executor.Executor()
     executor.set_number_executors(number_executors)
+    executor.set_executor_bounds(number_executors, max_executors, idle_timeout)
 
     services = {}
     ssl_config = {}
@@ -332,14 +410,7 @@ def _configure_connections(config):
     _services.ServiceManager(services, number_threads, ssl_config)
 
     # Fetch options to configure the state store.
-    address = config.get('storage', 'address')
-
-    try:
-        host, port = address.split(':')
-        port = int(port)
-    except ValueError:
-        host = address
-        port = _MYSQL_PORT
+    host, port = _split_address(config.get('storage', 'address'))
 
     user = config.get('storage', 'user')
     database = config.get('storage', 'database')
@@ -372,15 +443,62 @@ def _configure_connections(config):
     except (_config.NoOptionError, _config.NoSectionError, ValueError):
         auth_plugin = None
 
+    try:
+        group_commit = config.get("storage", "group_commit")
+        group_commit = group_commit.lower() == "yes"
+    except (_config.NoOptionError, _config.NoSectionError):
+        group_commit = None
+
+    try:
+        prepared_stmts = config.get("storage", "prepared_statements")
+        prepared_stmts = prepared_stmts.lower() == "yes"
+    except (_config.NoOptionError, _config.NoSectionError):
+        prepared_stmts = None
+
+    try:
+        object_cache = config.get("storage", "object_cache")
+        _persistence.ObjectCache.ENABLED = object_cache.lower() != "no"
+    except (_config.NoOptionError, _config.NoSectionError):
+        pass
+
+    try:
+        replicas = config.get("storage", "replicas")
+        _persistence.ReplicaReads.ADDRESSES = [
+            _split_address(replica)
+            for replica in _utils.split_dump_pattern(replicas) if replica
+        ]
+    except (_config.NoOptionError, _config.NoSectionError):
+        pass
+
+    try:
+        max_staleness = config.get("storage", "replica_max_staleness")
+        _persistence.ReplicaReads.MAX_STALENESS = max(
+            float(max_staleness), 0.0
+        )
+    except (_config.NoOptionError, _config.NoSectionError, ValueError):
+        pass
+
     # Define state store configuration.
     _persistence.init(
         host=host, port=port, user=user, password=password, database=database,
         connection_timeout=connection_timeout,
         connection_attempts=connection_attempts,
         connection_delay=connection_delay,
-        auth_plugin=auth_plugin
+        auth_plugin=auth_plugin, group_commit=group_commit,
+        prepared_stmts=prepared_stmts
     )
 
+def _split_address(address):
+    """Split a state store's address into host and port.
+    """
+    try:
+        host, port = address.split(':')
+        port = int(port)
+    except ValueError:
+        host = address
+        port = _MYSQL_PORT
+    return host, port
+
 def _setup_ttl(config):
     """Read the configured TTL and set its value.
     """
@@ -406,7 +524,12 @@ def _start(options, config):
     # Configure modules that are not dynamic loaded.
     _server.configure(config)
     _error_log.configure(config)
+    _logging.configure(config)
+    _log_partitions.configure(config)
     _failure_detector.configure(config)
+    _lag_monitor.configure(config)
+    _scheduler.configure(config)
+    _executor.configure(config)
 
     # Load information on all providers.
     providers.find_providers()
@@ -417,9 +540,15 @@ def _start(options, config):
     # Initilize the state store.
     _persistence.init_thread()
 
+    # Write log entries to the state store in the background.
+    MySQLHandler.start_writer()
+
     # Check the maximum number of threads.
     _utils.check_number_threads()
 
+    # Open connections to servers and to the state store in advance.
+    _warm_up(config)
+
     # Configure Fabric Node.
     fabric = FabricNode()
     reported = _utils.get_time()
@@ -441,9 +570,117 @@ def _start(options, config):
     _events.Handler().start()
     _recovery.recovery()
     _failure_detector.FailureDetector.register_groups()
+    _lag_monitor.LagMonitor.start()
+    _log_partitions.LogPartitions.start()
+    _server.ConnectionManager().start()
     _services.ServiceManager().start()
 
 
+def _warm_up(config):
+    """Concurrently open connections to the managed servers and to the
+    state store before requests are accepted.
+
+    The number of pooled connections opened to each server is set by the
+    servers.warmup_connections option and the warm-up is disabled when it
+    is zero. Startup does not wait more than servers.warmup_timeout
+    seconds, whatever is not finished by then goes on in the background.
+    """
+    try:
+        connections = int(config.get("servers", "warmup_connections"))
+    except (_config.NoOptionError, _config.NoSectionError, ValueError):
+        connections = DEFAULT_WARMUP_CONNECTIONS
+    if connections <= 0:
+        return
+
+    try:
+        timeout = float(config.get("servers", "warmup_timeout"))
+    except (_config.NoOptionError, _config.NoSectionError, ValueError):
+        timeout = DEFAULT_WARMUP_TIMEOUT
+
+    servers = []
+    for group_id in _server.Group.groups():
+        servers.extend(
+            server for server in _server.Group.fetch(group_id).servers()
+            if server.status != _server.MySQLServer.FAULTY
+        )
+    n_persisters = _executor.Executor().get_number_executors() + \
+        _services.ServiceManager().get_number_sessions()
+
+    progress = {"servers" : 0, "persisters" : 0}
+    lock = threading.Lock()
+
+    def _warm_up_server(server):
+        """Open connections to a server and release them to the pool.
+        """
+        def _open():
+            """Open and release the connections.
+            """
+            cnxs = []
+            manager = _server.ConnectionManager()
+            try:
+                for _ in range(connections):
+                    cnxs.append(manager.get_connection(server))
+            finally:
+                for cnx in cnxs:
+                    manager.release_connection(server, cnx)
+            with lock:
+                progress["servers"] += 1
+                _LOGGER.debug(
+                    "Warmed up connections to server (%s), (%s/%s).",
+                    server.uuid, progress["servers"], len(servers)
+                )
+        return _open
+
+    def _warm_up_persister():
+        """Open a connection to the state store.
+        """
+        _persistence.prime_persister()
+        with lock:
+            progress["persisters"] += 1
+
+    targets = ["server (%s)" % (server.uuid, ) for server in servers] + \
+        ["state store"] * n_persisters
+    functions = [_warm_up_server(server) for server in servers] + \
+        [_warm_up_persister] * n_persisters
+
+    def _run():
+        """Warm up the connections and report those that failed.
+        """
+        outcomes = _utils.run_concurrently(functions, MAX_WARMUP_WORKERS)
+        for target, (_, error) in zip(targets, outcomes):
+            if error is not None:
+                _LOGGER.warning(
+                    "Error warming up connection(s) to %s: (%s).",
+                    target, error
+                )
+
+    _LOGGER.info(
+        "Warming up (%s) connection(s) to each one of (%s) server(s) and "
+        "(%s) connection(s) to the state store.", connections, len(servers),
+        n_persisters
+    )
+    start = time.time()
+    worker = threading.Thread(target=_run, name="WarmUp")
+    worker.daemon = True
+    worker.start()
+    worker.join(timeout)
+    with lock:
+        if worker.is_alive():
+            _LOGGER.warning(
+                "Warm-up did not finish within (%s) seconds. Server(s) "
+                "(%s/%s), state store connection(s) (%s/%s). It will go "
+                "on in the background.", timeout, progress["servers"],
+                len(servers), progress["persisters"], n_persisters
+            )
+        else:
+            _LOGGER.info(
+                "Warm-up finished in (%.3f) seconds. Server(s) (%s/%s), "
+                "state store connection(s) (%s/%s).", time.time() - start,
+                progress["servers"], len(servers), progress["persisters"],
+                n_persisters
+            )
+
+
 class Stop(Command):
     """Stop the Fabric server.
     """
@@ -460,6 +697,9 @@ def _shutdown():
     """Shutdown Fabric server.
     """
     _failure_detector.FailureDetector.unregister_groups()
+    _lag_monitor.LagMonitor.shutdown()
+    _log_partitions.LogPartitions.shutdown()
+    _server.ConnectionManager().shutdown()
     _services.ServiceManager().shutdown()
     _events.Handler().shutdown()
     _events.Handler().wait()
@@ -471,6 +711,7 @@ def _shutdown():
             'type' : MySQLHandler.STOP
         }
     )
+    MySQLHandler.shutdown_writer()
 
 
 class FabricLookups(Command):
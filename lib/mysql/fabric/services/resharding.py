@@ -30,6 +30,7 @@ from mysql.connector.errorcode import (
 from mysql.fabric import (
     errors as _errors,
     events as _events,
+    scheduler as _scheduler,
     group_replication as _group_replication,
     replication as _replication,
     backup as _backup,
@@ -62,7 +63,9 @@ from mysql.fabric.services import (
 
 _LOGGER = logging.getLogger(__name__)
 
-PRUNE_SHARD_TABLES = _events.Event("PRUNE_SHARD_TABLES")
+PRUNE_SHARD_TABLES = _events.Event(
+    "PRUNE_SHARD_TABLES", _scheduler.PRIORITY_BULK
+)
 class PruneShardTables(ProcedureShard):
     """Given the table name prune the tables according to the defined
     sharding specification for the table.
@@ -93,7 +96,9 @@ class PruneShardTables(ProcedureShard):
         )
         return self.wait_for_procedures(procedures, synchronous)
 
-CHECK_SHARD_INFORMATION = _events.Event("CHECK_SHARD_INFORMATION")
+CHECK_SHARD_INFORMATION = _events.Event(
+    "CHECK_SHARD_INFORMATION", _scheduler.PRIORITY_BULK
+)
 BACKUP_SOURCE_SHARD = _events.Event("BACKUP_SOURCE_SHARD")
 RESTORE_SHARD_BACKUP = _events.Event("RESTORE_SHARD_BACKUP")
 SETUP_REPLICATION = _events.Event("SETUP_REPLICATION")
@@ -77,9 +77,11 @@ from mysql.connector.errorcode import (
 from mysql.fabric import (
     backup as _backup,
     events as _events,
+    scheduler as _scheduler,
     server as _server,
     errors as _errors,
     failure_detector as _detector,
+    lag_monitor as _lag_monitor,
     sharding as _sharding,
     config as _config,
 )
@@ -130,7 +132,7 @@ class GroupLookups(Command):
         # Fetch all the groups before building the result set since an
         # exception can be thrown and there is little point in trying
         # to build a result set before all groups can be fetched.
-        groups = [ _retrieve_group(gid) for gid in gids ]
+        groups = _retrieve_groups(gids)
 
         rset = ResultSet(
             names=('group_id', 'description', 'failure_detector', 'master_uuid'),
@@ -215,7 +217,8 @@ class ServerLookups(Command):
     group_name = "group"
     command_name = "lookup_servers"
 
-    def execute(self, group_id, server_id=None, status=None, mode=None):
+    def execute(self, group_id, server_id=None, status=None, mode=None,
+                max_lag=None):
         """Return information on existing server(s) in a group.
 
         :param group_id: Group's id.
@@ -225,14 +228,17 @@ class ServerLookups(Command):
         :server_id type: Servers's UUID or HOST:PORT.
         :param status: Server's status one is searching for.
         :param mode: Server's mode one is searching for.
+        :param max_lag: Maximum number of seconds a secondary may be
+                        behind the master according to the lag monitor.
+                        Secondaries without a recent sample are skipped.
         :return: Information on servers.
         :rtype: List with [uuid, address, status, mode, weight]
         """
         # Determine the set of servers to iterate through.
-        group = _retrieve_group(group_id)
         if server_id is None:
-            servers = [server for server in group.servers()]
+            servers = _retrieve_group_with_servers(group_id)[1]
         else:
+            _retrieve_group(group_id)
             servers = [_retrieve_server(server_id, group_id)]
 
         # Determine the set of status to check upon.
@@ -247,12 +253,20 @@ class ServerLookups(Command):
         else:
             mode = [_retrieve_server_mode(mode)]
 
+        # Determine the maximum lag allowed for secondaries.
+        if max_lag is not None:
+            max_lag = _retrieve_max_lag(max_lag)
+
         # Create result set.
         rset = ResultSet(
             names=('server_uuid', 'address', 'status', 'mode', 'weight'),
             types=(str, str, str, str, float),
         )
         for server in servers:
+            if max_lag is not None and \
+                server.status == _server.MySQLServer.SECONDARY and \
+                _lag_monitor.LagMonitor.is_lagging(server.uuid, max_lag):
+                continue
             if server.status in status and server.mode in mode:
                 rset.append_row([
                     str(server.uuid),
@@ -490,7 +504,7 @@ class SetServerMode(ProcedureGroup):
         )
         return self.wait_for_procedures(procedures, synchronous)
 
-BACKUP_SERVER = _events.Event("BACKUP_SERVER")
+BACKUP_SERVER = _events.Event("BACKUP_SERVER", _scheduler.PRIORITY_BULK)
 RESTORE_SERVER = _events.Event("RESTORE_SERVER")
 class CloneServer(ProcedureGroup):
     """Clone the objects of a given server into a destination server.
@@ -751,6 +765,22 @@ def _retrieve_server_status(status):
 
     return status
 
+def _retrieve_max_lag(max_lag):
+    """Check whether the maximum lag is valid or not and return it as
+    a float.
+    """
+    try:
+        max_lag = float(max_lag)
+    except ValueError:
+        raise _errors.ServerError("Value (%s) must be a float." % (max_lag, ))
+
+    if max_lag < 0.0:
+        raise _errors.ServerError(
+            "Cannot use a maximum lag (%s) lower than 0.0." % (max_lag, )
+        )
+
+    return max_lag
+
 def _set_server_status_primary(server, update_only):
     """Set server's status to primary.
     """
@@ -1047,6 +1077,27 @@ def _retrieve_group(group_id):
         raise _errors.GroupError("Group (%s) does not exist." % (group_id, ))
     return group
 
+def _retrieve_groups(group_ids):
+    """Return a list of Group objects from a list of identifiers fetching
+    them in a single statement.
+    """
+    groups = _server.Group.fetch_many(group_ids)
+    for group_id in group_ids:
+        if group_id not in groups:
+            raise _errors.GroupError(
+                "Group (%s) does not exist." % (group_id, )
+            )
+    return [groups[group_id] for group_id in group_ids]
+
+def _retrieve_group_with_servers(group_id):
+    """Return a Group object and a list with its servers from an identifier
+    fetching them in a single statement.
+    """
+    groups = _server.Group.fetch_with_servers([group_id])
+    if group_id not in groups:
+        raise _errors.GroupError("Group (%s) does not exist." % (group_id, ))
+    return groups[group_id]
+
 def _check_group_exists(group_id):
     """Check whether a group exists or not.
     """
@@ -25,6 +25,7 @@ from mysql.fabric import (
     errors as _errors,
     events as _events,
     group_replication as _group_replication,
+    lag_monitor as _lag_monitor,
     utils as _utils,
 )
 
@@ -70,6 +71,7 @@ INVALID_SHARDING_KEY = "Invalid Key %s"
 SHARD_NOT_FOUND = "Shard %s not found"
 SHARD_LOCATION_NOT_FOUND = "Shard location not found"
 INVALID_SHARDING_HINT = "Unknown lookup hint"
+GLOBAL_GTIDS_NOT_APPLIED = "Shard groups (%s) have not applied (%s)"
 SHARD_GROUP_NOT_FOUND = "Shard group %s not found"
 SHARD_GROUP_MASTER_NOT_FOUND = "Shard group master not found"
 SHARD_MOVE_DESTINATION_NOT_EMPTY = "Shard move destination %s already "\
@@ -334,7 +336,7 @@ class LookupShardServers(Command):
     """
     group_name = "sharding"
     command_name = "lookup_servers"
-    def execute(self, table_name, key, hint="LOCAL"):
+    def execute(self, table_name, key, hint="LOCAL", max_lag=None):
         """Given a table name and a key return the server where the shard of
         this table can be found.
 
@@ -342,11 +344,62 @@ class LookupShardServers(Command):
                             looked up.
         :param key: The key value that needs to be looked up
         :param hint: A hint indicates if the query is LOCAL or GLOBAL
+        :param max_lag: Maximum number of seconds a secondary may be behind
+                        the master to be returned.
 
         :return: The Group UUID that contains the range in which the key
                  belongs.
         """
-        return _lookup(table_name, key, hint)
+        return _lookup(table_name, key, hint, max_lag)
+
+class LookupGlobalLag(Command):
+    """Return how many transactions from the global group each shard group
+    has not applied yet according to the lag monitor.
+    """
+    group_name = "sharding"
+    command_name = "global_lag"
+    def execute(self, group_id):
+        """Return how many transactions from the global group each shard
+        group has not applied yet.
+
+        :param group_id: The global group's id.
+
+        :return: List with [group_id, gtids_behind]. Shard groups that have
+                 not been sampled recently are not reported.
+        """
+        slave_group_ids = _retrieve_slave_group_ids(group_id)
+        global_lags = _lag_monitor.LagMonitor.get_global_lags(group_id)
+
+        rset = ResultSet(names=('group_id', 'gtids_behind'), types=(str, int))
+        for slave_group_id in slave_group_ids:
+            if slave_group_id in global_lags:
+                rset.append_row([slave_group_id, global_lags[slave_group_id]])
+        return CommandResult(None, results=rset)
+
+class WaitForGlobalGtids(Command):
+    """Wait until all shard groups have applied a set of transactions from
+    the global group.
+    """
+    group_name = "sharding"
+    command_name = "wait_for_global_gtids"
+    def execute(self, group_id, gtids, timeout=None):
+        """Wait until all shard groups have applied a set of transactions
+        from the global group.
+
+        :param group_id: The global group's id.
+        :param gtids: Set of transactions.
+        :param timeout: Time in seconds to wait for or None to wait for the
+                        servers.lag_wait_timeout option.
+        """
+        slave_group_ids = _retrieve_slave_group_ids(group_id)
+        pending = _lag_monitor.LagMonitor.wait_for_global_gtids(
+            slave_group_ids, gtids, timeout
+        )
+        if pending:
+            raise _errors.TimeoutError(
+                GLOBAL_GTIDS_NOT_APPLIED % (", ".join(pending), gtids)
+            )
+        return CommandResult(None)
 
 class DumpShardTables(Command):
     """Return information about all tables belonging to mappings
@@ -512,6 +565,17 @@ def _remove_shard_mapping_defn(shard_mapping_id):
     """
     ShardMapping.remove_sharding_definition(shard_mapping_id)
 
+def _retrieve_slave_group_ids(group_id):
+    """Return the ids of the groups that replicate from a group.
+
+    :param group_id: The group's id.
+    :raises: ShardingError if the group is not found.
+    """
+    group = Group.fetch(group_id)
+    if group is None:
+        raise _errors.ShardingError(SHARD_GROUP_NOT_FOUND % (group_id, ))
+    return group.slave_group_ids
+
 def _lookup_shard_mapping(table_name):
     """Fetch the shard specification mapping for the given table
 
@@ -685,7 +749,7 @@ def _remove_shard(shard_id):
     shard.remove()
     _LOGGER.debug("Removed Shard (%s).", shard_id)
 
-def _lookup(lookup_arg, key,  hint):
+def _lookup(lookup_arg, key,  hint, max_lag=None):
     """Given a table name and a key return the servers of the Group where the
     shard of this table can be found
 
@@ -693,6 +757,8 @@ def _lookup(lookup_arg, key,  hint):
                 Shard Mapping ID for "GLOBAL" lookups.
     :param key: The key value that needs to be looked up
     :param hint: A hint indicates if the query is LOCAL or GLOBAL
+    :param max_lag: Maximum number of seconds a secondary may be behind
+                    the master to be returned.
 
     :return: The servers of the Group that contains the range in which the
             key belongs.
@@ -733,7 +799,7 @@ def _lookup(lookup_arg, key,  hint):
         #An exception will be thrown nevertheless.
         group_id = shard.group_id
 
-    return ServerLookups().execute(group_id=group_id)
+    return ServerLookups().execute(group_id=group_id, max_lag=max_lag)
     
 @_events.on_event(SHARD_ENABLE)
 def _enable_shard(shard_id):
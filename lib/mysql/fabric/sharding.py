@@ -329,12 +329,14 @@ class ShardMapping(_persistence.Persistable):
         :return: The ShardMapping object that encapsulates the shard mapping
                     information for the given table.
         """
-        cur = persister.exec_stmt(
-                                  ShardMapping.SELECT_SHARD_MAPPING,
-                                  {"fetch" : False,
-                                  "params" : (table_name,)})
-        row = cur.fetchone()
-        if row:
+        rows = _persistence.ObjectCache.fetch(
+            ("shard_mappings", table_name), ("shard_tables", "shard_maps"),
+            lambda: persister.exec_stmt(
+                ShardMapping.SELECT_SHARD_MAPPING, {"params" : (table_name, )}
+            ), persister
+        )
+        if rows:
+            row = rows[0]
             return ShardMapping(row[0], row[1], row[2], row[3], row[4])
 
         return None
@@ -732,8 +734,13 @@ class Shards(_persistence.Persistable):
         :param persister: The DB server that can be used to access the
                           state store.
         """
-        row = persister.exec_stmt(Shards.SELECT_SHARD, \
-                                  {"params":(shard_id,)})
+        row = _persistence.ObjectCache.fetch(
+            ("shards", shard_id), ("shards", ),
+            lambda: persister.exec_stmt(
+                Shards.SELECT_SHARD,
+                {"params" : (shard_id, ), "prepared" : True}
+            ), persister
+        )
 
         if row is None:
             return None
@@ -1086,14 +1093,13 @@ class RangeShardingSpecification(_persistence.Persistable):
         :return: The Range Sharding Specification that contains the range in
                 which the key belongs.
         """
-        cur = persister.exec_stmt(SHARDING_DATATYPE_HANDLER[type].LOOKUP_KEY,
-                    {"fetch" : False,
+        rows = persister.exec_stmt(SHARDING_DATATYPE_HANDLER[type].LOOKUP_KEY,
+                    {"prepared" : True,
                     "params" : (key, shard_mapping_id)})
 
-        row = cur.fetchone()
-
-        if row is None:
+        if not rows:
             return None
+        row = rows[0]
         return RangeShardingSpecification(row[0], row[1],  row[2])
 
     @staticmethod
@@ -1454,8 +1460,8 @@ class HashShardingSpecification(RangeShardingSpecification):
         :return: The Hash Sharding Specification that contains the range in
                 which the key belongs.
         """
-        cur = persister.exec_stmt(SHARDING_DATATYPE_HANDLER[type].LOOKUP_KEY, {
-                        "fetch" : False,
+        rows = persister.exec_stmt(SHARDING_DATATYPE_HANDLER[type].LOOKUP_KEY, {
+                        "prepared" : True,
                         "params" : (
                             key,
                             shard_mapping_id,
@@ -1464,9 +1470,9 @@ class HashShardingSpecification(RangeShardingSpecification):
                     }
                 )
 
-        row = cur.fetchone()
-        if row is None:
+        if not rows:
             return None
+        row = rows[0]
         return HashShardingSpecification(row[0], row[1],  row[2])
 
     @staticmethod
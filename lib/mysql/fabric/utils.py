@@ -29,6 +29,7 @@ import traceback
 import signal
 import logging
 import threading
+import collections
 
 TTL = 0
 VERSION_TOKEN = 0
@@ -121,6 +122,25 @@ def split_dump_pattern(pattern):
     regex = re.compile('\s*,\s*')
     return regex.split(pattern)
 
+def in_list_placeholders(values):
+    """Return the placeholders used to pass a list of values to an
+    ``IN (...)`` clause, one parameter per value.
+
+    :param values: The list of values.
+    """
+    return ", ".join(["%s"] * len(values))
+
+def in_list_matches(column, values):
+    """Return an expression that tells which values in a list a column is
+    equal to, as the server compares them: a string with "1" for each value
+    that matches and "0" for each one that does not, one parameter per
+    value.
+
+    :param column: The column's name.
+    :param values: The list of values.
+    """
+    return "CONCAT(%s)" % (", ".join(["%s = %%s" % (column, )] * len(values)), )
+
 def split_database_table(fully_qualified_table_name):
     """Split a fully qualified table name, which is the database name
     followed by the table name (database_name.table_name).
@@ -218,7 +238,7 @@ def check_number_threads(increasing=0):
     )
 
     n_sessions = _services.ServiceManager().get_number_sessions()
-    n_executors = _executor.Executor().get_number_executors()
+    n_executors = _executor.Executor().get_max_executors()
     n_failure_detectors = \
         len(_server.Group.groups_by_status(_server.Group.ACTIVE))
     n_controls = 1
@@ -235,6 +255,48 @@ def check_number_threads(increasing=0):
             n_failure_detectors, max_allowed_connections - 1)
          )
 
+def run_concurrently(functions, max_workers):
+    """Call functions concurrently using a bounded number of threads.
+
+    An exception raised by a function does not prevent the others from
+    being called. It is returned in place of the function's result.
+
+    :param functions: Sequence of callables without arguments.
+    :param max_workers: Maximum number of functions running at the same
+                        time.
+    :return: List with (result, error) tuples in the same order as the
+             functions, where only one of them is not None.
+    """
+    functions = list(functions)
+    outcomes = [None] * len(functions)
+    pending = collections.deque(enumerate(functions))
+    lock = threading.Lock()
+
+    def _work():
+        """Call pending functions until there is nothing else to do.
+        """
+        while True:
+            with lock:
+                if not pending:
+                    return
+                idx, function = pending.popleft()
+            try:
+                outcomes[idx] = (function(), None)
+            except Exception as error:
+                outcomes[idx] = (None, error)
+
+    workers = [
+        threading.Thread(target=_work, name="Worker-%s" % (number, ))
+        for number in range(min(max(max_workers, 1), len(functions)))
+    ]
+    for worker in workers:
+        worker.daemon = True
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    return outcomes
+
 def kv_to_dict(meta):
     """Transform a list with key/value strings into a dictionary.
     """
@@ -0,0 +1,242 @@
+#
+# Copyright (c) 2013,2014, Oracle and/or its affiliates. All rights reserved.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; version 2 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+#
+"""Unit tests for the accessors that load groups and servers in bulk.
+
+The state store is replaced by a stand-in that keeps a set of groups and
+servers so that the statements sent by each command can be counted.
+Like the state store, it compares groups' ids ignoring case, accents
+and trailing spaces.
+"""
+import unittest
+import unicodedata
+import uuid as _uuid
+import tests.utils
+
+import mysql.fabric.persistence as _persistence
+
+from mysql.fabric.persistence import (
+    ObjectCache,
+)
+
+from mysql.fabric.server import (
+    Group,
+    MySQLServer,
+)
+
+from mysql.fabric.services.server import (
+    GroupLookups,
+    ServerLookups,
+)
+
+from mysql.fabric.services.health import (
+    CheckGroupsHealth,
+)
+
+from mysql.fabric.utils import (
+    in_list_matches,
+    in_list_placeholders,
+)
+
+STATEMENTS = []
+GROUPS = {}
+SERVERS = {}
+
+def collate(group_id):
+    """Return the key under which the stand-in compares a group's id.
+    """
+    if isinstance(group_id, str):
+        group_id = group_id.decode("utf-8")
+    return u"".join(
+        char for char in unicodedata.normalize("NFKD", group_id)
+        if not unicodedata.combining(char)
+    ).rstrip(u" ").lower()
+
+def query_by_group_ids(query, column, group_ids):
+    """Return the statement that loads rows for a set of groups.
+    """
+    return query % (
+        in_list_matches(column, group_ids), in_list_placeholders(group_ids)
+    )
+
+def exec_mysql_stmt(cnx, stmt_str, options=None):
+    """Execute a statement against the stand-in.
+    """
+    STATEMENTS.append(stmt_str)
+    params = (options or {}).get("params", ())
+    requested = params[:len(params) // 2]
+    group_ids = sorted(
+        set(collate(group_id) for group_id in requested).intersection(GROUPS)
+    )
+    def matches(group_id):
+        """Return which requested ids are equal to a group's id.
+        """
+        return "".join(
+            str(int(collate(requested_id) == group_id))
+            for requested_id in requested
+        )
+    if stmt_str == Group.QUERY_GROUPS:
+        return [(group_id, ) for group_id in sorted(GROUPS)]
+    elif stmt_str == query_by_group_ids(
+        Group.QUERY_GROUPS_BY_ID, "group_id", requested):
+        return [
+            (matches(group_id), ) + GROUPS[group_id] for group_id in group_ids
+        ]
+    elif stmt_str == query_by_group_ids(
+        Group.QUERY_GROUPS_WITH_SERVERS, "g.group_id", requested):
+        rows = []
+        for group_id in group_ids:
+            servers = SERVERS.get(group_id) or [(None, ) * 6]
+            rows.extend(
+                (matches(group_id), ) + GROUPS[group_id] + server
+                for server in servers
+            )
+        return rows
+    elif stmt_str == query_by_group_ids(
+        MySQLServer.QUERY_SERVERS_BY_GROUP_IDS, "group_id", requested):
+        return [
+            (matches(group_id), ) + server for group_id in group_ids
+            for server in SERVERS.get(group_id, [])
+        ]
+    elif stmt_str.startswith("SELECT @@GLOBAL.SERVER_UUID"):
+        return [(str(_uuid.uuid4()), )]
+    return []
+
+class TestBulkFetch(unittest.TestCase):
+    """Unit test for the accessors that load groups and servers in bulk.
+    """
+    def setUp(self):
+        """Configure the existing environment
+        """
+        self.enabled = ObjectCache.ENABLED
+        self.state_store = tests.utils.setup_state_store_stand_in(
+            exec_mysql_stmt
+        )
+        ObjectCache.ENABLED = False
+        for number in range(0, 3):
+            group_id = "group-%s" % (number, )
+            GROUPS[group_id] = (group_id, "", None, None, Group.ACTIVE)
+            SERVERS[group_id] = [
+                (str(_uuid.uuid4()), "server-%s-%s:3306" % (number, server),
+                 MySQLServer.get_mode_idx(MySQLServer.READ_ONLY),
+                 MySQLServer.get_status_idx(MySQLServer.SECONDARY), 1.0,
+                 group_id)
+                for server in range(0, 2)
+            ]
+        GROUPS["group-empty"] = ("group-empty", "", None, None, Group.ACTIVE)
+        self.persister = _persistence.MySQLPersister()
+        _persistence.PersistentMeta.init_thread(self.persister)
+        del STATEMENTS[:]
+
+    def tearDown(self):
+        """Clean up the existing environment
+        """
+        _persistence.PersistentMeta.deinit_thread()
+        tests.utils.teardown_state_store_stand_in(self.state_store)
+        ObjectCache.ENABLED = self.enabled
+        GROUPS.clear()
+        SERVERS.clear()
+
+    def test_accessors(self):
+        """Check that the accessors load everything in a single statement.
+        """
+        groups = Group.fetch_many(["group-0", "group-2", "unknown"])
+        self.assertEqual(sorted(groups), ["group-0", "group-2"])
+        self.assertEqual(groups["group-2"].group_id, "group-2")
+        self.assertEqual(len(STATEMENTS), 1)
+
+        servers = MySQLServer.servers_for_groups(["group-1", "group-empty"])
+        self.assertEqual(len(servers["group-1"]), 2)
+        self.assertEqual(servers["group-empty"], [])
+        self.assertEqual(
+            [server.address for server in servers["group-1"]],
+            ["server-1-0:3306", "server-1-1:3306"]
+        )
+        self.assertEqual(len(STATEMENTS), 2)
+
+        groups = Group.fetch_with_servers(["group-0", "group-empty"])
+        group, servers = groups["group-0"]
+        self.assertEqual(group.group_id, "group-0")
+        self.assertEqual(len(servers), 2)
+        self.assertEqual(groups["group-empty"][1], [])
+        self.assertEqual(len(STATEMENTS), 3)
+
+        # Nothing is read when there is nothing to load.
+        self.assertEqual(Group.fetch_many([]), {})
+        self.assertEqual(Group.fetch_with_servers([]), {})
+        self.assertEqual(MySQLServer.servers_for_groups([]), {})
+        self.assertEqual(len(STATEMENTS), 3)
+
+    def test_requested_ids(self):
+        """Check that objects are returned under the requested ids although
+        the state store returns them under the ids they were created with.
+        """
+        groups = Group.fetch_many(["GROUP-0", "group-0 ", "Unknown"])
+        self.assertEqual(sorted(groups), ["GROUP-0", "group-0 "])
+        self.assertEqual(groups["GROUP-0"].group_id, "group-0")
+
+        servers = MySQLServer.servers_for_groups(["Group-1", "group-1"])
+        self.assertEqual(len(servers["Group-1"]), 2)
+        self.assertEqual(len(servers["group-1"]), 2)
+
+        groups = Group.fetch_with_servers(["GROUP-EMPTY"])
+        self.assertEqual(groups["GROUP-EMPTY"][0].group_id, "group-empty")
+        self.assertEqual(groups["GROUP-EMPTY"][1], [])
+
+        # Which ids match is decided by the state store.
+        groups = Group.fetch_with_servers([u"gr\xf6up-2", "group-2"])
+        self.assertEqual(sorted(groups), ["group-2", u"gr\xf6up-2"])
+        self.assertEqual(groups[u"gr\xf6up-2"][0].group_id, "group-2")
+        self.assertEqual(len(groups[u"gr\xf6up-2"][1]), 2)
+        self.assertEqual(len(STATEMENTS), 4)
+
+    def test_commands(self):
+        """Check the number of statements sent by commands that span
+        groups.
+        """
+        GroupLookups().execute()
+        self.assertEqual(len(STATEMENTS), 2)
+
+        del STATEMENTS[:]
+        result = ServerLookups().execute("group-1")
+        self.assertEqual(result.results[0].rowcount, 2)
+        self.assertEqual(len(STATEMENTS), 1)
+
+        del STATEMENTS[:]
+        result = ServerLookups().execute("unknown")
+        self.assertTrue("does not exist" in result.error)
+        self.assertEqual(len(STATEMENTS), 1)
+
+        # The servers in group-empty are checked without being contacted.
+        del STATEMENTS[:]
+        result = CheckGroupsHealth().execute("group-empty")
+        self.assertEqual(result.results[0].rowcount, 0)
+        self.assertEqual(len(STATEMENTS), 2)
+
+        del STATEMENTS[:]
+        result = CheckGroupsHealth().execute("group-empty, unknown")
+        self.assertTrue("does not exist" in result.error)
+        self.assertEqual(len(STATEMENTS), 1)
+
+        # Groups are found whatever the case of the requested ids.
+        result = GroupLookups().execute("GROUP-1")
+        self.assertEqual(result.results[0].rowcount, 1)
+        result = CheckGroupsHealth().execute("GROUP-EMPTY")
+        self.assertEqual(result.results[0].rowcount, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -18,6 +18,9 @@
 """Unit tests for the checkpoint/recovery.
 """
 import unittest
+import logging
+import pickle
+import time
 import uuid as _uuid
 import tests.utils
 
@@ -41,6 +44,8 @@ EVENT_CHECK_CHAIN = _events.Event("EVENT_CHECK_CHAIN")
 COUNT_1 = 0
 COUNT_2 = 0
 
+_LOGGER = logging.getLogger(__name__)
+
 class MyTransAction(_persistence.Persistable):
     """Define a class that inherits from Persitable.
     """
@@ -333,6 +338,145 @@ class TestPropertiesCheckpoint(unittest.TestCase):
         # There should not be any entry for this procedure.
         self.assertEqual(len(_checkpoint.Checkpoint.fetch(procedure.uuid)), 0)
 
+    def test_statements_per_procedure(self):
+        """Count the statements that write checkpoints on behalf of a
+        procedure whose first job triggers two dependent jobs.
+        """
+        statements = []
+        exec_stmt = _persistence.MySQLPersister.exec_stmt
+        def _exec_stmt(persister, stmt_str, options=None):
+            """Record statements that write checkpoints.
+            """
+            if "checkpoints" in stmt_str and \
+                stmt_str.split(" ", 1)[0] in ("INSERT", "UPDATE", "DELETE"):
+                statements.append(stmt_str.split(" ", 1)[0])
+            return exec_stmt(persister, stmt_str, options)
+
+        _persistence.MySQLPersister.exec_stmt = _exec_stmt
+        try:
+            procedures = _events.trigger(
+                EVENT_CHECK_PROPERTIES_6, set(["lock"]), "PARAM 01", "PARAM 02"
+            )
+            for procedure in procedures:
+                procedure.wait()
+        finally:
+            _persistence.MySQLPersister.exec_stmt = exec_stmt
+
+        # One INSERT per job and an UPDATE per job's start and finish
+        # plus the DELETE when the procedure finishes were needed before
+        # the jobs triggered by a job were registered together.
+        jobs = 3
+        before = jobs + 2 * jobs + 1
+        after = len(statements)
+        _LOGGER.info(
+            "Statements per procedure: %s before, %s after.", before, after
+        )
+        self.assertEqual(statements.count("INSERT"), 2)
+        self.assertEqual(statements.count("UPDATE"), 2 * jobs)
+        self.assertEqual(statements.count("DELETE"), 1)
+        self.assertEqual(after, before - 1)
+
+
+class TestCheckpointSerialization(unittest.TestCase):
+    """Check the size and speed of the checkpoints' serialization with
+    arguments like those used by resharding.
+    """
+    ITERATIONS = 1000
+
+    SPLIT_ARGS = (
+        (1, "GROUPID2", "GROUPID3", "/tmp/MySQL_localhost_13002.sql",
+         "600", 1000, "SPLIT", False),
+        {},
+        set(["GROUPID2", "GROUPID3", "1"]),
+    )
+
+    PRUNE_ARGS = (
+        ("db1.t1", 10000),
+        {"servers" : [str(_uuid.uuid4()) for _ in range(0, 200)]},
+        set(["db1.t1"]),
+    )
+
+    def test_backward_compatibility(self):
+        """Check that parameters serialized by previous versions are read.
+        """
+        for args, kwargs, objects in (self.SPLIT_ARGS, self.PRUNE_ARGS):
+            legacy = [pickle.dumps(obj) for obj in (args, kwargs, objects)]
+            self.assertEqual(
+                _checkpoint.Checkpoint.deserialize(*legacy),
+                (args, kwargs, objects)
+            )
+            self.assertEqual(
+                _checkpoint.Checkpoint.deserialize(
+                    *_checkpoint.Checkpoint.serialize(args, kwargs, objects)
+                ), (args, kwargs, objects)
+            )
+
+    def test_size_and_speed(self):
+        """Compare the serialization with the former one.
+        """
+        for name, params in (("split", self.SPLIT_ARGS),
+                             ("prune", self.PRUNE_ARGS)):
+            legacy_size, legacy_time = self._measure(
+                lambda *objs: [pickle.dumps(obj) for obj in objs],
+                lambda *data: [pickle.loads(obj) for obj in data],
+                params
+            )
+            size, elapsed = self._measure(
+                _checkpoint.Checkpoint.serialize,
+                _checkpoint.Checkpoint.deserialize,
+                params
+            )
+            _LOGGER.info(
+                "Serialization of %s parameters: %s bytes and %.1f us per "
+                "round trip, before %s bytes and %.1f us.", name, size,
+                elapsed * 1000000, legacy_size, legacy_time * 1000000
+            )
+            self.assertTrue(size < legacy_size)
+
+    def _measure(self, serialize, deserialize, params):
+        """Return the size of the serialized parameters and the time to
+        serialize and deserialize them.
+        """
+        begin = time.time()
+        for _ in xrange(self.ITERATIONS):
+            data = serialize(*params)
+            deserialize(*data)
+        elapsed = (time.time() - begin) / self.ITERATIONS
+        return sum(len(value) for value in data), elapsed
+
+
+class _LockingCheckpoint(object):
+    """Checkpoint with only the objects it locks.
+    """
+    def __init__(self, name, lockable_objects):
+        """Constructor for _LockingCheckpoint.
+        """
+        self.name = name
+        self.lockable_objects = lockable_objects
+
+class TestRecoveryChains(unittest.TestCase):
+    """Check how checkpoints are grouped into chains that are undone one
+    after the other.
+    """
+    def test_overlapping_objects(self):
+        """Check that checkpoints that lock any common object are in the
+        same chain and keep their order.
+        """
+        checkpoints = [
+            _LockingCheckpoint("a", set(["g1"])),
+            _LockingCheckpoint("b", set(["g2"])),
+            _LockingCheckpoint("c", set(["g3"])),
+            _LockingCheckpoint("d", set(["g2", "g4"])),
+            _LockingCheckpoint("e", set(["g4", "g1"])),
+            _LockingCheckpoint("f", None),
+            _LockingCheckpoint("g", set()),
+            _LockingCheckpoint("h", set(["g3"])),
+        ]
+        chains = _recovery._group_by_lockable_objects(checkpoints)
+        self.assertEqual(
+            [[checkpoint.name for checkpoint in chain] for chain in chains],
+            [["a", "b", "d", "e"], ["c", "h"], ["f", "g"]]
+        )
 
 class TestRecoveryCheckpoint(unittest.TestCase):
     """This test case check checkpoint and recovery.
@@ -573,6 +717,54 @@ class TestRecoveryCheckpoint(unittest.TestCase):
         self.assertEqual(len(_checkpoint.Checkpoint.fetch(proc_uuid)), 0)
         executor.remove_procedure(proc_uuid)
 
+    def test_recovery_batches(self):
+        """Check recovery when checkpoints are read in several batches.
+        """
+        global COUNT_1, COUNT_2
+        count_1 = 10
+        count_2 = 30
+        lockable_objects = set(["lock"])
+        args = (count_1, count_2)
+        kwargs = {}
+        checkpoints = []
+        for proc_uuid, job_uuid, sequence, do_action in [
+            ("01da10ed-514e-43a4-8388-ab05c04d67e1",
+             "aaa1ba17-ff1d-45e6-a83c-5655ea5bb646", 1,
+             check_do_action_registered_1),
+            ("01da10ed-514e-43a4-8388-ab05c04d67e1",
+             "bbb1ba17-ff1d-45e6-a83c-5655ea5bb646", 2,
+             check_do_action_registered_2),
+            ("02da10ed-514e-43a4-8388-ab05c04d67e1",
+             "ccc1ba17-ff1d-45e6-a83c-5655ea5bb646", 1,
+             check_do_action_registered_1),
+            ]:
+            checkpoint = _checkpoint.Checkpoint(
+                _uuid.UUID(proc_uuid), lockable_objects, _uuid.UUID(job_uuid),
+                sequence, do_action.__module__ + "." + do_action.__name__,
+                args, kwargs
+                )
+            checkpoint.register()
+            checkpoints.append(checkpoint)
+
+        COUNT_1 = 0
+        COUNT_2 = 0
+        batch_size = _recovery.RECOVERY_BATCH_SIZE
+        try:
+            _recovery.RECOVERY_BATCH_SIZE = 1
+            _recovery.recovery()
+        finally:
+            _recovery.RECOVERY_BATCH_SIZE = batch_size
+        executor = _executor.Executor()
+        for checkpoint in checkpoints:
+            procedure = executor.get_procedure(checkpoint.proc_uuid)
+            if procedure is not None:
+                procedure.wait()
+        self.assertEqual(COUNT_1, 30)
+        self.assertEqual(COUNT_2, 90)
+        self.assertEqual(len(_checkpoint.Checkpoint.registered()), 0)
+        for checkpoint in checkpoints:
+            executor.remove_procedure(checkpoint.proc_uuid)
+
 @_events.on_event(EVENT_CHECK_PROPERTIES_1)
 def check_properties_1(param_01, param_02):
     """Check properties 1.
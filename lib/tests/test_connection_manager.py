@@ -0,0 +1,304 @@
+#
+# Copyright (c) 2013,2014, Oracle and/or its affiliates. All rights reserved.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; version 2 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+#
+"""Unit tests for the connection manager's bounds and micro-benchmark for
+its locking.
+
+Connections are replaced by objects that do not talk to any server so
+that only the pool's bookkeeping and locking are measured.
+"""
+import unittest
+import logging
+import threading
+import random
+import time
+import uuid as _uuid
+
+import mysql.fabric.server as _server
+
+from mysql.fabric.errors import (
+    DatabaseError,
+)
+
+from mysql.fabric.server import (
+    ConnectionManager,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+THREADS = (1, 4, 16, 64)
+SERVERS = (1, 10, 100, 1000)
+OPERATIONS = 20000
+
+# Connections closed by the connection manager.
+DESTROYED = []
+
+class Connection(object):
+    """Connection that does not talk to any server.
+    """
+    user = "fabric"
+
+    def is_connected(self):
+        """Always connected.
+        """
+        return True
+
+class Server(object):
+    """Server with only the attributes used by the connection manager.
+    """
+    user = server_user = "fabric"
+    passwd = None
+    address = "localhost:3306"
+
+    def __init__(self, uuid):
+        """Constructor for Server.
+        """
+        self.uuid = uuid
+
+class TestConnectionBounds(unittest.TestCase):
+    """Unit test for the limits on the connections kept by the pool.
+    """
+    def setUp(self):
+        """Configure the existing environment
+        """
+        self.functions = (
+            _server.create_mysql_connection, _server.connect_to_mysql,
+            _server.destroy_mysql_connection, _server.is_valid_mysql_connection
+        )
+        self.attributes = dict(
+            (name, getattr(ConnectionManager, name))
+            for name in ("MAX_IDLE", "MAX_TOTAL", "WAIT_TIMEOUT",
+                         "IDLE_TIMEOUT", "MAX_AGE", "_MIN_EVICTION_INTERVAL")
+        )
+        _server.create_mysql_connection = Connection
+        _server.connect_to_mysql = lambda cnx, **kwargs: cnx
+        _server.destroy_mysql_connection = DESTROYED.append
+        del DESTROYED[:]
+        self.manager = ConnectionManager()
+        self.server = Server("bounds-%s" % (_uuid.uuid4(), ))
+
+    def tearDown(self):
+        """Clean up the existing environment
+        """
+        self.manager.shutdown()
+        self.manager.purge_connections(self.server)
+        _server.create_mysql_connection, _server.connect_to_mysql, \
+            _server.destroy_mysql_connection, \
+            _server.is_valid_mysql_connection = self.functions
+        for name, value in self.attributes.items():
+            setattr(ConnectionManager, name, value)
+
+    def test_max_idle(self):
+        """Check that connections beyond MAX_IDLE are closed on release.
+        """
+        ConnectionManager.MAX_IDLE = 1
+        first = self.manager.get_connection(self.server)
+        second = self.manager.get_connection(self.server)
+        self.manager.release_connection(self.server, first)
+        self.manager.release_connection(self.server, second)
+        self.assertEqual(DESTROYED, [second])
+        self.assertEqual(self._statistics()['idle'], 1)
+        self.assertEqual(self._statistics()['evictions'], 1)
+
+    def test_max_total(self):
+        """Check that requests block when MAX_TOTAL connections exist until
+        one of them is released.
+        """
+        ConnectionManager.MAX_TOTAL = 2
+        ConnectionManager.WAIT_TIMEOUT = 10.0
+        first = self.manager.get_connection(self.server)
+        self.manager.get_connection(self.server)
+
+        fetched = []
+        waiter = threading.Thread(
+            target=lambda: fetched.append(
+                self.manager.get_connection(self.server)
+            )
+        )
+        waiter.start()
+        while self._statistics()['waits'] == 0:
+            time.sleep(0.001)
+        self.assertEqual(fetched, [])
+
+        self.manager.release_connection(self.server, first)
+        waiter.join(10.0)
+        self.assertEqual(fetched, [first])
+        statistics = self._statistics()
+        self.assertEqual(statistics['creates'], 2)
+        self.assertEqual(statistics['in_use'], 2)
+        self.assertTrue(statistics['wait_time'] > 0)
+
+    def test_wait_timeout(self):
+        """Check that a request fails when no connection is released within
+        WAIT_TIMEOUT seconds.
+        """
+        ConnectionManager.MAX_TOTAL = 1
+        ConnectionManager.WAIT_TIMEOUT = 0.05
+        self.manager.get_connection(self.server)
+        begin = time.time()
+        self.assertRaises(
+            DatabaseError, self.manager.get_connection, self.server
+        )
+        self.assertTrue(time.time() - begin >= 0.05)
+        self.assertEqual(self._statistics()['in_use'], 1)
+
+        # Connections with other credentials are not bounded.
+        other = Server(self.server.uuid)
+        other.user = "root"
+        self.manager.get_connection(other)
+
+    def test_idle_timeout(self):
+        """Check that the background thread evicts idle connections.
+        """
+        ConnectionManager.IDLE_TIMEOUT = 0.05
+        ConnectionManager._MIN_EVICTION_INTERVAL = 0.01
+        cnx = self.manager.get_connection(self.server)
+        self.manager.release_connection(self.server, cnx)
+        self.manager.start()
+        deadline = time.time() + 10.0
+        while not DESTROYED and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(DESTROYED, [cnx])
+        self.assertEqual(self._statistics()['idle'], 0)
+
+        # The thread stops when it is shut down.
+        self.manager.shutdown()
+        deadline = time.time() + 10.0
+        while self._evictors() and time.time() < deadline:
+            time.sleep(0.01)
+        self.assertEqual(self._evictors(), [])
+
+        # The thread is not started if the eviction is disabled.
+        ConnectionManager.IDLE_TIMEOUT = 0
+        self.manager.start()
+        self.assertEqual(self._evictors(), [])
+
+    def test_max_age(self):
+        """Check that connections older than MAX_AGE are not reused.
+        """
+        ConnectionManager.MAX_AGE = 0.05
+        cnx = self.manager.get_connection(self.server)
+        self.manager.release_connection(self.server, cnx)
+        time.sleep(0.06)
+        fresh = self.manager.get_connection(self.server)
+        self.assertFalse(fresh is cnx)
+        self.assertEqual(DESTROYED, [cnx])
+
+        # A connection that becomes too old while in use is closed on
+        # release.
+        time.sleep(0.06)
+        self.manager.release_connection(self.server, fresh)
+        self.assertEqual(DESTROYED, [cnx, fresh])
+        self.assertEqual(self._statistics()['idle'], 0)
+
+    def test_invalid(self):
+        """Check that pooled connections that are no longer valid are
+        closed instead of being reused.
+        """
+        first = self.manager.get_connection(self.server)
+        second = self.manager.get_connection(self.server)
+        self.manager.release_connection(self.server, first)
+        self.manager.release_connection(self.server, second)
+        _server.is_valid_mysql_connection = lambda cnx: cnx is not second
+        cnx = self.manager.get_connection(self.server)
+        self.assertTrue(cnx is first)
+        self.assertEqual(DESTROYED, [second])
+        self.assertEqual(self._statistics()['in_use'], 1)
+
+    def _statistics(self):
+        """Return the statistics on the connections to the server.
+        """
+        return self.manager.get_statistics()[self.server.uuid]
+
+    @staticmethod
+    def _evictors():
+        """Return the threads that evict idle connections.
+        """
+        return [
+            thread for thread in threading.enumerate()
+            if thread.name == "ConnectionEvictor"
+        ]
+
+class TestConnectionManager(unittest.TestCase):
+    """Measure how many connections are fetched from and released to the
+    pool per second.
+    """
+    def setUp(self):
+        """Configure the existing environment
+        """
+        self.functions = (
+            _server.create_mysql_connection, _server.connect_to_mysql,
+            _server.destroy_mysql_connection
+        )
+        _server.create_mysql_connection = Connection
+        _server.connect_to_mysql = lambda cnx, **kwargs: cnx
+        _server.destroy_mysql_connection = lambda cnx: None
+        self.manager = ConnectionManager()
+
+    def tearDown(self):
+        """Clean up the existing environment
+        """
+        _server.create_mysql_connection, _server.connect_to_mysql, \
+            _server.destroy_mysql_connection = self.functions
+
+    def test_throughput(self):
+        """Fetch and release connections with 1 to 64 threads and 1 to
+        1000 servers.
+        """
+        report = ["threads servers operations/s"]
+        for n_servers in SERVERS:
+            servers = [
+                Server("benchmark-%s-%s" % (n_servers, number))
+                for number in range(n_servers)
+            ]
+            for n_threads in THREADS:
+                elapsed = self._run(servers, n_threads)
+                report.append("%7d %7d %12.0f" %
+                    (n_threads, n_servers, OPERATIONS / elapsed))
+            statistics = self.manager.get_statistics()
+            for server in servers:
+                self.assertEqual(statistics[server.uuid]['in_use'], 0)
+                self.manager.purge_connections(server)
+        _LOGGER.info("Connection manager throughput:\n%s", "\n".join(report))
+
+    def _run(self, servers, n_threads):
+        """Run OPERATIONS fetch and release pairs split among threads.
+        """
+        operations = OPERATIONS // n_threads
+        start = threading.Event()
+
+        def _work():
+            """Fetch and release connections to random servers.
+            """
+            start.wait()
+            for _ in xrange(operations):
+                server = random.choice(servers)
+                cnx = self.manager.get_connection(server)
+                self.manager.release_connection(server, cnx)
+
+        threads = [threading.Thread(target=_work) for _ in range(n_threads)]
+        for thread in threads:
+            thread.start()
+        begin = time.time()
+        start.set()
+        for thread in threads:
+            thread.join()
+        return max(time.time() - begin, 1e-6)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
@@ -20,6 +20,8 @@
 import unittest
 import logging
 import uuid
+import threading
+import time
 import tests
 
 from mysql.fabric import (
@@ -187,6 +189,186 @@ class TestExecutor(unittest.TestCase):
         for action in actions:
             action.verify(self)
 
+    def test_coalesce_procedures(self):
+        """Test that identical procedures which have not started yet are
+        coalesced.
+        """
+        coalesced = \
+            self.executor.get_scheduler_statistics()["admin"]["coalesced"]
+        release = threading.Event()
+        blocking = self.executor.enqueue_procedure(
+            False, release.wait, "Block executor", set(["lock"])
+        )
+        try:
+            action = Action(1)
+            actions = [{
+                "action" : (action, action.descr, (1, ), {}), "job" : None
+            }]
+            procs_1 = self.executor.enqueue_procedures(
+                False, actions, set(["lock"]), coalesce=True
+            )
+            procs_2 = self.executor.enqueue_procedures(
+                False, actions, set(["lock"]), coalesce=True
+            )
+            procs_3 = self.executor.enqueue_procedures(
+                False, actions, set(["other"]), coalesce=True
+            )
+            self.assertEqual(procs_1, procs_2)
+            self.assertNotEqual(procs_1, procs_3)
+
+            # Actions are coalesced by the key that a function returns
+            # and the pending procedure keeps its own arguments.
+            keyed = Action(2)
+            procs_5 = self.executor.enqueue_procedures(
+                False, [{
+                    "action" : (keyed, keyed.descr, (2, ), {}), "job" : None
+                }], set(["lock"]), coalesce=lambda param: "server"
+            )
+            procs_6 = self.executor.enqueue_procedures(
+                False, [{
+                    "action" : (keyed, keyed.descr, (3, ), {}), "job" : None
+                }], set(["lock"]), coalesce=lambda param: "server"
+            )
+            self.assertEqual(procs_5, procs_6)
+            statistics = self.executor.get_scheduler_statistics()
+            self.assertEqual(
+                statistics["admin"]["coalesced"], coalesced + 2
+            )
+        finally:
+            release.set()
+        blocking.wait()
+        for proc in procs_1 + procs_3 + procs_5:
+            proc.wait()
+        action.verify(self)
+        keyed.verify(self)
+
+        # Procedures that have already started are not reused.
+        procs_4 = self.executor.enqueue_procedures(
+            False, actions, set(["lock"]), coalesce=True
+        )
+        self.assertNotEqual(procs_1, procs_4)
+        procs_4[0].wait()
+
+    def test_dynamic_executors(self):
+        """Test that executor threads are created when procedures are
+        waiting and that idle ones retire.
+        """
+        min_executors = self.executor.get_number_executors()
+        max_executors = self.executor.get_max_executors()
+        release = threading.Event()
+        try:
+            self.executor.set_executor_bounds(1, 3, 0.5)
+            time.sleep(2)
+            statistics = self.executor.get_executor_statistics()
+            self.assertEqual(statistics["running"], 1)
+
+            # Procedures lock different objects so they do not conflict.
+            procs = [
+                self.executor.enqueue_procedure(
+                    False, release.wait, "Block executor",
+                    set(["lock-%s" % (num, )])
+                ) for num in range(0, 5)
+            ]
+            time.sleep(1)
+            statistics = self.executor.get_executor_statistics()
+            self.assertEqual(statistics["running"], 3)
+            self.assertEqual(statistics["idle"], 0)
+
+            release.set()
+            for proc in procs:
+                proc.wait()
+            time.sleep(2)
+            statistics = self.executor.get_executor_statistics()
+            self.assertEqual(statistics["running"], 1)
+
+            self.assertRaises(_errors.ExecutorError,
+                self.executor.set_executor_bounds, 2, 1)
+        finally:
+            release.set()
+            self.executor.set_executor_bounds(min_executors, max_executors)
+
+    def test_procedure_history(self):
+        """Test that the history of finished procedures is bounded.
+        """
+        class Finished(object):
+            """Finished procedure.
+            """
+            def __init__(self, diagnosis):
+                """Constructor for Finished.
+                """
+                self.uuid = uuid.uuid4()
+                self.result = None
+                self.status = [{
+                    "when" : time.time(), "state" : _executor.Job.COMPLETE,
+                    "success" : _executor.Job.ERROR,
+                    "description" : "Failure.", "diagnosis" : diagnosis
+                }]
+
+        max_size = _executor.ProcedureHistory.MAX_SIZE
+        max_tracebacks = _executor.ProcedureHistory.MAX_TRACEBACKS
+        try:
+            _executor.ProcedureHistory.MAX_SIZE = 3
+            _executor.ProcedureHistory.MAX_TRACEBACKS = 1
+            history = _executor.ProcedureHistory()
+            procs = [
+                Finished("Traceback:\n  File...\nException: Failure.\n")
+                for _ in range(0, 4)
+            ]
+            for proc in procs[:3]:
+                history.add(proc)
+            # The least recently used record is evicted.
+            self.assertEqual(history.get(procs[0].uuid).uuid, procs[0].uuid)
+            history.add(procs[3])
+            self.assertEqual(history.get(procs[1].uuid), None)
+
+            # Only the latest record keeps the full traceback.
+            status = history.get(procs[0].uuid).status
+            self.assertEqual(status[-1]["diagnosis"], "Exception: Failure.\n")
+            status = history.get(procs[3].uuid).status
+            self.assertEqual(status[-1]["diagnosis"].split("\n")[-2],
+                             "Exception: Failure.")
+            self.assertTrue(status[-1]["diagnosis"].startswith("Traceback"))
+            self.assertEqual(history.get_statistics(), {
+                "records" : 3, "tracebacks" : 1, "evicted" : 1
+            })
+
+            # Tracebacks of evicted and removed records are not counted.
+            _executor.ProcedureHistory.MAX_TRACEBACKS = 2
+            history.add(procs[1])
+            self.assertEqual(history.get(procs[2].uuid), None)
+            self.assertEqual(history.get_statistics(), {
+                "records" : 3, "tracebacks" : 2, "evicted" : 2
+            })
+            history.remove(procs[3].uuid)
+            self.assertEqual(history.get_statistics(), {
+                "records" : 2, "tracebacks" : 1, "evicted" : 2
+            })
+            _executor.ProcedureHistory.MAX_SIZE = 1
+            history.get(procs[1].uuid)
+            self.assertEqual(history.get(procs[0].uuid), None)
+            self.assertEqual(history.get_statistics(), {
+                "records" : 1, "tracebacks" : 1, "evicted" : 3
+            })
+
+            # A finished procedure is found after all references to it
+            # are dropped.
+            proc = self.executor.enqueue_procedure(
+                False, test2, "Enqueuing action test2()", set(["lock"])
+            )
+            proc.wait()
+            proc_uuid = proc.uuid
+            del proc
+            for _ in range(0, 10):
+                self.executor.enqueue_procedure(
+                    False, test2, "Enqueuing action test2()", set(["lock"])
+                ).wait()
+            proc = self.executor.get_procedure(proc_uuid)
+            self.assertEqual(proc.uuid, proc_uuid)
+            self.assertTrue(proc.is_complete())
+            self.assertEqual(proc.status[-1]["success"], _executor.Job.SUCCESS)
+        finally:
+            _executor.ProcedureHistory.MAX_SIZE = max_size
+            _executor.ProcedureHistory.MAX_TRACEBACKS = max_tracebacks
 
 if __name__ == "__main__":
     unittest.main()
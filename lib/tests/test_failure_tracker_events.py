@@ -23,6 +23,10 @@ import sys
 
 import mysql.fabric.persistence as _persistence
 
+from mysql.fabric.error_log import (
+    ErrorLog,
+)
+
 from mysql.fabric.server import (
     MySQLServer,
 )
@@ -131,6 +135,37 @@ class TestFailureEvents(tests.utils.TestCase):
         status = self.proxy.threat.report_error(address_1)
         self.check_xmlrpc_command_result(status)
 
+    def test_report_error_per_reporter(self):
+        """Test that every report is registered in the error log even if
+        reports on the same server are served by a single procedure.
+        """
+        _failure_tracker.ReportError._NOTIFICATIONS = 3
+        _failure_tracker.ReportError._NOTIFICATION_CLIENTS = 3
+
+        # Prepare group and servers
+        self.proxy.group.create("group", "Testing group...")
+        address_1 = tests.utils.MySQLInstances().get_address(0)
+        self.proxy.group.add("group", address_1)
+        status_uuid = self.proxy.server.lookup_uuid(address_1)
+        info = self.check_xmlrpc_simple(status_uuid, {})
+        uuid_1 = info['uuid']
+
+        # Report errors from different reporters without waiting.
+        for reporter in ("client-1", "client-2", "client-3"):
+            status = self.proxy.threat.report_error(
+                uuid_1, reporter, "error", True, False
+            )
+            self.check_xmlrpc_command_result(status, is_syncronous=False)
+        self.proxy.threat.report_error(uuid_1, "client-1", "error", True)
+
+        server = _server.MySQLServer.fetch(uuid_1)
+        interval = get_time_delta(
+            _failure_tracker.ReportError._NOTIFICATION_INTERVAL
+        )
+        error_log = ErrorLog.fetch(server, interval, get_time())
+        self.assertEqual(len(error_log.reporters), 4)
+        self.assertEqual(server.status, _server.MySQLServer.FAULTY)
+
     def test_report_error_update_only(self):
         """Test the mechanism used to report server's issues (i.e. errors).
         """
@@ -234,5 +269,15 @@ class TestFailureEvents(tests.utils.TestCase):
             'status': _server.MySQLServer.SECONDARY,
         }, rowcount=2, index=1)
 
+        status = self.proxy.group.health_groups("group")
+        self.check_xmlrpc_simple(status, {
+            'group_id': "group",
+            'status': _server.MySQLServer.FAULTY,
+        }, rowcount=2, index=0)
+        self.check_xmlrpc_simple(status, {
+            'group_id': "group",
+            'status': _server.MySQLServer.SECONDARY,
+        }, rowcount=2, index=1)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,154 @@
+#
+# Copyright (c) 2013,2014, Oracle and/or its affiliates. All rights reserved.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; version 2 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+#
+"""Micro-benchmark for the state store's group commit.
+
+The state store is replaced by a stand-in that records the statements
+and waits a fixed time per round trip, so that the latency of jobs can
+be compared with and without group commit.
+"""
+import unittest
+import logging
+import time
+import uuid as _uuid
+import tests.utils
+
+import mysql.fabric.persistence as _persistence
+
+from mysql.fabric.executor import (
+    ExecutorQueue,
+    Job,
+    Procedure,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+JOBS = 200
+
+# Time in seconds of a round trip to the stand-in.
+ROUND_TRIP = 0.0005
+
+ROUND_TRIPS = []
+
+def exec_mysql_stmt(cnx, stmt_str, options=None):
+    """Execute a statement in a round trip.
+    """
+    ROUND_TRIPS.append([stmt_str])
+    time.sleep(ROUND_TRIP)
+    if stmt_str.startswith("SELECT @@GLOBAL.SERVER_UUID"):
+        return [(str(_uuid.uuid4()), )]
+    return []
+
+def exec_mysql_stmts(cnx, statements):
+    """Execute a list of statements in a round trip.
+    """
+    ROUND_TRIPS.append([stmt_str for stmt_str, _ in statements])
+    time.sleep(ROUND_TRIP)
+
+class Scheduler(object):
+    """Scheduler that ignores new procedures.
+    """
+    def enqueue_procedures(self, procedures):
+        """Ignore the procedures.
+        """
+        pass
+
+def action():
+    """Action used in the benchmark that changes the state store.
+    """
+    _persistence.current_persister().exec_stmt(
+        "UPDATE benchmark SET value = value + 1"
+    )
+
+class TestGroupCommit(unittest.TestCase):
+    """Compare the round trips and latency of jobs with and without group
+    commit.
+    """
+    def setUp(self):
+        """Configure the existing environment
+        """
+        self.state_store = tests.utils.setup_state_store_stand_in(
+            exec_mysql_stmt, functions={"exec_mysql_stmts" : exec_mysql_stmts}
+        )
+        self.persister = _persistence.MySQLPersister()
+        _persistence.PersistentMeta.init_thread(self.persister)
+
+    def tearDown(self):
+        """Clean up the existing environment
+        """
+        _persistence.PersistentMeta.deinit_thread()
+        tests.utils.teardown_state_store_stand_in(self.state_store)
+
+    def test_latency(self):
+        """Measure the latency of jobs with and without group commit.
+        """
+        _persistence.MySQLPersister.group_commit = False
+        round_trips, latency = self._run()
+        _persistence.MySQLPersister.group_commit = True
+        group_round_trips, group_latency = self._run()
+        _LOGGER.info(
+            "Job latency: %.2f ms and %s round trips without group commit, "
+            "%.2f ms and %s round trips with group commit.",
+            latency * 1000, round_trips, group_latency * 1000,
+            group_round_trips
+        )
+        # BEGIN and COMMIT carry the checkpoint's statements.
+        self.assertEqual(group_round_trips, round_trips - 2)
+        self.assertTrue(group_latency < latency)
+
+    def test_order(self):
+        """Check that checkpoint statements are sent in order along with
+        BEGIN and COMMIT.
+        """
+        _persistence.MySQLPersister.group_commit = True
+        del ROUND_TRIPS[:]
+        self._execute()
+        statements = [
+            [stmt_str.split(" ", 1)[0] for stmt_str in round_trip]
+            for round_trip in ROUND_TRIPS
+        ]
+        self.assertEqual(statements, [
+            ["UPDATE", "BEGIN"], ["UPDATE"], ["UPDATE", "COMMIT"], ["DELETE"]
+        ])
+
+        # Deferred statements are discarded on rollback.
+        self.persister.defer_stmt("UPDATE benchmark SET value = 0")
+        self.persister.rollback()
+        self.persister.begin()
+        self.assertEqual(ROUND_TRIPS[-1], ["BEGIN"])
+
+    def _run(self):
+        """Execute jobs and return the round trips and time per job.
+        """
+        del ROUND_TRIPS[:]
+        begin = time.time()
+        for _ in xrange(JOBS):
+            self._execute()
+        return len(ROUND_TRIPS) // JOBS, (time.time() - begin) / JOBS
+
+    def _execute(self):
+        """Create and execute a job.
+        """
+        queue = ExecutorQueue()
+        job = Job(Procedure(), action, "Benchmark.", [], {})
+        queue.schedule([job])
+        queue.get().execute(self.persister, Scheduler(), queue)
+        queue.done()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
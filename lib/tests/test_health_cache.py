@@ -0,0 +1,162 @@
+#
+# Copyright (c) 2014 Oracle and/or its affiliates. All rights reserved.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; version 2 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+#
+"""Unit tests for the health cache and the concurrent health checks.
+
+Servers are replaced by stand-ins whose probes block until the test
+releases them, so that checks which time out can be simulated.
+"""
+import threading
+import time
+import unittest
+import uuid as _uuid
+
+import mysql.fabric.services.health as _health
+
+from mysql.fabric import (
+    utils as _utils,
+)
+
+from mysql.fabric.failure_detector import (
+    FailureDetector,
+    HealthCache,
+)
+
+class Group(object):
+    """Group without a master.
+    """
+    master = None
+
+class Server(object):
+    """Server whose probes wait until they are released.
+    """
+    def __init__(self):
+        """Constructor for Server.
+        """
+        self.uuid = _uuid.uuid4()
+        self.released = threading.Event()
+        self.probes = 0
+
+def check_server_health(server, is_master):
+    """Probe a stand-in server.
+    """
+    server.probes += 1
+    server.released.wait()
+    health = _health._unreachable_health(is_master)
+    health['is_alive'] = True
+    return health
+
+class TestHealthCache(unittest.TestCase):
+    """Unit test for the health cache.
+    """
+    def setUp(self):
+        """Configure the existing environment
+        """
+        self.ttl = HealthCache._TTL
+        self.check_server_health = _health._check_server_health
+        _health._check_server_health = check_server_health
+        HealthCache._TTL = 60.0
+        HealthCache.clear()
+
+    def tearDown(self):
+        """Clean up the existing environment
+        """
+        _health._check_server_health = self.check_server_health
+        HealthCache._TTL = self.ttl
+        HealthCache.clear()
+
+    def test_cache(self):
+        """Check that entries expire and that a zero TTL disables the cache.
+        """
+        HealthCache.set("server-1", {'is_alive' : True})
+        self.assertEqual(HealthCache.get("server-1"), {'is_alive' : True})
+        self.assertEqual(HealthCache.get("server-2"), None)
+
+        HealthCache._TTL = 0.01
+        time.sleep(0.02)
+        self.assertEqual(HealthCache.get("server-1"), None)
+
+        HealthCache._TTL = 0
+        HealthCache.set("server-2", {'is_alive' : True})
+        self.assertEqual(HealthCache.get("server-2"), None)
+
+    def test_detector(self):
+        """Check that the failure detector uses recent health information.
+        """
+        server = Server()
+        HealthCache.set(server.uuid, {'is_alive' : False})
+        self.assertFalse(FailureDetector._is_alive(server, 1))
+
+    def test_timeout(self):
+        """Check that a check that times out is not cached, does not start
+        a probe per call and that the probe's result is cached once it
+        completes.
+        """
+        server = Server()
+        check = _health._health_check(Group(), server, 0.01)
+        self.assertFalse(check()['is_alive'])
+        self.assertFalse(check()['is_alive'])
+        self.assertEqual(server.probes, 1)
+        self.assertEqual(HealthCache.get(server.uuid), None)
+
+        probe, _ = _health._PROBES[(str(server.uuid), False)]
+        server.released.set()
+        probe.join()
+        self.assertEqual(_health._PROBES, {})
+        self.assertTrue(HealthCache.get(server.uuid)['is_alive'])
+        self.assertTrue(check()['is_alive'])
+        self.assertEqual(server.probes, 1)
+
+    def test_run_concurrently(self):
+        """Check that functions run concurrently within the bound and that
+        errors are returned in place of results.
+        """
+        lock = threading.Lock()
+        running = [0, 0]
+        def function(number):
+            """Return a function that records how many run at once.
+            """
+            def _function():
+                """Return the number or fail if it is odd.
+                """
+                with lock:
+                    running[0] += 1
+                    running[1] = max(running)
+                time.sleep(0.01)
+                with lock:
+                    running[0] -= 1
+                if number % 2:
+                    raise ValueError(number)
+                return number
+            return _function
+
+        outcomes = _utils.run_concurrently(
+            [function(number) for number in range(0, 8)], 3
+        )
+        self.assertEqual(
+            [result for result, _ in outcomes], [0, None, 2, None, 4, None,
+                                                 6, None]
+        )
+        self.assertEqual(
+            [isinstance(error, ValueError) for _, error in outcomes],
+            [False, True] * 4
+        )
+        self.assertTrue(1 < running[1] <= 3)
+        self.assertEqual(_utils.run_concurrently([], 3), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
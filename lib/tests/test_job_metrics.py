@@ -0,0 +1,229 @@
+#
+# Copyright (c) 2013,2014, Oracle and/or its affiliates. All rights reserved.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; version 2 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+#
+"""Unit tests and micro-benchmark for the job metrics.
+
+The unit tests replace the state store by objects that do not talk to any
+server. The benchmark replaces it by a stand-in that waits a fixed time
+per round trip, so that the metrics' overhead is compared with the cost
+of a real job.
+"""
+import unittest
+import logging
+import time
+import uuid as _uuid
+import tests.utils
+
+import mysql.fabric.checkpoint as _checkpoint
+import mysql.fabric.executor as _executor
+import mysql.fabric.persistence as _persistence
+
+from mysql.fabric.executor import (
+    ExecutorQueue,
+    Job,
+    JobMetrics,
+    Procedure,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+JOBS = 2000
+
+# Time in seconds of a round trip to the stand-in.
+ROUND_TRIP = 0.0005
+
+class Persister(object):
+    """Persister that does not talk to any server.
+    """
+    def __getattr__(self, name):
+        """Any method does nothing.
+        """
+        return lambda *args, **kwargs: None
+
+class Scheduler(Persister):
+    """Scheduler that ignores new procedures.
+    """
+    pass
+
+def exec_mysql_stmt(cnx, stmt_str, options=None):
+    """Execute a statement in a round trip.
+    """
+    time.sleep(ROUND_TRIP)
+    if stmt_str.startswith("SELECT @@GLOBAL.SERVER_UUID"):
+        return [(str(_uuid.uuid4()), )]
+    return []
+
+def action(fail=False):
+    """Action used in the unit tests.
+    """
+    if fail:
+        raise Exception("Failure.")
+
+def update_action():
+    """Action used in the benchmark that changes the state store.
+    """
+    _persistence.current_persister().exec_stmt(
+        "UPDATE benchmark SET value = value + 1"
+    )
+
+class TestJobMetrics(unittest.TestCase):
+    """Unit test for the job metrics.
+    """
+    def setUp(self):
+        """Configure the existing environment
+        """
+        self.functions = (
+            _checkpoint.register, _checkpoint.Checkpoint.is_recoverable,
+            _checkpoint.Checkpoint.remove, _checkpoint.Checkpoint.begin,
+            _checkpoint.Checkpoint.finish
+        )
+        _checkpoint.register = lambda jobs, transaction, finished=None: None
+        _checkpoint.Checkpoint.is_recoverable = staticmethod(lambda job: True)
+        _checkpoint.Checkpoint.remove = staticmethod(lambda checkpoint: None)
+        _checkpoint.Checkpoint.begin = lambda self: None
+        _checkpoint.Checkpoint.finish = lambda self: None
+        self.enabled = JobMetrics.ENABLED
+        self.persister = Persister()
+        self.scheduler = Scheduler()
+        self.queue = ExecutorQueue()
+
+    def tearDown(self):
+        """Clean up the existing environment
+        """
+        _checkpoint.register, is_recoverable, remove, \
+            _checkpoint.Checkpoint.begin, _checkpoint.Checkpoint.finish = \
+            self.functions
+        _checkpoint.Checkpoint.is_recoverable = staticmethod(is_recoverable)
+        _checkpoint.Checkpoint.remove = staticmethod(remove)
+        JobMetrics.ENABLED = self.enabled
+
+    def test_metrics(self):
+        """Check the counters and histograms recorded per action.
+        """
+        JobMetrics.ENABLED = True
+        before = JobMetrics.statistics().get(self._action_fqn())
+        calls, errors = (0, 0) if before is None else before[:2]
+
+        self._run(3)
+        self._run(2, fail=True)
+
+        statistics = JobMetrics.statistics()[self._action_fqn()]
+        self.assertEqual(statistics[0] - calls, 5)
+        self.assertEqual(statistics[1] - errors, 2)
+        phases = statistics[2]
+        self.assertEqual(len(phases), len(_executor.METRICS_PHASES))
+        for phase in phases:
+            self.assertEqual(
+                phase[0], sum(phase[3:])
+            )
+            self.assertEqual(
+                len(phase), 3 + len(_executor.METRICS_BUCKETS) + 1
+            )
+        queue_phase = phases[_executor.QUEUE_PHASE]
+        commit_phase = phases[_executor.COMMIT_PHASE]
+        self.assertTrue(queue_phase[0] >= 5)
+        self.assertTrue(commit_phase[0] - (calls - errors) >= 3)
+
+        # Jobs are counted once when their buffer is folded.
+        self._run(JobMetrics.BATCH)
+        self.assertEqual(
+            JobMetrics.statistics()[self._action_fqn()][0],
+            statistics[0] + JobMetrics.BATCH
+        )
+        statistics = JobMetrics.statistics()[self._action_fqn()]
+
+        JobMetrics.ENABLED = False
+        self._run(1)
+        self.assertEqual(
+            JobMetrics.statistics()[self._action_fqn()][0], statistics[0]
+        )
+
+    def _run(self, number, fail=False):
+        """Create, schedule and execute jobs and return the elapsed time.
+        """
+        return run_jobs(number, self.persister, self.scheduler, self.queue,
+                        action, [fail])
+
+    @staticmethod
+    def _action_fqn():
+        """Return the benchmark action's fully qualified name.
+        """
+        return action.__module__ + "." + action.__name__
+
+class TestJobMetricsOverhead(unittest.TestCase):
+    """Micro-benchmark for the job metrics' overhead.
+    """
+    def setUp(self):
+        """Configure the existing environment
+        """
+        self.state_store = tests.utils.setup_state_store_stand_in(
+            exec_mysql_stmt
+        )
+        self.persister = _persistence.MySQLPersister()
+        _persistence.PersistentMeta.init_thread(self.persister)
+        self.enabled = JobMetrics.ENABLED
+        self.scheduler = Scheduler()
+        self.queue = ExecutorQueue()
+
+    def tearDown(self):
+        """Clean up the existing environment
+        """
+        JobMetrics.ENABLED = self.enabled
+        _persistence.PersistentMeta.deinit_thread()
+        tests.utils.teardown_state_store_stand_in(self.state_store)
+
+    def test_overhead(self):
+        """Measure the metrics' overhead on the job latency.
+        """
+        # Jobs with and without metrics alternate so that both see the
+        # same conditions and the medians discard jobs that were delayed.
+        enabled, disabled = [], []
+        for _ in xrange(JOBS):
+            JobMetrics.ENABLED = False
+            disabled.append(run_jobs(
+                1, self.persister, self.scheduler, self.queue, update_action
+            ))
+            JobMetrics.ENABLED = True
+            enabled.append(run_jobs(
+                1, self.persister, self.scheduler, self.queue, update_action
+            ))
+        enabled.sort()
+        disabled.sort()
+        with_metrics, without_metrics = enabled[JOBS // 2], disabled[JOBS // 2]
+        overhead = (with_metrics - without_metrics) / without_metrics
+        _LOGGER.info(
+            "Job latency: %.2f ms without metrics, %.2f ms with metrics, "
+            "overhead %.2f%%.", without_metrics * 1000, with_metrics * 1000,
+            overhead * 100
+        )
+        self.assertTrue(overhead < 0.01)
+
+def run_jobs(number, persister, scheduler, queue, function, args=None):
+    """Create, schedule and execute jobs and return the elapsed time.
+    """
+    begin = time.time()
+    for _ in xrange(number):
+        procedure = Procedure()
+        job = Job(procedure, function, "Benchmark.", args or [], {})
+        queue.schedule([job])
+        queue.get().execute(persister, scheduler, queue)
+        queue.done()
+    return max(time.time() - begin, 1e-6)
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
@@ -0,0 +1,169 @@
+#
+# Copyright (c) 2013,2014, Oracle and/or its affiliates. All rights reserved.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; version 2 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+#
+"""Unit tests for the lag monitor module.
+"""
+import collections
+import unittest
+import time
+
+from mysql.fabric import (
+    errors as _errors,
+    replication as _replication,
+)
+
+from mysql.fabric.lag_monitor import (
+    LagMonitor,
+)
+
+_SlaveStatus = collections.namedtuple(
+    "_SlaveStatus", ["SQL_Delay", "Seconds_Behind_Master"]
+)
+
+class Server(object):
+    """Server that reports a fixed slave status.
+    """
+    gtid_enabled = False
+
+    def __init__(self, seconds_behind):
+        """Constructor for Server.
+        """
+        self.seconds_behind = seconds_behind
+
+    def is_connected(self):
+        """The server is always connected.
+        """
+        return True
+
+    def exec_stmt(self, stmt_str, options=None):
+        """Return the slave status.
+        """
+        return [_SlaveStatus(0, self.seconds_behind)]
+
+class Monitor(object):
+    """Lag monitor whose sampling thread is always running.
+    """
+    def is_alive(self):
+        """The sampling thread is always running.
+        """
+        return True
+
+class TestLagMonitor(unittest.TestCase):
+    """Unit test for the lag monitor's bookkeeping.
+    """
+    def setUp(self):
+        """Configure the existing environment
+        """
+        self.interval = LagMonitor._SAMPLING_INTERVAL
+        self.wait_timeout = LagMonitor._WAIT_TIMEOUT
+        LagMonitor._SAMPLING_INTERVAL = 1.0
+
+    def tearDown(self):
+        """Clean up the existing environment
+        """
+        LagMonitor._SAMPLING_INTERVAL = self.interval
+        LagMonitor._WAIT_TIMEOUT = self.wait_timeout
+        LagMonitor.MONITOR = None
+        LagMonitor.LAGS = {}
+        LagMonitor.GLOBAL_LAGS = {}
+
+    def test_lag(self):
+        """Check that lookups use the latest sample of a server.
+        """
+        now = time.time()
+        LagMonitor.LAGS = {
+            "server-1" : (0, 0, now),
+            "server-2" : (10, 5, now),
+        }
+        self.assertEqual(LagMonitor.get_lag("server-1"), (0, 0))
+        self.assertEqual(LagMonitor.get_lag("server-2"), (10, 5))
+        self.assertFalse(LagMonitor.is_lagging("server-1", 0))
+        self.assertFalse(LagMonitor.is_lagging("server-2", 10))
+        self.assertTrue(LagMonitor.is_lagging("server-2", 9.5))
+
+    def test_unknown_lag(self):
+        """Check that servers without a recent sample are lagging.
+        """
+        LagMonitor.LAGS = {
+            "server-1" : (0, 0, time.time() - 60),
+        }
+        self.assertEqual(LagMonitor.get_lag("server-1"), None)
+        self.assertEqual(LagMonitor.get_lag("server-2"), None)
+        self.assertTrue(LagMonitor.is_lagging("server-1", 100))
+        self.assertTrue(LagMonitor.is_lagging("server-2", 100))
+
+    def test_slave_lag(self):
+        """Check that the lag is unknown when Seconds_Behind_Master is NULL
+        while check_slave_delay keeps reporting no delay.
+        """
+        master = Server(None)
+        self.assertEqual(_replication.get_slave_lag(Server(5), master), (5, 0))
+        self.assertEqual(_replication.get_slave_lag(Server(0), master), (0, 0))
+        self.assertEqual(_replication.get_slave_lag(Server(None), master), None)
+        status = _replication.check_slave_delay(Server(None), master)
+        self.assertEqual(status["is_not_running"], False)
+        self.assertEqual(status["seconds_behind"], 0)
+
+    def test_gtid_difference(self):
+        """Check the number of transactions missing in a set.
+        """
+        gtids = _replication.parse_gtids("a:1-10:15,\nb:3")
+        self.assertEqual(gtids, {"A" : [(1, 10), (15, 15)], "B" : [(3, 3)]})
+        self.assertEqual(_replication.get_num_gtid_difference(
+            gtids, _replication.parse_gtids("A:2-4:9-20")), 6)
+        self.assertEqual(_replication.get_num_gtid_difference(
+            gtids, _replication.parse_gtids("")), 12)
+        self.assertEqual(_replication.get_num_gtid_difference(
+            _replication.parse_gtids("a:5,a:7-8"), gtids), 0)
+        self.assertEqual(_replication.get_num_gtid_difference(
+            _replication.parse_gtids("a:1-100"),
+            _replication.parse_gtids("a:1-10,a:20-30:50")), 78)
+
+    def test_global_lag(self):
+        """Check the lag of groups that replicate from a global group.
+        """
+        now = time.time()
+        LagMonitor.GLOBAL_LAGS = {
+            "group-1" : ("global", 0, _replication.parse_gtids("a:1-10"), now),
+            "group-2" : ("global", 5, _replication.parse_gtids("a:1-5"), now),
+            "group-3" : ("other", 0, {}, now),
+        }
+        self.assertEqual(
+            LagMonitor.get_global_lags("global"), {"group-1" : 0, "group-2" : 5}
+        )
+
+        # Nobody can report that the transactions were applied if the
+        # monitor is not running.
+        self.assertRaises(
+            _errors.ServiceError, LagMonitor.wait_for_global_gtids,
+            ["group-1"], "a:1-5", 0
+        )
+
+        LagMonitor.MONITOR = Monitor()
+        self.assertEqual(LagMonitor.wait_for_global_gtids(
+            ["group-1", "group-2"], "a:1-5", 0), [])
+        self.assertEqual(LagMonitor.wait_for_global_gtids(
+            ["group-1", "group-2", "group-4"], "a:1-10", 0),
+            ["group-2", "group-4"])
+
+        # Groups that are never sampled do not make it wait forever.
+        LagMonitor._WAIT_TIMEOUT = 0.01
+        self.assertEqual(LagMonitor.wait_for_global_gtids(
+            ["group-1", "group-4"], "a:1-5"), ["group-4"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,183 @@
+#
+# Copyright (c) 2013,2014, Oracle and/or its affiliates. All rights reserved.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; version 2 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+#
+"""Unit tests for the partitions of the log tables.
+
+The state store is replaced by a stand-in that keeps the partitions of
+each table so that the statements that change them can be checked.
+"""
+import datetime
+import re
+import unittest
+import uuid as _uuid
+import tests.utils
+
+import mysql.fabric.persistence as _persistence
+
+from mysql.fabric.error_log import (
+    ErrorLog,
+)
+
+from mysql.fabric.handler import (
+    MySQLHandler,
+)
+
+from mysql.fabric.log_partitions import (
+    LogPartitions,
+)
+
+STATEMENTS = []
+
+# Dictionary that maps a table to the names of its partitions.
+PARTITIONS = {}
+
+def exec_mysql_stmt(cnx, stmt_str, options=None):
+    """Execute a statement against the stand-in.
+    """
+    STATEMENTS.append(stmt_str)
+    params = (options or {}).get("params", ())
+    match = re.match(r"(?:CREATE|ALTER) TABLE (\w+)", stmt_str)
+    if stmt_str.startswith("SELECT PARTITION_NAME"):
+        return [(name, ) for name in PARTITIONS.get(params[1], [None])]
+    elif stmt_str.startswith("CREATE TABLE") and "PARTITION BY" in stmt_str:
+        PARTITIONS[match.group(1)] = _names(stmt_str)
+    elif " DROP PARTITION " in stmt_str:
+        names = stmt_str.split(" DROP PARTITION ")[1].split(", ")
+        PARTITIONS[match.group(1)] = [
+            name for name in PARTITIONS[match.group(1)] if name not in names
+        ]
+    elif " REORGANIZE PARTITION pmax " in stmt_str:
+        PARTITIONS[match.group(1)] = \
+            PARTITIONS[match.group(1)][:-1] + _names(stmt_str)
+    elif stmt_str.startswith("SELECT @@GLOBAL.SERVER_UUID"):
+        return [(str(_uuid.uuid4()), )]
+    return []
+
+def _names(stmt_str):
+    """Return the names of the partitions defined in a statement.
+    """
+    return re.findall(r"PARTITION (\w+) VALUES LESS THAN", stmt_str)
+
+class TestLogPartitions(unittest.TestCase):
+    """Unit test for the partitions of the log tables.
+    """
+    def setUp(self):
+        """Configure the existing environment
+        """
+        self.enabled = LogPartitions.ENABLED
+        self.prune_times = (ErrorLog._PRUNE_TIME, MySQLHandler.PRUNE_TIME)
+        self.state_store = tests.utils.setup_state_store_stand_in(
+            exec_mysql_stmt
+        )
+        _persistence.PersistentMeta.init_thread(_persistence.MySQLPersister())
+        ErrorLog._PRUNE_TIME = MySQLHandler.PRUNE_TIME = 3600
+        del STATEMENTS[:]
+        PARTITIONS.clear()
+
+    def tearDown(self):
+        """Clean up the existing environment
+        """
+        _persistence.PersistentMeta.deinit_thread()
+        tests.utils.teardown_state_store_stand_in(self.state_store)
+        LogPartitions.ENABLED = self.enabled
+        ErrorLog._PRUNE_TIME, MySQLHandler.PRUNE_TIME = self.prune_times
+
+    def test_create(self):
+        """Check that the log tables are partitioned only if it is enabled.
+        """
+        LogPartitions.ENABLED = False
+        ErrorLog.create()
+        ErrorLog.add_constraints()
+        MySQLHandler.create()
+        self.assertEqual(PARTITIONS, {})
+        self.assertEqual(len([
+            stmt_str for stmt_str in STATEMENTS
+            if stmt_str.startswith("CREATE EVENT")
+        ]), 2)
+        self.assertTrue(STATEMENTS[2].startswith("ALTER TABLE error_log"))
+
+        del STATEMENTS[:]
+        LogPartitions.ENABLED = True
+        ErrorLog.create()
+        ErrorLog.add_constraints()
+        MySQLHandler.create()
+        self.assertEqual(sorted(PARTITIONS.keys()), ["error_log", "log"])
+        self.assertFalse([
+            stmt_str for stmt_str in STATEMENTS
+            if stmt_str.startswith(("CREATE EVENT", "ALTER TABLE"))
+        ])
+        self.assertTrue("reported DATETIME" in STATEMENTS[0])
+
+        # There are at least two partitions ahead of the current time.
+        self.assertTrue(len(PARTITIONS["log"]) >= 3)
+        self.assertEqual(PARTITIONS["log"][-1], "pmax")
+
+    def test_retention(self):
+        """Check that partitioned tables keep entries as long as the events
+        that prune tables which are not partitioned.
+        """
+        self.assertEqual(LogPartitions.retention(1), 3600)
+        self.assertEqual(LogPartitions.retention(838), 838 * 3600)
+        self.assertEqual(
+            LogPartitions.retention(3600), LogPartitions.MAX_RETENTION
+        )
+
+        # Entries kept for four hours fit in partitions of one hour.
+        LogPartitions.ENABLED = True
+        MySQLHandler.PRUNE_TIME = 4
+        MySQLHandler.create()
+        bounds = [
+            datetime.datetime.strptime(name, "p%Y%m%d%H%M%S")
+            for name in PARTITIONS["log"][:-1]
+        ]
+        self.assertEqual(
+            set(later - earlier for earlier, later in zip(bounds, bounds[1:])),
+            set([datetime.timedelta(hours=1)])
+        )
+
+    def test_maintain(self):
+        """Check that expired partitions are dropped and that new ones are
+        added.
+        """
+        now = datetime.datetime(2014, 10, 18, 12, 10, 0)
+        PARTITIONS["log"] = ["p20141018110000", "p20141018111500"]
+        self.assertFalse(LogPartitions.maintain("log", 3600, now))
+        self.assertFalse(LogPartitions.maintain("error_log", 3600, now))
+        self.assertEqual(len(STATEMENTS), 2)
+
+        PARTITIONS["log"].append("pmax")
+        self.assertTrue(LogPartitions.maintain("log", 3600, now))
+        self.assertEqual(PARTITIONS["log"], [
+            "p20141018111500", "p20141018121500", "p20141018123000",
+            "p20141018124500", "pmax"
+        ])
+
+        # Nothing changes until partitions expire or are needed.
+        del STATEMENTS[:]
+        now += datetime.timedelta(minutes=4)
+        self.assertTrue(LogPartitions.maintain("log", 3600, now))
+        self.assertEqual(len(STATEMENTS), 1)
+
+        # Partitions are not added for the time Fabric was stopped.
+        now += datetime.timedelta(days=1)
+        self.assertTrue(LogPartitions.maintain("log", 3600, now))
+        self.assertEqual(PARTITIONS["log"], [
+            "p20141019121500", "p20141019123000", "p20141019124500", "pmax"
+        ])
+
+
+if __name__ == "__main__":
+    unittest.main()
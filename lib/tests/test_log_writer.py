@@ -0,0 +1,184 @@
+#
+# Copyright (c) 2013,2014, Oracle and/or its affiliates. All rights reserved.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; version 2 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+#
+"""Unit tests for the background writer of the log table.
+
+The state store is replaced by a stand-in that records the log entries
+inserted by each statement.
+"""
+import unittest
+import logging
+import threading
+import uuid as _uuid
+import tests.utils
+
+import mysql.fabric.persistence as _persistence
+
+from mysql.fabric.handler import (
+    MySQLHandler,
+)
+
+# Entries inserted by each statement along with the thread that sent it.
+INSERTS = []
+
+# Entries whose insertion fails.
+FAILING = set()
+
+def exec_mysql_stmt(cnx, stmt_str, options=None):
+    """Execute a statement against the stand-in.
+    """
+    if stmt_str.startswith("INSERT INTO log"):
+        params = (options or {}).get("params", ())
+        entries = [params[index + 3] for index in range(0, len(params), 6)]
+        if FAILING.intersection(entries):
+            raise ValueError("Failing entries: %s." % (entries, ))
+        INSERTS.append((threading.current_thread().name, entries))
+    elif stmt_str.startswith("SELECT @@GLOBAL.SERVER_UUID"):
+        return [(str(_uuid.uuid4()), )]
+    return []
+
+class TestLogWriter(unittest.TestCase):
+    """Unit test for the background writer of the log table.
+    """
+    def setUp(self):
+        """Configure the existing environment
+        """
+        self.handler_attributes = dict(
+            (name, getattr(MySQLHandler, name))
+            for name in ("QUEUE_SIZE", "FLUSH_INTERVAL", "MAX_BATCH_SIZE",
+                         "OVERFLOW", "WRITTEN", "DROPPED", "FAILED")
+        )
+        self.state_store = tests.utils.setup_state_store_stand_in(
+            exec_mysql_stmt
+        )
+        _persistence.PersistentMeta.init_thread(_persistence.MySQLPersister())
+        self.handler = MySQLHandler()
+        self.logger = logging.getLogger("tests.test_log_writer")
+        self.logger.propagate = False
+        self.logger.setLevel(logging.DEBUG)
+        self.logger.addHandler(self.handler)
+        del INSERTS[:]
+        FAILING.clear()
+        self.init_thread = _persistence.init_thread
+
+    def tearDown(self):
+        """Clean up the existing environment
+        """
+        _persistence.init_thread = self.init_thread
+        MySQLHandler.shutdown_writer()
+        MySQLHandler.QUEUE.clear()
+        self.logger.removeHandler(self.handler)
+        _persistence.PersistentMeta.deinit_thread()
+        tests.utils.teardown_state_store_stand_in(self.state_store)
+        for name, value in self.handler_attributes.items():
+            setattr(MySQLHandler, name, value)
+
+    def test_batches(self):
+        """Check that entries are written in batches by the writer and
+        synchronously when it is not running.
+        """
+        self._log(0)
+        self.assertEqual(INSERTS, [("MainThread", ["0"])])
+
+        del INSERTS[:]
+        MySQLHandler.FLUSH_INTERVAL = 60.0
+        MySQLHandler.MAX_BATCH_SIZE = 3
+        queued, written, dropped, failed = MySQLHandler.get_statistics()
+        MySQLHandler.start_writer()
+        for number in range(1, 8):
+            self._log(number)
+
+        # The remaining entries are written on shutdown.
+        MySQLHandler.shutdown_writer()
+        self.assertEqual(
+            [thread_name for thread_name, _ in INSERTS], ["LogWriter"] * 3
+        )
+        self.assertEqual(
+            [entries for _, entries in INSERTS],
+            [["1", "2", "3"], ["4", "5", "6"], ["7"]]
+        )
+        self.assertEqual(
+            MySQLHandler.get_statistics(),
+            (0, written + 7, dropped, failed)
+        )
+
+        del INSERTS[:]
+        self._log(8)
+        self.assertEqual(INSERTS, [("MainThread", ["8"])])
+
+    def test_overflow(self):
+        """Check which entries are dropped when the queue is full.
+        """
+        MySQLHandler.FLUSH_INTERVAL = 60.0
+        MySQLHandler.QUEUE_SIZE = 2
+        for overflow, expected in (
+            (MySQLHandler.DROP_NEWEST, ["0", "1"]),
+            (MySQLHandler.DROP_OLDEST, ["2", "3"])):
+            del INSERTS[:]
+            MySQLHandler.OVERFLOW = overflow
+            dropped = MySQLHandler.get_statistics()[2]
+            MySQLHandler.start_writer()
+            for number in range(0, 4):
+                self._log(number)
+            MySQLHandler.shutdown_writer()
+            self.assertEqual(INSERTS, [("LogWriter", expected)])
+            self.assertEqual(MySQLHandler.get_statistics()[2], dropped + 2)
+
+    def test_failures(self):
+        """Check that a batch that cannot be written is dropped and that
+        entries are synchronously written once the writer has exited.
+        """
+        MySQLHandler.FLUSH_INTERVAL = 60.0
+        MySQLHandler.MAX_BATCH_SIZE = 2
+        FAILING.add("1")
+        failed = MySQLHandler.get_statistics()[3]
+        MySQLHandler.start_writer()
+        for number in range(0, 5):
+            self._log(number)
+        MySQLHandler.shutdown_writer()
+        self.assertEqual(
+            INSERTS, [("LogWriter", ["2", "3"]), ("LogWriter", ["4"])]
+        )
+        self.assertEqual(MySQLHandler.get_statistics()[3], failed + 2)
+
+        del INSERTS[:]
+        def init_thread():
+            """Fail to set up the writer's connection.
+            """
+            raise ValueError("No connection.")
+        _persistence.init_thread = init_thread
+        MySQLHandler.start_writer()
+        writer = MySQLHandler.WRITER
+        writer.join(MySQLHandler.SHUTDOWN_TIMEOUT)
+        self.assertFalse(writer.is_alive())
+        self.assertEqual(MySQLHandler.WRITER, None)
+        self._log(5)
+        self.assertEqual(INSERTS, [("MainThread", ["5"])])
+
+    def _log(self, number):
+        """Log an entry whose message is a number.
+        """
+        self.logger.debug(
+            "%s", number, extra={
+                'subject' : 'group_id_1',
+                'category' : MySQLHandler.GROUP,
+                'type' : MySQLHandler.PROMOTE,
+            }
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
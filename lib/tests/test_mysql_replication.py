@@ -17,10 +17,14 @@
 
 """Unit tests for the configuration file handling.
 """
+import collections
 import re
+import time
 import unittest
 import uuid as _uuid
 
+import mysql.fabric.replication as _replication
+
 from mysql.fabric import errors as _errors
 from mysql.fabric.server import MySQLServer
 from mysql.fabric.replication import *
@@ -238,6 +242,25 @@ class TestMySQLSlave(tests.utils.TestCase):
         self.assertEqual(status[0].Slave_IO_Running.upper(), "NO")
         self.assertEqual(status[0].Slave_SQL_Running.upper(), "NO")
 
+    def test_start_stop_latency(self):
+        """Test that waiting for slave's threads does not take a full
+        poll interval when the threads change their state right away.
+        """
+        # Set up replication.
+        master = self.master
+        slave = self.slave
+        switch_master(slave, master, MySQLInstances().user,
+            MySQLInstances().passwd
+        )
+
+        # Start and stop the SQL Thread which does not depend on the
+        # master and changes its state almost immediately.
+        start = time.time()
+        start_slave(slave, wait=True, threads=(SQL_THREAD, ))
+        stop_slave(slave, wait=True, threads=(SQL_THREAD, ))
+        self.assertTrue(time.time() - start < 1)
+        self.assertFalse(is_slave_thread_running(slave, (SQL_THREAD, )))
+
     def test_wait_for_slave(self):
         """Test wait_for_slave_thread function.
         """
@@ -425,6 +448,80 @@ class TestMySQLSlave(tests.utils.TestCase):
         self.assertEqual(slave_gtid_status[0].GTID_EXECUTED, "")
         self.assertNotEqual(master_gtid_status[0].GTID_EXECUTED, "")
 
+_ThreadsStatus = collections.namedtuple("_ThreadsStatus", [
+    "Slave_IO_Running", "Last_IO_Errno", "Last_IO_Error",
+    "Slave_SQL_Running", "Last_SQL_Errno", "Last_SQL_Error",
+])
+
+class _PerformanceSchemaServer(object):
+    """Server that reports its slave's threads status through the
+    performance_schema and records the statements sent to it.
+    """
+    def __init__(self, states):
+        """Constructor for _PerformanceSchemaServer.
+        """
+        self.uuid = _uuid.uuid4()
+        self.version = "5.7.8"
+        self.states = list(states)
+        self.statements = []
+
+    def check_version_compat(self, expected_version):
+        """The server is recent enough.
+        """
+        return True
+
+    def get_variable(self, variable):
+        """The performance_schema is enabled.
+        """
+        self.statements.append(variable)
+        return "ON"
+
+    def exec_stmt(self, stmt_str, options=None):
+        """Return the next status.
+        """
+        self.statements.append(stmt_str)
+        state = self.states.pop(0) if len(self.states) > 1 else \
+            self.states[0]
+        return [state]
+
+class TestSlaveThreadsStatus(unittest.TestCase):
+    """Unit test for the polling of the slave's threads status through the
+    performance_schema.
+    """
+    def test_single_query_per_poll(self):
+        """Test that each poll sends a single statement and that the
+        server's capabilities are checked once.
+        """
+        stopped = _ThreadsStatus("OFF", 0, "", "OFF", 0, "")
+        running = _ThreadsStatus("ON", 0, "", "ON", 0, "")
+        server = _PerformanceSchemaServer([stopped, stopped, running])
+        wait_for_slave_thread(server, timeout=1)
+        self.assertEqual(
+            server.statements,
+            ["PERFORMANCE_SCHEMA"] + [_replication._SLAVE_THREADS_STATUS] * 3
+        )
+
+        del server.statements[:]
+        self.assertTrue(is_slave_thread_running(server))
+        self.assertEqual(
+            server.statements, [_replication._SLAVE_THREADS_STATUS]
+        )
+
+    def test_coordinator_error(self):
+        """Test that the error reported by the query, i.e. the coordinator's
+        one on a multi-threaded slave, stops the wait.
+        """
+        self.assertTrue("replication_applier_status_by_coordinator" in
+                        _replication._SLAVE_THREADS_STATUS)
+        failed = _ThreadsStatus(
+            "ON", 0, "", "OFF", 1756, "Coordinator stopped because there "
+            "were error(s) in the worker(s)."
+        )
+        server = _PerformanceSchemaServer([failed])
+        self.assertRaises(
+            _errors.DatabaseError, wait_for_slave_thread, server, 1
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -514,6 +514,24 @@ class TestConnectionManager(unittest.TestCase):
         cnx_pool.purge_connections(server_2)
         self.assertEqual(cnx_pool.get_number_connections(server_2), 0)
 
+        # Check that the number of idle connections is bounded and that
+        # evicted connections are reported.
+        max_idle = ConnectionManager.MAX_IDLE
+        ConnectionManager.MAX_IDLE = 1
+        try:
+            server_1.connect()
+            server_2.connect()
+            server_1.disconnect()
+            server_2.disconnect()
+            self.assertEqual(cnx_pool.get_number_connections(server_1), 1)
+            statistics = cnx_pool.get_statistics()[server_1.uuid]
+            self.assertEqual(statistics['idle'], 1)
+            self.assertEqual(statistics['in_use'], 0)
+            self.assertTrue(statistics['evictions'] >= 1)
+        finally:
+            ConnectionManager.MAX_IDLE = max_idle
+            cnx_pool.purge_connections(server_1)
+
 
 class TestGroup(unittest.TestCase):
     """Unit test for testing Group.
@@ -0,0 +1,199 @@
+#
+# Copyright (c) 2013,2014, Oracle and/or its affiliates. All rights reserved.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; version 2 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+#
+"""Unit tests for the cache of objects read from the state store.
+
+The state store is replaced by a stand-in that keeps a single group so
+that the statements sent to it can be counted.
+"""
+import unittest
+import uuid as _uuid
+import tests.utils
+
+import mysql.fabric.persistence as _persistence
+
+from mysql.fabric.persistence import (
+    ObjectCache,
+)
+
+from mysql.fabric.server import (
+    Group,
+)
+
+from mysql.fabric.sharding import (
+    SHARDING_DATATYPE_HANDLER,
+)
+
+STATEMENTS = []
+GROUPS = {}
+
+def exec_mysql_stmt(cnx, stmt_str, options=None):
+    """Execute a statement against the stand-in.
+    """
+    STATEMENTS.append(stmt_str)
+    params = (options or {}).get("params", ())
+    if stmt_str == Group.QUERY_GROUP:
+        row = GROUPS.get(params[0])
+        return [row] if row else []
+    elif stmt_str == Group.UPDATE_STATUS:
+        status, group_id = params
+        GROUPS[group_id] = GROUPS[group_id][:4] + (status, )
+    elif stmt_str.startswith("SELECT @@GLOBAL.SERVER_UUID"):
+        return [(str(_uuid.uuid4()), )]
+    return []
+
+class TestObjectCache(unittest.TestCase):
+    """Unit test for the cache of objects read from the state store.
+    """
+    def setUp(self):
+        """Configure the existing environment
+        """
+        self.enabled = ObjectCache.ENABLED
+        self.state_store = tests.utils.setup_state_store_stand_in(
+            exec_mysql_stmt
+        )
+        ObjectCache.ENABLED = True
+        ObjectCache.clear()
+        GROUPS["group-1"] = ("group-1", "", None, None, Group.ACTIVE)
+        self.persister = _persistence.MySQLPersister()
+        del STATEMENTS[:]
+
+    def tearDown(self):
+        """Clean up the existing environment
+        """
+        tests.utils.teardown_state_store_stand_in(self.state_store)
+        ObjectCache.ENABLED = self.enabled
+        ObjectCache.clear()
+        GROUPS.clear()
+
+    def test_read_through(self):
+        """Check that objects are read once and that a committed write
+        makes them stale.
+        """
+        hits, misses = self._statistics()
+        for _ in range(0, 3):
+            group = Group.fetch("group-1", persister=self.persister)
+            self.assertEqual(group.status, Group.ACTIVE)
+        self.assertEqual(self._count_queries(), 1)
+        self.assertEqual(self._statistics(), (hits + 2, misses + 1))
+
+        # Every caller gets its own object.
+        self.assertFalse(
+            Group.fetch("group-1", persister=self.persister) is
+            Group.fetch("group-1", persister=self.persister)
+        )
+
+        # A write outside a transaction is immediately committed.
+        self.persister.exec_stmt(
+            Group.UPDATE_STATUS, {"params" : (Group.INACTIVE, "group-1")}
+        )
+        group = Group.fetch("group-1", persister=self.persister)
+        self.assertEqual(group.status, Group.INACTIVE)
+        self.assertEqual(self._count_queries(), 2)
+
+        # Writes to other tables do not make the objects stale.
+        self.persister.exec_stmt("DELETE FROM shards WHERE shard_id = 1")
+        Group.fetch("group-1", persister=self.persister)
+        self.assertEqual(self._count_queries(), 2)
+
+        # Writes whose tables are unknown make all objects stale.
+        self.persister.exec_stmt("TRUNCATE TABLE shards")
+        Group.fetch("group-1", persister=self.persister)
+        self.assertEqual(self._count_queries(), 3)
+
+    def test_transaction(self):
+        """Check that a transaction reads its own writes and that they
+        only make objects stale when committed.
+        """
+        other = _persistence.MySQLPersister()
+        Group.fetch("group-1", persister=self.persister)
+
+        self.persister.begin()
+        self.persister.exec_stmt(
+            Group.UPDATE_STATUS, {"params" : (Group.INACTIVE, "group-1")}
+        )
+        queries = self._count_queries()
+        for _ in range(0, 2):
+            group = Group.fetch("group-1", persister=self.persister)
+            self.assertEqual(group.status, Group.INACTIVE)
+        self.assertEqual(self._count_queries(), queries + 2)
+
+        # The stand-in does not isolate transactions, so the cached row
+        # shows what other persisters would read before the commit.
+        group = Group.fetch("group-1", persister=other)
+        self.assertEqual(group.status, Group.ACTIVE)
+        self.assertEqual(self._count_queries(), queries + 2)
+
+        self.persister.commit()
+        group = Group.fetch("group-1", persister=other)
+        self.assertEqual(group.status, Group.INACTIVE)
+        self.assertEqual(self._count_queries(), queries + 3)
+
+    def test_written_tables(self):
+        """Check which tables are changed by a statement.
+        """
+        for stmt_str, tables in (
+            (Group.QUERY_GROUP, ()),
+            (Group.UPDATE_STATUS, ("groups", )),
+            ("INSERT INTO servers(server_uuid) VALUES (%s)", ("servers", )),
+            ("INSERT IGNORE INTO `fabric`.`shards` VALUES (%s)",
+             ("shards", )),
+            ("DELETE FROM shard_ranges WHERE shard_id = %s",
+             ("shard_ranges", )),
+            ("DELETE s FROM shards AS s JOIN shard_ranges", None),
+            ("UPDATE shards AS s JOIN shard_ranges SET s.state = %s", None),
+            ("CREATE TABLE groups (group_id VARCHAR(64))", None),
+            ("ALTER TABLE log DROP PARTITION p20141018000000", ("log", )),
+            ("ALTER EVENT prune_log DISABLE", None),
+            ("COMMIT", ()),
+            ("(SELECT 1) UNION ALL (SELECT 2)", ()),
+            ("/* comment */ SELECT 1", ()),
+            ("-- comment\n# comment\n DELETE FROM shards", ("shards", )),
+            ("/*!40101 SET @a = 1 */", None),
+        ):
+            self.assertEqual(ObjectCache.written_tables(stmt_str), tables)
+
+        # Looking up shards does not change any table.
+        for handler in SHARDING_DATATYPE_HANDLER.values():
+            self.assertEqual(
+                ObjectCache.written_tables(handler.LOOKUP_KEY), ()
+            )
+
+    def test_disabled(self):
+        """Check that objects are always read when the cache is disabled.
+        """
+        ObjectCache.ENABLED = False
+        for _ in range(0, 3):
+            Group.fetch("group-1", persister=self.persister)
+        self.assertEqual(self._count_queries(), 3)
+
+    @staticmethod
+    def _count_queries():
+        """Return the number of groups read from the stand-in.
+        """
+        return STATEMENTS.count(Group.QUERY_GROUP)
+
+    @staticmethod
+    def _statistics():
+        """Return the number of hits and misses reading groups.
+        """
+        hits, misses, _ = \
+            ObjectCache.get_statistics().get("groups", (0, 0, 0))
+        return hits, misses
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,261 @@
+#
+# Copyright (c) 2013,2014, Oracle and/or its affiliates. All rights reserved.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; version 2 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+#
+"""Micro-benchmark for the server-side prepared statements sent to the
+state store.
+
+The state store is replaced by a stand-in that waits a fixed time to
+parse a statement, so that the latency of lookups can be compared with
+and without prepared statements.
+"""
+import decimal
+import unittest
+import logging
+import time
+import uuid as _uuid
+import tests.utils
+
+import mysql.connector
+
+import mysql.fabric.persistence as _persistence
+import mysql.fabric.server_utils as _server_utils
+
+from mysql.fabric.persistence import (
+    ObjectCache,
+)
+
+from mysql.fabric.server import (
+    Group,
+    MySQLServer,
+)
+
+_LOGGER = logging.getLogger(__name__)
+
+LOOKUPS = 500
+
+# Time in seconds that the stand-in takes to parse a statement.
+PARSE_TIME = 0.0002
+
+# Statements parsed by the stand-in.
+PARSED = []
+
+# Statements executed by the stand-in.
+EXECUTED = []
+
+GROUP = ("group-1", "", None, None, Group.ACTIVE)
+
+SERVER_UUID = str(_uuid.uuid4())
+
+SERVER = (SERVER_UUID, "server-1:3306", 1, 1, 1.0, "group-1")
+
+def _execute(stmt_str, params):
+    """Return the result set of a statement.
+    """
+    EXECUTED.append(stmt_str)
+    if stmt_str == Group.QUERY_GROUP:
+        return [GROUP] if params[0] == GROUP[0] else []
+    elif stmt_str == MySQLServer.QUERY_SERVER_BY_UUID:
+        return [SERVER] if params[0] == SERVER_UUID else []
+    elif stmt_str.startswith("SELECT @@GLOBAL.SERVER_UUID"):
+        return [(str(_uuid.uuid4()), )]
+    return []
+
+def _parse(stmt_str):
+    """Parse a statement.
+    """
+    PARSED.append(stmt_str)
+    time.sleep(PARSE_TIME)
+
+def exec_mysql_stmt(cnx, stmt_str, options=None):
+    """Parse and execute a statement.
+    """
+    _parse(stmt_str)
+    return _execute(stmt_str, (options or {}).get("params", ()))
+
+class Cursor(object):
+    """Statement prepared on the stand-in.
+    """
+    def __init__(self):
+        """Constructor for Cursor.
+        """
+        self.executed = None
+        self.closed = False
+
+def prepare_mysql_stmt(cnx, stmt_str):
+    """Return a cursor to prepare a statement.
+    """
+    return Cursor()
+
+def exec_mysql_prepared_stmt(cnx, cur, stmt_str, options=None):
+    """Execute a statement parsing it if it has not been executed with the
+    same string.
+    """
+    assert not cur.closed
+    if cur.executed is not stmt_str:
+        _parse(stmt_str)
+        cur.executed = stmt_str
+    return _execute(stmt_str, (options or {}).get("params", ()))
+
+def close_mysql_prepared_stmt(cur):
+    """Free a prepared statement.
+    """
+    cur.closed = True
+
+class TestPreparedStatements(unittest.TestCase):
+    """Compare the statements parsed and latency of lookups with and without
+    prepared statements.
+    """
+    def setUp(self):
+        """Configure the existing environment
+        """
+        self.enabled = ObjectCache.ENABLED
+        self.state_store = tests.utils.setup_state_store_stand_in(
+            exec_mysql_stmt, functions={
+                "prepare_mysql_stmt" : prepare_mysql_stmt,
+                "exec_mysql_prepared_stmt" : exec_mysql_prepared_stmt,
+                "close_mysql_prepared_stmt" : close_mysql_prepared_stmt,
+                "reestablish_mysql_connection" :
+                    lambda cnx, attempt, delay: None,
+            }, attributes=("prepared_stmts", "MAX_PREPARED_STMTS")
+        )
+        ObjectCache.ENABLED = False
+        self.persister = _persistence.MySQLPersister()
+        _persistence.PersistentMeta.init_thread(self.persister)
+        del PARSED[:]
+        del EXECUTED[:]
+
+    def tearDown(self):
+        """Clean up the existing environment
+        """
+        _persistence.PersistentMeta.deinit_thread()
+        tests.utils.teardown_state_store_stand_in(self.state_store)
+        ObjectCache.ENABLED = self.enabled
+
+    def test_latency(self):
+        """Measure the latency of lookups with and without prepared
+        statements.
+        """
+        _persistence.MySQLPersister.prepared_stmts = False
+        parsed, latency = self._run()
+        _persistence.MySQLPersister.prepared_stmts = True
+        prepared_parsed, prepared_latency = self._run()
+        _LOGGER.info(
+            "Lookup latency: %.3f ms and %s statements parsed without "
+            "prepared statements, %.3f ms and %s statements parsed with "
+            "prepared statements.", latency * 1000, parsed,
+            prepared_latency * 1000, prepared_parsed
+        )
+        self.assertEqual(parsed, 2 * LOOKUPS)
+        self.assertEqual(prepared_parsed, 2)
+        self.assertTrue(prepared_latency < latency)
+
+    def test_invalidation(self):
+        """Check that statements are prepared again after reconnecting and
+        that the least recently used statements are freed.
+        """
+        _persistence.MySQLPersister.prepared_stmts = True
+        Group.fetch("group-1")
+        Group.fetch("group-1")
+        self.assertEqual(PARSED, [Group.QUERY_GROUP])
+
+        # Statements are prepared again on a new connection.
+        _persistence.is_valid_mysql_connection = lambda cnx: False
+        Group.fetch("group-1")
+        _persistence.is_valid_mysql_connection = lambda cnx: True
+        Group.fetch("group-1")
+        self.assertEqual(PARSED, [Group.QUERY_GROUP] * 2)
+
+        # Statements executed with an equal string are not parsed again.
+        del PARSED[:]
+        query = "".join(list(Group.QUERY_GROUP))
+        self.persister.exec_stmt(
+            query, {"params" : ("group-1", ), "prepared" : True}
+        )
+        self.assertEqual(PARSED, [])
+
+        # Only the most recently used statements are kept.
+        _persistence.MySQLPersister.MAX_PREPARED_STMTS = 1
+        MySQLServer.fetch(SERVER_UUID)
+        Group.fetch("group-1")
+        self.assertEqual(
+            PARSED, [MySQLServer.QUERY_SERVER_BY_UUID, Group.QUERY_GROUP]
+        )
+
+        # Statements without the option are parsed every time.
+        del PARSED[:]
+        Group.groups()
+        Group.groups()
+        self.assertEqual(PARSED, [Group.QUERY_GROUPS] * 2)
+
+    def test_conversions(self):
+        """Check that values sent in the binary protocol are converted as
+        they are by the text protocol.
+        """
+        field_type = mysql.connector.FieldType
+        row = (u"group-1", u"\x01", 0.30000001192092896, u"1.50", None)
+        cur = _Cursor(
+            [field_type.VAR_STRING, field_type.BIT, field_type.FLOAT,
+             field_type.NEWDECIMAL, field_type.BIT], [row]
+        )
+        rows = _server_utils.exec_mysql_prepared_stmt(
+            _Connection(), cur, "SELECT 1"
+        )
+        self.assertEqual(
+            rows, [(u"group-1", 1, 0.3, decimal.Decimal("1.50"), None)]
+        )
+
+    def _run(self):
+        """Execute lookups and return the statements parsed per lookup and
+        the time per lookup.
+        """
+        del PARSED[:]
+        begin = time.time()
+        for _ in xrange(LOOKUPS):
+            Group.fetch("group-1")
+            MySQLServer.fetch(SERVER_UUID)
+        return len(PARSED), (time.time() - begin) / LOOKUPS
+
+class _Connection(object):
+    """Connection used to check the conversion of values.
+    """
+    unread_result = False
+
+class _Cursor(object):
+    """Cursor used to check the conversion of values.
+    """
+    def __init__(self, types, rows):
+        """Constructor for _Cursor.
+        """
+        self.description = [
+            ("column", column_type, None, None, None, None, True, 0)
+            for column_type in types
+        ]
+        self.rows = rows
+
+    def execute(self, stmt_str, params):
+        """Execute nothing.
+        """
+        pass
+
+    def fetchall(self):
+        """Return the rows.
+        """
+        return self.rows
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    unittest.main()
@@ -0,0 +1,231 @@
+#
+# Copyright (c) 2013,2014, Oracle and/or its affiliates. All rights reserved.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; version 2 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+#
+"""Unit tests for the reads sent to the state store's replicas.
+
+The primary and the replica are replaced by a stand-in that records the
+server each statement is sent to and keeps the number of transactions
+executed by each one.
+"""
+import unittest
+import uuid as _uuid
+import tests.utils
+
+import mysql.fabric.persistence as _persistence
+
+from mysql.fabric.persistence import (
+    ObjectCache,
+    ReplicaReads,
+)
+
+from mysql.fabric.server import (
+    Group,
+)
+
+from mysql.fabric.services.server import (
+    GroupLookups,
+)
+
+from mysql.fabric.sharding_datatype import (
+    HashShardingHandler,
+)
+
+from mysql.fabric.utils import (
+    in_list_matches,
+)
+
+STATEMENTS = []
+
+# Number of transactions executed by each server.
+EXECUTED = {}
+
+SOURCE_UUID = "5ca1ab1e-a007-feed-f00d-cab3fe13249e"
+
+# Statement that loads the only group.
+QUERY_GROUP_1 = Group.QUERY_GROUPS_BY_ID % (
+    in_list_matches("group_id", ["group-1"]), "%s"
+)
+
+class Connection(object):
+    """Connection to the stand-in.
+    """
+    def __init__(self, host):
+        """Constructor for Connection.
+        """
+        self.host = host
+
+def connect_to_mysql(**kwargs):
+    """Connect to the stand-in.
+    """
+    return Connection(kwargs["host"])
+
+def exec_mysql_stmt(cnx, stmt_str, options=None):
+    """Execute a statement against the stand-in.
+    """
+    STATEMENTS.append((cnx.host, stmt_str))
+    params = (options or {}).get("params", ())
+    if stmt_str.startswith("SELECT @@GLOBAL.SERVER_UUID"):
+        return [(str(_uuid.uuid4()), )]
+    elif stmt_str == _persistence._QUERY_GTID_EXECUTED:
+        return [("%s:1-%s" % (SOURCE_UUID, EXECUTED[cnx.host]), )]
+    elif stmt_str == _persistence._QUERY_GTID_SUBSET:
+        executed = int(params[0].rsplit("-", 1)[1])
+        return [(int(executed <= EXECUTED[cnx.host]), )]
+    elif stmt_str == Group.QUERY_GROUPS:
+        return [("group-1", )]
+    elif stmt_str == QUERY_GROUP_1:
+        return [("1", "group-1", "", None, None, Group.ACTIVE)]
+    elif not stmt_str.lstrip("(").startswith("SELECT"):
+        EXECUTED[cnx.host] += 1
+    return []
+
+class TestReplicaReads(unittest.TestCase):
+    """Unit test for the reads sent to the state store's replicas.
+    """
+    def setUp(self):
+        """Configure the existing environment
+        """
+        self.replica_attributes = dict(
+            (name, getattr(ReplicaReads, name))
+            for name in ("ADDRESSES", "MAX_STALENESS", "PRIMARY_GTIDS")
+        )
+        self.enabled = ObjectCache.ENABLED
+        self.state_store = tests.utils.setup_state_store_stand_in(
+            exec_mysql_stmt, host="primary",
+            functions={"connect_to_mysql" : connect_to_mysql}
+        )
+        ObjectCache.ENABLED = False
+        ReplicaReads.ADDRESSES = [("replica", 3306)]
+        ReplicaReads.MAX_STALENESS = 0.0
+        ReplicaReads.PRIMARY_GTIDS = None
+        EXECUTED.update({"primary" : 10, "replica" : 10})
+        self.persister = _persistence.MySQLPersister()
+        _persistence.PersistentMeta.init_thread(self.persister)
+        del STATEMENTS[:]
+
+    def tearDown(self):
+        """Clean up the existing environment
+        """
+        _persistence.PersistentMeta.deinit_thread()
+        tests.utils.teardown_state_store_stand_in(self.state_store)
+        for name, value in self.replica_attributes.items():
+            setattr(ReplicaReads, name, value)
+        ObjectCache.ENABLED = self.enabled
+
+    def test_commands(self):
+        """Check that commands that are not procedures read from the
+        replica and that other reads go to the primary.
+        """
+        result = GroupLookups().execute()
+        self.assertEqual(result.error, None)
+        self.assertEqual(self._queries("replica"), [
+            _persistence._QUERY_GTID_SUBSET, Group.QUERY_GROUPS,
+            QUERY_GROUP_1
+        ])
+        self.assertEqual(self._queries("primary"), [
+            _persistence._QUERY_GTID_EXECUTED
+        ])
+
+        # The replica is not checked again if nothing has been written.
+        del STATEMENTS[:]
+        GroupLookups().execute()
+        self.assertEqual(len(self._queries("replica")), 2)
+        self.assertEqual(self._queries("primary"), [])
+
+        # Outside commands, everything goes to the primary.
+        del STATEMENTS[:]
+        Group.groups()
+        self.assertEqual(self._queries("primary"), [Group.QUERY_GROUPS])
+        self.assertEqual(self._queries("replica"), [])
+
+    def test_staleness(self):
+        """Check that a replica is only read from after it has executed
+        the writes committed by Fabric.
+        """
+        self.persister.read_from_replicas(True)
+        Group.groups()
+        self.assertEqual(STATEMENTS[-1], ("replica", Group.QUERY_GROUPS))
+
+        # Writes go to the primary and make the replica stale.
+        other = _persistence.MySQLPersister()
+        other.exec_stmt(Group.UPDATE_STATUS, {"params" : (0, "group-1")})
+        Group.groups()
+        self.assertEqual(STATEMENTS[-1], ("primary", Group.QUERY_GROUPS))
+
+        # The replica is used once it catches up.
+        EXECUTED["replica"] = EXECUTED["primary"]
+        Group.groups()
+        self.assertEqual(STATEMENTS[-1], ("replica", Group.QUERY_GROUPS))
+
+        # Writes to tables that commands do not read are ignored.
+        other.exec_stmt("DELETE FROM checkpoints WHERE proc_uuid = %s",
+                        {"params" : ("proc", )})
+        Group.groups()
+        self.assertEqual(STATEMENTS[-1], ("replica", Group.QUERY_GROUPS))
+
+        # After writing, a persister reads its own writes.
+        self.persister.exec_stmt(Group.UPDATE_STATUS,
+                                 {"params" : (1, "group-1")})
+        EXECUTED["replica"] = EXECUTED["primary"]
+        Group.groups()
+        self.assertEqual(STATEMENTS[-1], ("primary", Group.QUERY_GROUPS))
+
+        # Transactions go to the primary.
+        self.persister.read_from_replicas(True)
+        self.persister.begin()
+        Group.groups()
+        self.assertEqual(STATEMENTS[-1], ("primary", Group.QUERY_GROUPS))
+        self.persister.commit()
+
+    def test_max_staleness(self):
+        """Check that a replica may be read from within the maximum
+        staleness.
+        """
+        ReplicaReads.MAX_STALENESS = 3600.0
+        self.persister.read_from_replicas(True)
+        Group.groups()
+        other = _persistence.MySQLPersister()
+        other.exec_stmt(Group.UPDATE_STATUS, {"params" : (0, "group-1")})
+        del STATEMENTS[:]
+        Group.groups()
+        self.assertEqual(STATEMENTS, [("replica", Group.QUERY_GROUPS)])
+
+    def test_hash_lookups(self):
+        """Check that hash lookups, which start with a parenthesis, are
+        sent to the replica and do not stop later reads from using it.
+        """
+        self.persister.read_from_replicas(True)
+        Group.groups()
+        self.persister.exec_stmt(
+            HashShardingHandler.LOOKUP_KEY, {"params" : ("key", 1, 1)}
+        )
+        self.assertEqual(
+            STATEMENTS[-1], ("replica", HashShardingHandler.LOOKUP_KEY)
+        )
+        Group.groups()
+        self.assertEqual(STATEMENTS[-1], ("replica", Group.QUERY_GROUPS))
+
+    def _queries(self, host):
+        """Return the statements sent to a server.
+        """
+        return [
+            stmt_str for stmt_host, stmt_str in STATEMENTS
+            if stmt_host == host and stmt_str.startswith("SELECT")
+        ]
+
+
+if __name__ == "__main__":
+    unittest.main()
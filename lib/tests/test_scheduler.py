@@ -20,6 +20,7 @@ import unittest
 import logging
 import threading
 import time
+import Queue
 
 from mysql.fabric import (
     executor as _executor,
@@ -29,6 +30,9 @@ from mysql.fabric import (
 
 _LOGGER = logging.getLogger(__name__)
 
+# Number of procedures enqueued by the benchmark.
+BENCHMARK_PROCEDURES = 100000
+
 class Run(threading.Thread):
     """Thread class.
     """
@@ -80,6 +84,54 @@ class TestScheduler(unittest.TestCase):
         self.assertEqual(scheduler.lock_manager.procedures, {})
         self.assertEqual(scheduler.lock_manager.free, [])
 
+    def test_priority_classes(self):
+        """Test that procedures are picked up by priority class and that
+        waiting procedures age.
+        """
+        scheduler = _scheduler.Scheduler()
+        bulk = _executor.Procedure(priority_class=_scheduler.PRIORITY_BULK)
+        admin = _executor.Procedure()
+        failover = _executor.Procedure(
+            priority_class=_scheduler.PRIORITY_FAILOVER
+        )
+
+        # Procedures are picked up from the highest priority class.
+        for procedure in (bulk, admin, failover):
+            scheduler.enqueue_procedure(procedure)
+        statistics = scheduler.get_statistics()
+        self.assertEqual(statistics["bulk"]["pending"], 1)
+        self.assertEqual(scheduler.get_number_pending(), 3)
+        for procedure in (failover, admin, bulk):
+            self.assertEqual(scheduler.next_procedure(), procedure)
+            scheduler.done(procedure)
+        statistics = scheduler.get_statistics()
+        self.assertEqual(statistics["failover"]["dispatched"], 1)
+        self.assertEqual(statistics["bulk"]["pending"], 0)
+        self.assertRaises(Queue.Empty, scheduler.next_procedure, None, 0.1)
+
+        # A bulk procedure that waited long enough goes first.
+        aging_interval = _scheduler.AGING_INTERVAL
+        try:
+            _scheduler.AGING_INTERVAL = 0.1
+            bulk = _executor.Procedure(priority_class=_scheduler.PRIORITY_BULK)
+            admin = _executor.Procedure()
+            scheduler.enqueue_procedure(bulk)
+            time.sleep(0.5)
+            scheduler.enqueue_procedure(admin)
+            self.assertEqual(scheduler.next_procedure(), bulk)
+            scheduler.done(bulk)
+            self.assertEqual(scheduler.next_procedure(), admin)
+            scheduler.done(admin)
+        finally:
+            _scheduler.AGING_INTERVAL = aging_interval
+
+        # A request to stop is served after the waiting procedures.
+        scheduler.enqueue_procedure(None)
+        scheduler.enqueue_procedure(admin)
+        self.assertEqual(scheduler.next_procedure(), admin)
+        scheduler.done(admin)
+        self.assertEqual(scheduler.next_procedure(), None)
+
 
 class TestLockManager(unittest.TestCase):
     """Test LockManager.
@@ -154,6 +206,67 @@ class TestLockManager(unittest.TestCase):
         self.assertEqual(scheduler.procedures, procs)
         self.assertEqual(scheduler.free, free)
 
+    def test_lock_priority_class(self):
+        """Test that procedures requesting a single object overtake waiting
+        procedures of a lower priority class.
+        """
+        scheduler = _scheduler.LockManager()
+        procedure_1 = _executor.Procedure()
+        procedure_2 = _executor.Procedure(
+            priority_class=_scheduler.PRIORITY_BULK
+        )
+        procedure_3 = _executor.Procedure(
+            priority_class=_scheduler.PRIORITY_BULK
+        )
+        procedure_4 = _executor.Procedure()
+        procedure_5 = _executor.Procedure(
+            priority_class=_scheduler.PRIORITY_FAILOVER
+        )
+        for procedure in (procedure_1, procedure_2, procedure_3):
+            scheduler.enqueue(procedure, set(["lock"]))
+
+        # Procedures that request several objects are never overtaken.
+        scheduler.enqueue(procedure_4, set(["lock", "other"]))
+        self.assertEqual(scheduler.objects["lock"],
+            [procedure_1, procedure_2, procedure_3, procedure_4]
+        )
+        scheduler.release(procedure_4)
+
+        # The procedure holding the lock is never overtaken.
+        scheduler.enqueue(procedure_5, set(["lock"]))
+        self.assertEqual(scheduler.objects["lock"],
+            [procedure_1, procedure_5, procedure_2, procedure_3]
+        )
+        self.assertEqual(scheduler.free, [procedure_1])
+
+        scheduler.release(procedure_1)
+        self.assertEqual(scheduler.free, [procedure_5])
+
+    def test_lock_priority_aging(self):
+        """Test that a waiting procedure which aged is only overtaken by
+        procedures of a higher effective priority.
+        """
+        scheduler = _scheduler.LockManager()
+        holder = _executor.Procedure()
+        bulk = _executor.Procedure(priority_class=_scheduler.PRIORITY_BULK)
+        admin = _executor.Procedure()
+        failover = _executor.Procedure(
+            priority_class=_scheduler.PRIORITY_FAILOVER
+        )
+        aging_interval = _scheduler.AGING_INTERVAL
+        try:
+            _scheduler.AGING_INTERVAL = 0.1
+            scheduler.enqueue(holder, set(["lock"]))
+            scheduler.enqueue(bulk, set(["lock"]))
+            time.sleep(0.15)
+            scheduler.enqueue(admin, set(["lock"]))
+            scheduler.enqueue(failover, set(["lock"]))
+        finally:
+            _scheduler.AGING_INTERVAL = aging_interval
+        self.assertEqual(scheduler.objects["lock"],
+            [holder, failover, bulk, admin]
+        )
+
     def test_enqueue(self):
         """Test enqueuing locks.
         """
@@ -352,6 +465,41 @@ class TestLockManager(unittest.TestCase):
         thread_1.join()
         thread_2.join()
 
+    def test_benchmark(self):
+        """Measure how long it takes to enqueue and release many requests
+        on the same object.
+        """
+        scheduler = _scheduler.LockManager()
+        objects = set(["lock"])
+        procedures = [
+            _executor.Procedure() for _ in xrange(BENCHMARK_PROCEDURES)
+        ]
+
+        start = time.time()
+        for procedure in procedures:
+            scheduler.enqueue(procedure, objects)
+        enqueue_time = time.time() - start
+        self.assertEqual(scheduler.free, [procedures[0]])
+
+        # Release waiting procedures from the middle and the tail of the
+        # queue and then the procedures holding the lock.
+        start = time.time()
+        middle = BENCHMARK_PROCEDURES // 2
+        for procedure in reversed(procedures[middle:]):
+            scheduler.release(procedure)
+        for procedure in procedures[:middle]:
+            self.assertEqual(scheduler.get(procedure), procedure)
+            scheduler.release(procedure)
+        release_time = time.time() - start
+
+        self.assertEqual(scheduler.objects, {})
+        self.assertEqual(scheduler.procedures, {})
+        self.assertEqual(scheduler.free, [])
+        _LOGGER.info(
+            "LockManager with %s procedures: enqueue %.3fs, release %.3fs.",
+            BENCHMARK_PROCEDURES, enqueue_time, release_time
+        )
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,208 @@
+#
+# Copyright (c) 2013,2014, Oracle and/or its affiliates. All rights reserved.
+#
+# This program is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; version 2 of the License.
+#
+# This program is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with this program; if not, write to the Free Software
+# Foundation, Inc., 51 Franklin St, Fifth Floor, Boston, MA 02110-1301 USA
+#
+"""Unit tests for the tracing of statements sent to the state store and
+to the managed servers.
+
+Connections are replaced by stand-ins that return empty result sets or
+fail statements that contain the word FAIL.
+"""
+import unittest
+
+import mysql.fabric.server_utils as _server_utils
+
+from mysql.fabric.errors import (
+    DatabaseError,
+)
+
+from mysql.fabric.server_utils import (
+    StatementTracer,
+    exec_mysql_stmt,
+)
+
+from mysql.fabric.services.handler import (
+    Statements,
+)
+
+class Cursor(object):
+    """Cursor of the stand-in.
+    """
+    def execute(self, stmt_str, params=(), multi=False):
+        """Execute a statement.
+        """
+        if "FAIL" in stmt_str:
+            raise Exception("Statement failed.")
+
+    def fetchall(self):
+        """Return an empty result set.
+        """
+        return []
+
+    def close(self):
+        """Close the cursor.
+        """
+        pass
+
+class Connection(object):
+    """Connection to the stand-in.
+    """
+    unread_result = True
+
+    def __init__(self, host, port):
+        """Constructor for Connection.
+        """
+        self.server_host = host
+        self.server_port = port
+
+    def cursor(self, **kwargs):
+        """Return a cursor.
+        """
+        return Cursor()
+
+    def get_rows(self):
+        """Discard a result set.
+        """
+        pass
+
+class TestStatementTracer(unittest.TestCase):
+    """Unit test for the tracing of statements.
+    """
+    def setUp(self):
+        """Configure the existing environment
+        """
+        self.attributes = dict(
+            (name, getattr(StatementTracer, name))
+            for name in ("ENABLED", "SAMPLING", "STORE_ADDRESSES",
+                         "MAX_TEMPLATES")
+        )
+        StatementTracer.ENABLED = True
+        StatementTracer.STORE_ADDRESSES = frozenset([("store", 3306)])
+        StatementTracer.clear()
+        self.store = Connection("store", 3306)
+        self.server = Connection("server", 3306)
+
+    def tearDown(self):
+        """Clean up the existing environment
+        """
+        for name, value in self.attributes.items():
+            setattr(StatementTracer, name, value)
+        StatementTracer.clear()
+
+    def test_templates(self):
+        """Check that statements are recorded per template and target.
+        """
+        for shard_id in range(0, 3):
+            exec_mysql_stmt(
+                self.store, "SELECT * FROM shards WHERE shard_id = %s",
+                {"params" : (shard_id, )}
+            )
+            exec_mysql_stmt(
+                self.server, "SELECT * FROM t WHERE id IN (%s, %s)" %
+                (shard_id, shard_id + 1)
+            )
+        exec_mysql_stmt(
+            self.server, "SELECT * FROM t WHERE id IN ('a', 'b', 'c')"
+        )
+        self.assertRaises(
+            DatabaseError, exec_mysql_stmt, self.store,
+            "SELECT FAIL FROM shards WHERE shard_id = %s",
+            {"params" : (1, )}
+        )
+
+        statistics = StatementTracer.statistics()
+        self.assertEqual(sorted(statistics.keys()), [
+            ("servers", "SELECT * FROM t WHERE id IN (%s, ...)"),
+            ("store", "SELECT * FROM shards WHERE shard_id = %s"),
+            ("store", "SELECT FAIL FROM shards WHERE shard_id = %s"),
+        ])
+        entry = statistics[
+            ("servers", "SELECT * FROM t WHERE id IN (%s, ...)")
+        ]
+        self.assertEqual(entry[:2], [4, 0])
+        self.assertEqual(sum(entry[4:]), 4)
+        entry = statistics[
+            ("store", "SELECT FAIL FROM shards WHERE shard_id = %s")
+        ]
+        self.assertEqual(entry[:2], [1, 1])
+
+        # Templates that do not fit are recorded together.
+        StatementTracer.MAX_TEMPLATES = 1
+        exec_mysql_stmt(self.store, "SELECT 1 FROM groups")
+        self.assertEqual(
+            StatementTracer.statistics()[("store", StatementTracer.OTHER)][0],
+            1
+        )
+
+        # The limit applies to each target.
+        StatementTracer.clear()
+        exec_mysql_stmt(self.store, "SELECT 1 FROM groups")
+        exec_mysql_stmt(self.store, "SELECT 1 FROM servers")
+        exec_mysql_stmt(self.server, "SELECT 1 FROM servers")
+        self.assertEqual(
+            sorted(StatementTracer.statistics().keys()), [
+                ("servers", "SELECT ? FROM servers"),
+                ("store", StatementTracer.OTHER),
+                ("store", "SELECT ? FROM groups"),
+            ]
+        )
+
+    def test_disabled(self):
+        """Check that nothing is recorded when tracing is disabled.
+        """
+        StatementTracer.ENABLED = False
+        exec_mysql_stmt(self.store, "SELECT 1 FROM groups")
+        self.assertEqual(StatementTracer.statistics(), {})
+
+        # Statements are sampled.
+        StatementTracer.ENABLED = True
+        StatementTracer.SAMPLING = 0.5
+        random = _server_utils.random.random
+        try:
+            _server_utils.random.random = lambda: 0.6
+            exec_mysql_stmt(self.store, "SELECT 1 FROM groups")
+            self.assertEqual(StatementTracer.statistics(), {})
+            _server_utils.random.random = lambda: 0.4
+            exec_mysql_stmt(self.store, "SELECT 1 FROM groups")
+            self.assertEqual(len(StatementTracer.statistics()), 1)
+        finally:
+            _server_utils.random.random = random
+
+    def test_command(self):
+        """Check that the command lists statements by total time.
+        """
+        StatementTracer.TEMPLATES = {
+            ("store", "SELECT 1") : [1, 0, 0.5, 0.5, 0, 0, 0, 0, 1, 0],
+            ("store", "SELECT 2") : [2, 0, 2.0, 1.0, 0, 0, 0, 0, 0, 2],
+            ("servers", "SELECT 3") : [1, 1, 1.0, 1.0, 0, 0, 0, 0, 1, 0],
+        }
+        result = Statements().execute()
+        self.assertEqual(result.error, None)
+        self.assertEqual(
+            [row[1] for row in result.results[0]],
+            ["SELECT 2", "SELECT 3", "SELECT 1"]
+        )
+
+        result = Statements().execute("store", 1)
+        self.assertEqual(
+            [row[1] for row in result.results[0]], ["SELECT 2"]
+        )
+
+        result = Statements().execute("unknown")
+        self.assertNotEqual(result.error, None)
+
+
+if __name__ == "__main__":
+    unittest.main()
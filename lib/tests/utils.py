@@ -41,6 +41,7 @@ from mysql.fabric.sharding import (
 
 import mysql.connector
 
+import mysql.fabric.persistence as _persistence
 import mysql.fabric.protocols.xmlrpc as _xmlrpc
 
 _LOGGER = logging.getLogger(__name__)
@@ -448,6 +449,55 @@ def cleanup_environment():
     for __file in glob.glob(os.path.join(os.getcwd(), "*.sql")):
         os.remove(__file)
 
+def setup_state_store_stand_in(exec_mysql_stmt, host="localhost",
+                               functions=None, attributes=()):
+    """Replace the state store by a stand-in.
+
+    The functions that access the state store are replaced and the
+    MySQLPersister is configured to connect to the stand-in. Connections
+    are always valid unless other functions are provided.
+
+    :param exec_mysql_stmt: Function that executes a statement.
+    :param host: Address used to configure the MySQLPersister.
+    :param functions: Dictionary with other functions of the persistence
+                      module to be replaced.
+    :param attributes: Names of other MySQLPersister's attributes that
+                       are changed and must be restored.
+    :return: Original functions and attributes that must be passed to
+             :func:`teardown_state_store_stand_in`.
+    """
+    replacements = {
+        "exec_mysql_stmt" : exec_mysql_stmt,
+        "connect_to_mysql" : lambda **kwargs: object(),
+        "is_valid_mysql_connection" : lambda cnx: True,
+    }
+    replacements.update(functions or {})
+    saved_functions = dict(
+        (name, getattr(_persistence, name)) for name in replacements
+    )
+    saved_attributes = dict(
+        (name, getattr(_persistence.MySQLPersister, name, None))
+        for name in ("connection_info", "connection_attempts",
+                     "connection_delay", "database", "group_commit") +
+                    tuple(attributes)
+    )
+    for name, function in replacements.items():
+        setattr(_persistence, name, function)
+    _persistence.MySQLPersister.init(host=host, user="fabric")
+    return saved_functions, saved_attributes
+
+def teardown_state_store_stand_in(saved):
+    """Restore the state store replaced by
+    :func:`setup_state_store_stand_in`.
+
+    :param saved: Original functions and attributes.
+    """
+    saved_functions, saved_attributes = saved
+    for name, function in saved_functions.items():
+        setattr(_persistence, name, function)
+    for name, value in saved_attributes.items():
+        setattr(_persistence.MySQLPersister, name, value)
+
 def setup_xmlrpc():
     """Configure XML-RPC.
     """
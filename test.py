@@ -155,6 +155,7 @@ def get_config(options, env_options):
             'restore_user': user if trial_mode else 'fabric_restore',
             'restore_password': passwd if trial_mode else 'restorepw',
             'unreachable_timeout' : '5',
+            'lag_sampling_interval' : '1',
             },
         'sharding': {
             'mysqldump_program': env_options["mysqldump_path"],
@@ -169,6 +170,7 @@ def get_config(options, env_options):
             'detections' : '3',
             'detection_interval' : '6',
             'detection_timeout' : '1',
+            'health_cache_ttl' : '0',
             'prune_time' :  '60',
             },
         'connector': {